@@ -9,6 +9,9 @@ from .chef.routes import chef_bp
 from .chef.public_routes import public_chef_bp
 from .rating.routes import rating_bp
 from .admin_views import init_admin
+from .commands import register_commands
+from .auth.current_user import init_user_loader
+from .auth.email_dispatcher import email_dispatcher
 
 from flask_openapi3 import OpenAPI, Info
 from flask_cors import CORS
@@ -40,6 +43,7 @@ def create_app(config=None):
     app.config.from_object(config)
 
     jwt.init_app(app)
+    init_user_loader(jwt)
     db.init_app(app)
     mail.init_app(app)
     babel.init_app(app)
@@ -56,7 +60,12 @@ def create_app(config=None):
     app.register_api(chef_bp)
     app.register_api(public_chef_bp)
 
+    register_commands(app)
+
     if not app.config.get('TESTING', False):
         init_admin(app)
 
+    if app.config.get('EMAIL_DISPATCHER_ENABLED', False):
+        email_dispatcher.start(app)
+
     return app
@@ -3,12 +3,13 @@ from flask_admin import Admin, AdminIndexView, expose
 from flask_admin.contrib.sqla import ModelView
 from wtforms import PasswordField, SelectField
 from wtforms.validators import ValidationError
-from werkzeug.security import generate_password_hash
 from flask_jwt_extended import decode_token, create_access_token
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
 
 from backend.extensions import db
 from .auth.models import User, VerificationCode
+from .auth.current_user import build_token_claims
+from .auth.passwords import password_hasher
 from .models import (
     Recipe, Ingredient, RecipeIngredient, MealPlan,
     ShoppingList, Favorite, FridgeItem, Rating,
@@ -56,8 +57,11 @@ class SecureAdminIndexView(AdminIndexView):
 
             user = User.query.filter_by(email=email).first()
 
-            if user and user.check_password(password) and user.role == 'admin':
-                access_token = create_access_token(identity=email)
+            if user and user.check_password_and_upgrade(password) and user.role == 'admin':
+                db.session.commit()
+                access_token = create_access_token(
+                    identity=email, additional_claims=build_token_claims(user)
+                )
                 response = redirect(url_for('admin.index'))
                 response.set_cookie(
                     'admin_token', access_token, httponly=True,
@@ -120,7 +124,7 @@ class UserModelView(SecureModelView):
     column_filters = ['role', 'created_at']
     column_sortable_list = ['id', 'username', 'email', 'role', 'created_at']
     form_excluded_columns = [
-        'password_hash', 'recipes', 'meal_plans', 'shopping_lists',
+        'password_hash', 'token_version', 'recipes', 'meal_plans', 'shopping_lists',
         'favorites', 'fridge_items', 'ratings', 'recipe_collections', 'chef_profile'
     ]
     form_extra_fields = {
@@ -142,7 +146,7 @@ class UserModelView(SecureModelView):
         if form.password.data:
             if len(form.password.data) < 6:
                 raise ValidationError('Password must be at least 6 characters')
-            model.password_hash = generate_password_hash(form.password.data)
+            model.password_hash = password_hasher.hash(form.password.data)
 
         if model.role not in ['consumer', 'chef', 'admin']:
             raise ValidationError('Role must be one of: consumer, chef, admin')
@@ -163,7 +167,9 @@ class RecipeModelView(SecureModelView):
     column_searchable_list = ['title', 'description']
     column_filters = ['category', 'cuisine', 'meal_type', 'is_vegan', 'is_vegetarian']
     column_sortable_list = ['id', 'title', 'category', 'cuisine', 'created_at']
-    form_excluded_columns = ['meal_plans', 'favorites', 'ratings', 'collection_items', 'ingredients']
+    form_excluded_columns = [
+        'meal_plans', 'favorites', 'ratings', 'collection_items', 'ingredients', 'rating_stats'
+    ]
     can_view_details = True
     column_details_list = [
         'id', 'title', 'description', 'category', 'cuisine', 'meal_type',
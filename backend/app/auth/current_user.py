@@ -0,0 +1,140 @@
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from backend.extensions import db
+from .models import User
+
+import threading
+import time
+from itertools import chain
+
+
+USER_COLUMNS = tuple(column.key for column in User.__table__.columns)
+
+
+class UserCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def get(self, email):
+        entry = self.entries.get(email)
+        if entry is None:
+            return None
+
+        values, cached_at = entry
+        if time.monotonic() - cached_at > current_app.config.get('USER_CACHE_TTL', 30):
+            self.invalidate(email)
+            return None
+
+        return values
+
+    def set(self, email, values):
+        with self.lock:
+            self.entries[email] = (values, time.monotonic())
+
+    def invalidate(self, *emails):
+        with self.lock:
+            for email in emails:
+                self.entries.pop(email, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache()
+
+
+def get_user_values(email):
+    values = user_cache.get(email)
+
+    if values is None:
+        user = User.query.filter_by(email=email).first()
+        if user is None:
+            return None
+
+        values = {key: getattr(user, key) for key in USER_COLUMNS}
+        user_cache.set(email, values)
+
+    return values
+
+
+def load_user(email):
+    values = get_user_values(email)
+    if values is None:
+        return None
+
+    user = User(**values)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def load_user_from_jwt(jwt_header, jwt_data):
+    return load_user(jwt_data['sub'])
+
+
+def user_not_found(jwt_header, jwt_data):
+    return {'msg': 'User not found'}, 404
+
+
+def token_revoked(jwt_header, jwt_data):
+    values = get_user_values(jwt_data['sub'])
+    if values is None:
+        return False
+
+    return jwt_data.get('token_version', 0) != values['token_version']
+
+
+def init_user_loader(jwt_manager):
+    jwt_manager.user_lookup_loader(load_user_from_jwt)
+    jwt_manager.user_lookup_error_loader(user_not_found)
+    jwt_manager.token_in_blocklist_loader(token_revoked)
+
+
+def build_token_claims(user):
+    return {
+        'user_id': user.id,
+        'role': user.role,
+        'username': user.username,
+        'token_version': user.token_version or 0
+    }
+
+
+@event.listens_for(User, 'before_update')
+def bump_token_version(mapper, connection, target):
+    if inspect(target).attrs.role.history.has_changes():
+        target.token_version = (target.token_version or 0) + 1
+
+
+@event.listens_for(Session, 'after_flush')
+def track_user_changes(session, flush_context):
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, User):
+            history = inspect(obj).attrs.email.history
+            emails = session.info.setdefault('changed_user_emails', set())
+            emails.update(email for email in chain([obj.email], history.deleted) if email)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def track_bulk_user_changes(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, User):
+        orm_execute_state.session.info['user_cache_stale'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def publish_user_changes(session):
+    if session.info.pop('user_cache_stale', False):
+        user_cache.clear()
+    user_cache.invalidate(*session.info.pop('changed_user_emails', ()))
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_user_changes(session):
+    session.info.pop('user_cache_stale', None)
+    session.info.pop('changed_user_emails', None)
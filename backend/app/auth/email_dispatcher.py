@@ -0,0 +1,129 @@
+from backend.extensions import db, mail
+from .models import EmailOutbox
+
+from flask import current_app
+from flask_mail import Message
+
+import threading
+from datetime import datetime, timezone, timedelta
+
+
+def build_message(email):
+    msg = Message(
+        subject=email.subject,
+        recipients=[email.to_email],
+        html=email.html_body,
+        sender=current_app.config.get('MAIL_DEFAULT_SENDER')
+    )
+    if email.body:
+        msg.body = email.body
+    return msg
+
+
+def clear_body(email):
+    email.html_body = ''
+    email.body = None
+
+
+def record_failure(email, error, now):
+    max_attempts = current_app.config.get('EMAIL_MAX_ATTEMPTS', 5)
+    base_delay = current_app.config.get('EMAIL_RETRY_BASE_DELAY', 30)
+
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= max_attempts:
+        email.status = 'failed'
+        clear_body(email)
+        current_app.logger.error(f"Giving up on email to {email.to_email}: {error}")
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = now + timedelta(seconds=base_delay * 2 ** (email.attempts - 1))
+        current_app.logger.warning(f"Failed to send email to {email.to_email}, will retry: {error}")
+
+
+def claim_pending_emails(now):
+    batch_size = current_app.config.get('EMAIL_BATCH_SIZE', 20)
+    claim_timeout = current_app.config.get('EMAIL_CLAIM_TIMEOUT', 300)
+
+    emails = EmailOutbox.query.filter(
+        EmailOutbox.status.in_(['pending', 'sending']),
+        EmailOutbox.next_attempt_at <= now
+    ).order_by(
+        EmailOutbox.next_attempt_at, EmailOutbox.id
+    ).limit(batch_size).with_for_update(skip_locked=True).all()
+
+    for email in emails:
+        email.status = 'sending'
+        email.next_attempt_at = now + timedelta(seconds=claim_timeout)
+
+    db.session.commit()
+    return emails
+
+
+def dispatch_pending_emails():
+    now = datetime.now(timezone.utc)
+    emails = claim_pending_emails(now)
+    if not emails:
+        return 0
+
+    try:
+        with mail.connect() as connection:
+            for email in emails:
+                try:
+                    connection.send(build_message(email))
+                    email.status = 'sent'
+                    email.sent_at = datetime.now(timezone.utc)
+                    email.last_error = None
+                    clear_body(email)
+                    current_app.logger.info(f"Email sent successfully to {email.to_email}")
+                except Exception as e:
+                    record_failure(email, e, now)
+                db.session.commit()
+    except Exception as e:
+        for email in emails:
+            if email.status == 'sending':
+                record_failure(email, e, now)
+
+    db.session.commit()
+    return len(emails)
+
+
+class EmailDispatcher:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def start(self, app):
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+
+            self.thread = threading.Thread(
+                target=self.run, args=(app,), name='email-dispatcher', daemon=True
+            )
+            self.thread.start()
+
+    def notify(self):
+        self.wakeup.set()
+
+    def run(self, app):
+        interval = app.config.get('EMAIL_POLL_INTERVAL', 30)
+        batch_size = app.config.get('EMAIL_BATCH_SIZE', 20)
+
+        while True:
+            with app.app_context():
+                try:
+                    while dispatch_pending_emails() >= batch_size:
+                        pass
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception("Email dispatcher failed")
+                finally:
+                    db.session.remove()
+
+            self.wakeup.wait(interval)
+            self.wakeup.clear()
+
+
+email_dispatcher = EmailDispatcher()
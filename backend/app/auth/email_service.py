@@ -1,7 +1,9 @@
-from backend.extensions import mail
+from backend.extensions import db
+from .models import EmailOutbox
+from .email_dispatcher import email_dispatcher
 
-from flask_mail import Message
 from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
 
 import secrets
 
@@ -12,22 +14,23 @@ def generate_verification_code():
 
 def send_email(to_email, subject, html_body, body=None):
     try:
-        msg = Message(
+        db.session.add(EmailOutbox(
+            to_email=to_email,
             subject=subject,
-            recipients=[to_email],
-            html=html_body,
-            sender=current_app.config['MAIL_DEFAULT_SENDER']
-        )
-        if body:
-            msg.body = body
-
-        mail.send(msg)
-        current_app.logger.info(f"Email sent successfully to {to_email}")
-        return True
-    except Exception as e:
-        current_app.logger.error(f"Failed to send email to {to_email}: {str(e)}")
+            html_body=html_body,
+            body=body
+        ))
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        current_app.logger.error(f"Failed to queue email to {to_email}: {str(e)}")
         return False
 
+    if current_app.config.get('EMAIL_DISPATCHER_ENABLED', False):
+        email_dispatcher.notify()
+
+    return True
+
 
 def send_verification_email(to_email, verification_code):
     subject = "Nutrify - Email Verification"
@@ -1,6 +1,6 @@
 from backend.extensions import db
 
-from werkzeug.security import generate_password_hash, check_password_hash
+from .passwords import password_hasher
 
 import secrets
 from datetime import datetime, timezone
@@ -14,13 +14,23 @@ class User(db.Model):
     email = db.Column(db.Text, unique=True, nullable=False)
     password_hash = db.Column(db.Text, nullable=False)
     role = db.Column(db.Text, nullable=False, default='consumer')
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def check_password_and_upgrade(self, password):
+        if not self.check_password(password):
+            return False
+
+        if password_hasher.needs_rehash(self.password_hash):
+            self.set_password(password)
+
+        return True
 
     def __repr__(self):
         return f'<User {self.email} ({self.role})>'
@@ -41,6 +51,14 @@ class VerificationCode(db.Model):
     pending_password_hash = db.Column(db.Text, nullable=True)
     pending_role = db.Column(db.Text, nullable=True)
 
+    __table_args__ = (
+        db.Index(
+            'ix_verification_codes_lookup', 'email', 'purpose', 'code',
+            postgresql_where=db.text('NOT used')
+        ),
+        db.Index('ix_verification_codes_expires_at', 'expires_at'),
+    )
+
     @staticmethod
     def generate_code():
         return ''.join([str(secrets.randbelow(10)) for _ in range(6)])
@@ -55,3 +73,26 @@ class VerificationCode(db.Model):
 
     def __repr__(self):
         return f'<VerificationCode {self.email} ({self.purpose})>'
+
+
+class EmailOutbox(db.Model):
+    __tablename__ = 'email_outbox'
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    to_email = db.Column(db.Text, nullable=False)
+    subject = db.Column(db.Text, nullable=False)
+    html_body = db.Column(db.Text, nullable=False)
+    body = db.Column(db.Text, nullable=True)
+    status = db.Column(db.Text, nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    sent_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    def __repr__(self):
+        return f'<EmailOutbox {self.to_email} ({self.status})>'
@@ -0,0 +1,66 @@
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+class PasswordHasher:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.executor = None
+        self.slots = None
+        self.prefixes = {}
+
+    def get_executor(self):
+        workers = current_app.config.get('PASSWORD_HASH_WORKERS', 0)
+        if not workers:
+            return None
+
+        if self.executor is None:
+            with self.lock:
+                if self.executor is None:
+                    max_pending = current_app.config.get('PASSWORD_HASH_MAX_PENDING', 16)
+                    self.slots = threading.BoundedSemaphore(max(max_pending, workers))
+                    self.executor = ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=multiprocessing.get_context('forkserver')
+                    )
+
+        return self.executor
+
+    def run(self, fn, *args):
+        executor = self.get_executor()
+        if executor is None:
+            return fn(*args)
+
+        with self.slots:
+            return executor.submit(fn, *args).result()
+
+    def method(self):
+        return current_app.config.get('PASSWORD_HASH_METHOD', 'scrypt')
+
+    def hash(self, password):
+        salt_length = current_app.config.get('PASSWORD_SALT_LENGTH', 16)
+        return self.run(generate_password_hash, password, self.method(), salt_length)
+
+    def verify(self, password_hash, password):
+        return self.run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        method = self.method()
+        if method not in self.prefixes:
+            self.prefixes[method] = generate_password_hash('', method, 1).split('$', 1)[0]
+
+        return password_hash.split('$', 1)[0] != self.prefixes[method]
+
+    def shutdown(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown()
+            self.executor = None
+            self.slots = None
+
+
+password_hasher = PasswordHasher()
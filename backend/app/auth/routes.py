@@ -1,13 +1,14 @@
 from datetime import datetime, timezone, timedelta
 
 from flask_openapi3 import APIBlueprint, Tag
-from flask_jwt_extended import create_access_token, get_jwt_identity
-from werkzeug.security import generate_password_hash
+from flask_jwt_extended import create_access_token, get_current_user
 
 from backend.extensions import db
 from ..decorators import login_required
 from .email_service import send_verification_email, send_reset_code_email
 from .models import User, VerificationCode
+from .passwords import password_hasher
+from .current_user import build_token_claims
 from .schemas import (
     LoginBody, LoginResponse, RegisterBody, RegisterResponse,
     VerifyRegistrationBody, MessageResponse, ProfileResponse,
@@ -25,10 +26,11 @@ auth_bp = APIBlueprint('auth', __name__, url_prefix='/api/auth', abp_tags=[auth_
 def login(body: LoginBody):
     user = User.query.filter_by(email=body.email).first()
 
-    if user and user.check_password(body.password):
+    if user and user.check_password_and_upgrade(body.password):
+        db.session.commit()
         access_token = create_access_token(
             identity=user.email,
-            additional_claims={"role": user.role, "username": user.username}
+            additional_claims=build_token_claims(user)
         )
         return {"access_token": access_token}, 200
     else:
@@ -52,7 +54,7 @@ def register(body: RegisterBody):
         purpose='registration',
         expires_at=expires_at,
         pending_username=body.username,
-        pending_password_hash=generate_password_hash(body.password),
+        pending_password_hash=password_hasher.hash(body.password),
         pending_role=body.role
     )
 
@@ -102,8 +104,7 @@ def verify_registration(body: VerifyRegistrationBody):
     security=[{"jwt": []}])
 @login_required
 def get_profile():
-    current_user_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_user_email).first()
+    user = get_current_user()
 
     if not user:
         return {"msg": "User not found"}, 404
@@ -121,8 +122,7 @@ def get_profile():
     security=[{"jwt": []}])
 @login_required
 def update_profile(body: UpdateProfileBody):
-    current_user_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_user_email).first()
+    user = get_current_user()
 
     if not user:
         return {"msg": "User not found"}, 404
@@ -145,8 +145,7 @@ def update_profile(body: UpdateProfileBody):
     security=[{"jwt": []}])
 @login_required
 def change_password(body: ChangePasswordBody):
-    current_user_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_user_email).first()
+    user = get_current_user()
 
     if not user:
         return {"msg": "User not found"}, 404
@@ -0,0 +1,44 @@
+from backend.extensions import db
+from .models import VerificationCode, EmailOutbox
+
+from sqlalchemy import or_
+from datetime import datetime, timezone, timedelta
+
+
+def purge_verification_codes(batch_size=1000):
+    now = datetime.now(timezone.utc)
+    total = 0
+
+    while True:
+        batch = db.session.query(VerificationCode.id).filter(
+            or_(VerificationCode.used.is_(True), VerificationCode.expires_at < now)
+        ).order_by(VerificationCode.id).limit(batch_size).scalar_subquery()
+
+        deleted = VerificationCode.query.filter(
+            VerificationCode.id.in_(batch)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+
+def purge_email_outbox(retention_days, batch_size=1000):
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    total = 0
+
+    while True:
+        batch = db.session.query(EmailOutbox.id).filter(
+            EmailOutbox.status.in_(['sent', 'failed']),
+            EmailOutbox.created_at < cutoff
+        ).order_by(EmailOutbox.id).limit(batch_size).scalar_subquery()
+
+        deleted = EmailOutbox.query.filter(
+            EmailOutbox.id.in_(batch)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+
+        total += deleted
+        if deleted < batch_size:
+            return total
@@ -3,11 +3,14 @@ from sqlalchemy import func
 
 from backend.extensions import db
 from ..auth.models import User
-from ..models import Recipe, Rating, ChefProfile
+from ..models import Recipe, ChefProfile
+from ..rating.services import get_author_rating_totals
+from ..recipe.services import RECIPE_CARD_COLUMNS, serialize_chef_recipe_summaries
 from ..utils.storage import build_image_url
+from ..utils.fields import parse_fields
 from .schemas import (
     ChefPublicProfileResponse, ChefRecipesResponse,
-    MessageResponse, ChefIdPath,
+    MessageResponse, ChefIdPath, ChefRecipesQuery, ChefRecipeSummary,
 )
 
 
@@ -34,13 +37,7 @@ def get_public_chef_profile(path: ChefIdPath):
 
     total_recipes = Recipe.query.filter_by(author_id=chef_id).count()
 
-    total_ratings = db.session.query(Rating).join(Recipe).filter(
-        Recipe.author_id == chef_id
-    ).count()
-
-    avg_rating = db.session.query(func.avg(Rating.score)).join(Recipe).filter(
-        Recipe.author_id == chef_id
-    ).scalar()
+    total_ratings, avg_rating = get_author_rating_totals(chef_id)
 
     categories = db.session.query(
         Recipe.category,
@@ -56,24 +53,10 @@ def get_public_chef_profile(path: ChefIdPath):
         "recipes_by_category": {cat: count for cat, count in categories if cat},
     }
 
-    recipes_list = Recipe.query.filter_by(author_id=chef_id).order_by(Recipe.created_at.desc()).all()
-    recipes = []
-    for recipe in recipes_list:
-        r_avg = db.session.query(func.avg(Rating.score)).filter(Rating.recipe_id == recipe.id).scalar()
-        r_cnt = Rating.query.filter_by(recipe_id=recipe.id).count()
-
-        recipes.append({
-            "id": recipe.id,
-            "title": recipe.title,
-            "description": recipe.description,
-            "image_url": build_image_url(recipe.image_name),
-            "category": recipe.category,
-            "cuisine": recipe.cuisine,
-            "num_ingredients": recipe.num_ingredients,
-            "average_rating": round(r_avg, 1) if r_avg else None,
-            "rating_count": r_cnt,
-            "created_at": recipe.created_at.isoformat() if recipe.created_at else None,
-        })
+    recipes_list = Recipe.query.options(RECIPE_CARD_COLUMNS).filter_by(
+        author_id=chef_id
+    ).order_by(Recipe.created_at.desc()).all()
+    recipes = serialize_chef_recipe_summaries(recipes_list)
 
     return {
         "chef_id": chef_user.id,
@@ -89,32 +72,23 @@ def get_public_chef_profile(path: ChefIdPath):
 
 @public_chef_bp.get(
     "/chefs/<int:chef_id>/recipes",
-    responses={"200": ChefRecipesResponse, "404": MessageResponse},
+    responses={"200": ChefRecipesResponse, "400": MessageResponse, "404": MessageResponse},
 )
-def get_public_chef_recipes(path: ChefIdPath):
+def get_public_chef_recipes(path: ChefIdPath, query: ChefRecipesQuery):
     chef_id = path.chef_id
 
     chef_user = db.session.get(User, chef_id)
     if not chef_user or chef_user.role not in ("chef", "admin"):
         return {"msg": "Chef not found"}, 404
 
-    recipes_list = Recipe.query.filter_by(author_id=chef_id).order_by(Recipe.created_at.desc()).all()
-    recipes = []
-    for recipe in recipes_list:
-        r_avg = db.session.query(func.avg(Rating.score)).filter(Rating.recipe_id == recipe.id).scalar()
-        r_cnt = Rating.query.filter_by(recipe_id=recipe.id).count()
-
-        recipes.append({
-            "id": recipe.id,
-            "title": recipe.title,
-            "description": recipe.description,
-            "image_url": build_image_url(recipe.image_name),
-            "category": recipe.category,
-            "cuisine": recipe.cuisine,
-            "num_ingredients": recipe.num_ingredients,
-            "average_rating": round(r_avg, 1) if r_avg else None,
-            "rating_count": r_cnt,
-            "created_at": recipe.created_at.isoformat() if recipe.created_at else None,
-        })
+    try:
+        fields = parse_fields(query.fields, ChefRecipeSummary.model_fields)
+    except ValueError as e:
+        return {"msg": str(e)}, 400
+
+    recipes_list = Recipe.query.options(RECIPE_CARD_COLUMNS).filter_by(
+        author_id=chef_id
+    ).order_by(Recipe.created_at.desc()).all()
+    recipes = serialize_chef_recipe_summaries(recipes_list, fields)
 
     return {"recipes": recipes}, 200
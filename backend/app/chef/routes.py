@@ -1,18 +1,20 @@
 from flask_openapi3 import APIBlueprint, Tag
-from flask_jwt_extended import get_jwt_identity
+from flask_jwt_extended import get_current_user
 from sqlalchemy import func
 
 from backend.extensions import db
-from ..auth.models import User
 from ..auth.schemas import UnauthorizedResponse
-from ..models import Recipe, Ingredient, RecipeIngredient, Rating, ChefProfile
+from ..models import Recipe, Ingredient, RecipeIngredient, ChefProfile
+from ..rating.services import get_author_rating_totals
+from ..recipe.services import RECIPE_CARD_COLUMNS, serialize_chef_recipe_summaries
 from ..utils.unit_converter import format_quantity_with_conversions
 from ..utils.storage import build_image_url
+from ..utils.fields import parse_fields
 from ..decorators import chef_required
 from .schemas import (
     RecipeIdPath, ChefRecipesResponse, CreateRecipeBody, RecipeResponse,
     ChefRecipeDetail, UpdateRecipeBody, MessageResponse, ChefStatsResponse,
-    ChefProfileResponse, UpdateChefProfileBody,
+    ChefProfileResponse, UpdateChefProfileBody, ChefRecipesQuery, ChefRecipeSummary,
 )
 
 
@@ -24,40 +26,24 @@ chef_bp = APIBlueprint(
 )
 
 
-@chef_bp.get('/recipes', responses={"200": ChefRecipesResponse, "404": MessageResponse})
+@chef_bp.get('/recipes',
+    responses={"200": ChefRecipesResponse, "400": MessageResponse, "404": MessageResponse})
 @chef_required
-def get_chef_recipes():
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+def get_chef_recipes(query: ChefRecipesQuery):
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
 
-    query = Recipe.query.filter_by(author_id=user.id).order_by(
+    try:
+        fields = parse_fields(query.fields, ChefRecipeSummary.model_fields)
+    except ValueError as e:
+        return {'msg': str(e)}, 400
+
+    recipes_list = Recipe.query.options(RECIPE_CARD_COLUMNS).filter_by(author_id=user.id).order_by(
         Recipe.created_at.desc()
-    )
-    recipes_list = query.all()
-
-    recipes = []
-    for recipe in recipes_list:
-        avg_rating = db.session.query(func.avg(Rating.score)).filter(
-            Rating.recipe_id == recipe.id
-        ).scalar()
-
-        rating_count = Rating.query.filter_by(recipe_id=recipe.id).count()
-
-        recipes.append({
-            'id': recipe.id,
-            'title': recipe.title,
-            'description': recipe.description,
-            'image_url': build_image_url(recipe.image_name),
-            'category': recipe.category,
-            'cuisine': recipe.cuisine,
-            'num_ingredients': recipe.num_ingredients,
-            'average_rating': round(avg_rating, 1) if avg_rating else None,
-            'rating_count': rating_count,
-            'created_at': recipe.created_at.isoformat() if recipe.created_at else None
-        })
+    ).all()
+    recipes = serialize_chef_recipe_summaries(recipes_list, fields)
 
     return {'recipes': recipes}, 200
 
@@ -65,8 +51,7 @@ def get_chef_recipes():
 @chef_bp.post('/recipes', responses={"201": RecipeResponse, "404": MessageResponse})
 @chef_required
 def create_recipe(body: CreateRecipeBody):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -116,8 +101,7 @@ def create_recipe(body: CreateRecipeBody):
 @chef_required
 def get_recipe_for_edit(path: RecipeIdPath):
     recipe_id = path.recipe_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -161,8 +145,7 @@ def get_recipe_for_edit(path: RecipeIdPath):
 @chef_required
 def update_recipe(path: RecipeIdPath, body: UpdateRecipeBody):
     recipe_id = path.recipe_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -224,8 +207,7 @@ def update_recipe(path: RecipeIdPath, body: UpdateRecipeBody):
 @chef_required
 def delete_recipe(path: RecipeIdPath):
     recipe_id = path.recipe_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -246,21 +228,14 @@ def delete_recipe(path: RecipeIdPath):
 @chef_bp.get('/stats', responses={"200": ChefStatsResponse, "404": MessageResponse})
 @chef_required
 def get_chef_stats():
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
 
     total_recipes = Recipe.query.filter_by(author_id=user.id).count()
 
-    total_ratings = db.session.query(Rating).join(Recipe).filter(
-        Recipe.author_id == user.id
-    ).count()
-
-    avg_rating = db.session.query(func.avg(Rating.score)).join(Recipe).filter(
-        Recipe.author_id == user.id
-    ).scalar()
+    total_ratings, avg_rating = get_author_rating_totals(user.id)
 
     categories = db.session.query(
         Recipe.category,
@@ -282,8 +257,7 @@ def get_chef_stats():
 @chef_bp.get('/profile', responses={"200": ChefProfileResponse})
 @chef_required
 def get_chef_profile():
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -309,8 +283,7 @@ def get_chef_profile():
 @chef_bp.put('/profile', responses={"200": MessageResponse})
 @chef_required
 def update_chef_profile(body: UpdateChefProfileBody):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
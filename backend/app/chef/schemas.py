@@ -127,3 +127,7 @@ class ChefPublicProfileResponse(BaseModel):
 
 class ChefIdPath(BaseModel):
     chef_id: int
+
+
+class ChefRecipesQuery(BaseModel):
+    fields: Optional[str] = None
@@ -0,0 +1,60 @@
+import click
+from flask import current_app
+
+from backend.extensions import db
+from .rating.services import rebuild_rating_stats
+from .auth.email_dispatcher import dispatch_pending_emails
+from .auth.services import purge_verification_codes, purge_email_outbox
+from .fridge.services import purge_fridge_deletions
+
+
+@click.command('rebuild-rating-stats')
+@click.option('--recipe-id', type=int, default=None, help='Only rebuild stats for this recipe.')
+def rebuild_rating_stats_command(recipe_id):
+    rebuild_rating_stats(db.session.connection(), recipe_id)
+    db.session.commit()
+    click.echo('Recipe rating stats rebuilt.')
+
+
+@click.command('send-queued-emails')
+def send_queued_emails_command():
+    total = 0
+    while True:
+        processed = dispatch_pending_emails()
+        total += processed
+        if not processed:
+            break
+    click.echo(f'Processed {total} queued emails.')
+
+
+@click.command('purge-verification-codes')
+@click.option('--batch-size', type=int, default=1000, help='Rows deleted per transaction.')
+def purge_verification_codes_command(batch_size):
+    deleted = purge_verification_codes(batch_size)
+    click.echo(f'Deleted {deleted} expired or used verification codes.')
+
+
+@click.command('purge-email-outbox')
+@click.option('--days', type=int, default=None, help='Keep sent and failed emails newer than this many days.')
+@click.option('--batch-size', type=int, default=1000, help='Rows deleted per transaction.')
+def purge_email_outbox_command(days, batch_size):
+    if days is None:
+        days = current_app.config.get('EMAIL_RETENTION_DAYS', 7)
+    deleted = purge_email_outbox(days, batch_size)
+    click.echo(f'Deleted {deleted} sent or failed queued emails.')
+
+
+@click.command('purge-fridge-deletions')
+@click.option('--batch-size', type=int, default=1000, help='Rows deleted per transaction.')
+def purge_fridge_deletions_command(batch_size):
+    days = current_app.config.get('FRIDGE_DELETION_RETENTION_DAYS', 30)
+    deleted = purge_fridge_deletions(days, batch_size)
+    click.echo(f'Deleted {deleted} fridge deletion records.')
+
+
+def register_commands(app):
+    app.cli.add_command(rebuild_rating_stats_command)
+    app.cli.add_command(send_queued_emails_command)
+    app.cli.add_command(purge_verification_codes_command)
+    app.cli.add_command(purge_email_outbox_command)
+    app.cli.add_command(purge_fridge_deletions_command)
@@ -1,20 +1,23 @@
-from .auth.models import User
-
 from flask import jsonify
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended import get_current_user, get_jwt, verify_jwt_in_request
 
 from functools import wraps
 
 
+def current_role():
+    role = get_jwt().get('role')
+    if role is None:
+        user = get_current_user()
+        role = user.role if user else None
+    return role
+
+
 def admin_required(fn):
     @wraps(fn)
     def decorator(*args, **kwargs):
         verify_jwt_in_request()
 
-        current_user_email = get_jwt_identity()
-        user = User.query.filter_by(email=current_user_email).first()
-
-        if user and user.role == 'admin':
+        if current_role() == 'admin':
             return fn(*args, **kwargs)
         else:
             return jsonify(msg="Admins only! You don't have permission."), 403
@@ -26,10 +29,7 @@ def chef_required(fn):
     def decorator(*args, **kwargs):
         verify_jwt_in_request()
 
-        current_user_email = get_jwt_identity()
-        user = User.query.filter_by(email=current_user_email).first()
-
-        if user and user.role in ['chef', 'admin']:
+        if current_role() in ['chef', 'admin']:
             return fn(*args, **kwargs)
         else:
             return jsonify(msg="Chef or Admin access required."), 403
@@ -1,16 +1,18 @@
 from flask_openapi3 import APIBlueprint, Tag
-from flask_jwt_extended import get_jwt_identity
+from flask_jwt_extended import get_current_user
+from sqlalchemy.orm import joinedload
 
 from backend.extensions import db
-from ..auth.models import User
 from ..auth.schemas import UnauthorizedResponse
 from ..decorators import login_required
 from ..models import FridgeItem, Ingredient
-from ..utils.unit_converter import format_quantity_with_conversions
+from .services import (
+    batch_add_fridge_items, delete_fridge_items, get_fridge_page, serialize_fridge_item
+)
 from .schemas import (
     ItemIdPath, FridgeListResponse, AddFridgeItemBody, FridgeItemResponse,
     UpdateFridgeItemBody, MessageResponse, BatchAddBody, BatchAddResponse,
-    FridgeStatsResponse, FridgeSearchQuery
+    FridgeStatsResponse, FridgeSearchQuery, FridgeListQuery
 )
 
 
@@ -22,49 +24,33 @@ fridge_bp = APIBlueprint(
 )
 
 
-@fridge_bp.get('/items', responses={"200": FridgeListResponse, "404": MessageResponse})
+@fridge_bp.get('/items',
+    responses={"200": FridgeListResponse, "400": MessageResponse, "404": MessageResponse})
 @login_required
-def get_fridge_items():
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+def get_fridge_items(query: FridgeListQuery):
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
 
-    items = FridgeItem.query.filter_by(user_id=user.id).order_by(
-        FridgeItem.added_at.desc()
-    ).all()
-
-    result_items = []
-    for item in items:
-        formatted = format_quantity_with_conversions(
-            item.quantity, item.unit, include_conversions=False
+    try:
+        result = get_fridge_page(
+            user.id,
+            limit=query.limit,
+            cursor=query.cursor,
+            since=query.since
         )
-        result_items.append({
-            'id': item.id,
-            'ingredient': {
-                'id': item.ingredient.id,
-                'name': item.ingredient.name,
-                'default_unit': item.ingredient.default_unit
-            },
-            'quantity': formatted['quantity'],
-            'unit': formatted['unit'],
-            'alternatives': formatted['alternatives'],
-            'added_at': item.added_at.isoformat() if item.added_at else None
-        })
+    except ValueError as e:
+        return {'msg': str(e)}, 400
 
-    return {
-        'items': result_items,
-        'total': len(items)
-    }, 200
+    return result, 200
 
 
 @fridge_bp.post('/items',
     responses={"201": FridgeItemResponse, "404": MessageResponse, "409": MessageResponse})
 @login_required
 def add_fridge_item(body: AddFridgeItemBody):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -97,26 +83,9 @@ def add_fridge_item(body: AddFridgeItemBody):
     db.session.add(fridge_item)
     db.session.commit()
 
-    formatted = format_quantity_with_conversions(
-        fridge_item.quantity,
-        fridge_item.unit,
-        include_conversions=False
-    )
-
     return {
         'msg': 'Item added to fridge',
-        'item': {
-            'id': fridge_item.id,
-            'ingredient': {
-                'id': ingredient.id,
-                'name': ingredient.name,
-                'default_unit': ingredient.default_unit
-            },
-            'quantity': formatted['quantity'],
-            'unit': formatted['unit'],
-            'alternatives': formatted['alternatives'],
-            'added_at': fridge_item.added_at.isoformat() if fridge_item.added_at else None
-        }
+        'item': serialize_fridge_item(fridge_item)
     }, 201
 
 
@@ -124,8 +93,7 @@ def add_fridge_item(body: AddFridgeItemBody):
 @login_required
 def update_fridge_item(path: ItemIdPath, body: UpdateFridgeItemBody):
     item_id = path.item_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -141,26 +109,9 @@ def update_fridge_item(path: ItemIdPath, body: UpdateFridgeItemBody):
 
     db.session.commit()
 
-    formatted = format_quantity_with_conversions(
-        item.quantity,
-        item.unit,
-        include_conversions=False
-    )
-
     return {
         'msg': 'Item updated',
-        'item': {
-            'id': item.id,
-            'ingredient': {
-                'id': item.ingredient.id,
-                'name': item.ingredient.name,
-                'default_unit': item.ingredient.default_unit
-            },
-            'quantity': formatted['quantity'],
-            'unit': formatted['unit'],
-            'alternatives': formatted['alternatives'],
-            'added_at': item.added_at.isoformat() if item.added_at else None
-        }
+        'item': serialize_fridge_item(item)
     }, 200
 
 
@@ -168,19 +119,14 @@ def update_fridge_item(path: ItemIdPath, body: UpdateFridgeItemBody):
 @login_required
 def delete_fridge_item(path: ItemIdPath):
     item_id = path.item_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
 
-    item = FridgeItem.query.filter_by(id=item_id, user_id=user.id).first()
-    if not item:
+    if not delete_fridge_items(user.id, item_id):
         return {'msg': 'Item not found'}, 404
 
-    db.session.delete(item)
-    db.session.commit()
-
     return {'msg': 'Item removed from fridge'}, 200
 
 
@@ -188,108 +134,52 @@ def delete_fridge_item(path: ItemIdPath):
     responses={"200": FridgeListResponse, "400": MessageResponse, "404": MessageResponse})
 @login_required
 def search_fridge(query: FridgeSearchQuery):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
 
-    q = query.q
-
-    items = FridgeItem.query.join(Ingredient).filter(
-        FridgeItem.user_id == user.id,
-        Ingredient.name.ilike(f'%{q}%')
-    ).all()
-
-    result_items = []
-    for item in items:
-        formatted = format_quantity_with_conversions(
-            item.quantity, item.unit, include_conversions=False
+    try:
+        result = get_fridge_page(
+            user.id,
+            search=query.q,
+            limit=query.limit,
+            cursor=query.cursor
         )
-        result_items.append({
-            'id': item.id,
-            'ingredient': {
-                'id': item.ingredient.id,
-                'name': item.ingredient.name,
-                'default_unit': item.ingredient.default_unit
-            },
-            'quantity': formatted['quantity'],
-            'unit': formatted['unit'],
-            'alternatives': formatted['alternatives'],
-            'added_at': item.added_at.isoformat() if item.added_at else None
-        })
+    except ValueError as e:
+        return {'msg': str(e)}, 400
 
-    return {
-        'items': result_items,
-        'total': len(result_items)
-    }, 200
+    return result, 200
 
 
 @fridge_bp.post('/batch', responses={"200": BatchAddResponse, "404": MessageResponse})
 @login_required
 def batch_add_items(body: BatchAddBody):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
 
-    added_count = 0
-    updated_count = 0
-    errors = []
-
-    for item_data in body.items:
-        ingredient = None
-        if item_data.ingredient_id:
-            ingredient = db.session.get(Ingredient, item_data.ingredient_id)
-        elif item_data.ingredient_name:
-            ingredient = Ingredient.query.filter(
-                Ingredient.name.ilike(item_data.ingredient_name.strip())
-            ).first()
-
-        if not ingredient:
-            errors.append('Ingredient not found')
-            continue
-
-        existing = FridgeItem.query.filter_by(
-            user_id=user.id,
-            ingredient_id=ingredient.id
-        ).first()
-
-        if existing:
-            existing.quantity = (existing.quantity or 0) + (item_data.quantity or 0)
-            updated_count += 1
-        else:
-            new_item = FridgeItem(
-                user_id=user.id,
-                ingredient_id=ingredient.id,
-                quantity=item_data.quantity,
-                unit=item_data.unit
-            )
-            db.session.add(new_item)
-            added_count += 1
-
-    db.session.commit()
+    results = batch_add_fridge_items(user.id, body.items)
 
     return {
         'msg': 'Batch add completed',
-        'added': added_count,
-        'updated': updated_count,
-        'errors': errors
+        'added': sum(1 for r in results if r['status'] == 'added'),
+        'updated': sum(1 for r in results if r['status'] == 'updated'),
+        'errors': [r['error'] for r in results if r['status'] == 'error'],
+        'results': results
     }, 200
 
 
 @fridge_bp.delete('/clear', responses={"200": MessageResponse, "404": MessageResponse})
 @login_required
 def clear_fridge():
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
 
-    count = FridgeItem.query.filter_by(user_id=user.id).delete()
-    db.session.commit()
+    count = delete_fridge_items(user.id)
 
     return {'msg': f'Cleared {count} items from fridge'}, 200
 
@@ -297,15 +187,16 @@ def clear_fridge():
 @fridge_bp.get('/stats', responses={"200": FridgeStatsResponse, "404": MessageResponse})
 @login_required
 def get_fridge_stats():
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
 
     total_items = FridgeItem.query.filter_by(user_id=user.id).count()
-    recent_items = FridgeItem.query.filter_by(user_id=user.id).order_by(
-        FridgeItem.added_at.desc()
+    recent_items = FridgeItem.query.options(
+        joinedload(FridgeItem.ingredient, innerjoin=True)
+    ).filter_by(user_id=user.id).order_by(
+        FridgeItem.added_at.desc(), FridgeItem.id.desc()
     ).limit(5).all()
 
     return {
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional
+from datetime import datetime
 
 
 class ItemIdPath(BaseModel):
@@ -24,11 +25,22 @@ class FridgeItemDetail(BaseModel):
     unit: str
     alternatives: list[AlternativeUnit] = []
     added_at: Optional[str]
+    updated_at: Optional[str] = None
 
 
 class FridgeListResponse(BaseModel):
     items: list[FridgeItemDetail]
     total: int
+    next_cursor: Optional[str] = None
+    synced_at: Optional[str] = None
+    deleted_ids: Optional[list[int]] = None
+    resync_required: Optional[bool] = None
+
+
+class FridgeListQuery(BaseModel):
+    limit: Optional[int] = Field(None, ge=1, le=100)
+    cursor: Optional[str] = None
+    since: Optional[datetime] = None
 
 
 class AddFridgeItemBody(BaseModel):
@@ -63,11 +75,22 @@ class BatchAddBody(BaseModel):
     items: list[BatchAddItem] = Field(min_length=1)
 
 
+class BatchItemResult(BaseModel):
+    index: int
+    ingredient_id: Optional[int] = None
+    ingredient_name: Optional[str] = None
+    status: str
+    quantity: Optional[float] = None
+    unit: Optional[str] = None
+    error: Optional[str] = None
+
+
 class BatchAddResponse(BaseModel):
     msg: str
     added: int
     updated: int
     errors: list[str] = []
+    results: list[BatchItemResult] = []
 
 
 class RecentItem(BaseModel):
@@ -83,3 +106,5 @@ class FridgeStatsResponse(BaseModel):
 
 class FridgeSearchQuery(BaseModel):
     q: str = Field(min_length=2)
+    limit: Optional[int] = Field(None, ge=1, le=100)
+    cursor: Optional[str] = None
@@ -0,0 +1,279 @@
+from flask import current_app
+from sqlalchemy import delete, func, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import joinedload, contains_eager
+
+from backend.extensions import db
+from ..models import FridgeItem, FridgeItemDeletion, Ingredient
+from ..utils.unit_converter import convert_unit, format_quantity_with_conversions
+
+import base64
+import json
+from datetime import datetime, timedelta
+
+
+def serialize_fridge_item(item):
+    formatted = format_quantity_with_conversions(
+        item.quantity, item.unit, include_conversions=False
+    )
+    return {
+        'id': item.id,
+        'ingredient': {
+            'id': item.ingredient.id,
+            'name': item.ingredient.name,
+            'default_unit': item.ingredient.default_unit
+        },
+        'quantity': formatted['quantity'],
+        'unit': formatted['unit'],
+        'alternatives': formatted['alternatives'],
+        'added_at': item.added_at.isoformat() if item.added_at else None,
+        'updated_at': item.updated_at.isoformat() if item.updated_at else None
+    }
+
+
+def encode_cursor(mode, value, item_id):
+    payload = json.dumps([mode, value.isoformat(), item_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, mode):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_mode, value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value = datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+    if cursor_mode != mode or not isinstance(last_id, int):
+        raise ValueError('Cursor does not match the requested listing')
+
+    return value, last_id
+
+
+def get_fridge_page(user_id, search=None, limit=None, cursor=None, since=None):
+    query = FridgeItem.query.filter(FridgeItem.user_id == user_id)
+    if search:
+        query = query.join(FridgeItem.ingredient).filter(
+            Ingredient.name.ilike(f'%{search}%')
+        ).options(contains_eager(FridgeItem.ingredient))
+    else:
+        query = query.options(joinedload(FridgeItem.ingredient, innerjoin=True))
+
+    result = {'items': [], 'total': 0, 'next_cursor': None}
+
+    if since:
+        if since.tzinfo:
+            since = since.astimezone().replace(tzinfo=None)
+
+        now = datetime.now()
+        retention = timedelta(days=current_app.config.get('FRIDGE_DELETION_RETENTION_DAYS', 30))
+        if since < now - retention:
+            result['resync_required'] = True
+            return result
+
+        overlap = timedelta(seconds=current_app.config.get('FRIDGE_SYNC_OVERLAP', 30))
+        result['synced_at'] = (now - overlap).isoformat()
+        if not cursor:
+            result['deleted_ids'] = get_deleted_item_ids(user_id, since)
+        query = query.filter(FridgeItem.updated_at > since)
+        mode, sort_column = 'since', FridgeItem.updated_at
+    else:
+        mode, sort_column = 'added', FridgeItem.added_at
+
+    if limit:
+        result['total'] = query.order_by(None).count()
+
+    keyset = tuple_(sort_column, FridgeItem.id)
+    if cursor:
+        value, last_id = decode_cursor(cursor, mode)
+        if mode == 'since':
+            query = query.filter(keyset > tuple_(value, last_id))
+        else:
+            query = query.filter(keyset < tuple_(value, last_id))
+
+    if mode == 'since':
+        query = query.order_by(sort_column.asc(), FridgeItem.id.asc())
+    else:
+        query = query.order_by(sort_column.desc(), FridgeItem.id.desc())
+
+    if limit:
+        items = query.limit(limit + 1).all()
+        if len(items) > limit:
+            items = items[:limit]
+            last_item = items[-1]
+            result['next_cursor'] = encode_cursor(
+                mode, getattr(last_item, sort_column.key), last_item.id
+            )
+    else:
+        items = query.all()
+        result['total'] = len(items)
+
+    result['items'] = [serialize_fridge_item(item) for item in items]
+    return result
+
+
+def get_deleted_item_ids(user_id, since):
+    rows = db.session.query(FridgeItemDeletion.item_id).filter(
+        FridgeItemDeletion.user_id == user_id,
+        FridgeItemDeletion.deleted_at > since
+    ).order_by(FridgeItemDeletion.item_id).distinct().all()
+    return [row.item_id for row in rows]
+
+
+def delete_fridge_items(user_id, item_id=None):
+    statement = delete(FridgeItem).where(FridgeItem.user_id == user_id)
+    if item_id is not None:
+        statement = statement.where(FridgeItem.id == item_id)
+
+    deleted_ids = db.session.execute(
+        statement.returning(FridgeItem.id),
+        execution_options={'synchronize_session': False}
+    ).scalars().all()
+
+    if deleted_ids:
+        now = datetime.now()
+        db.session.execute(insert(FridgeItemDeletion).values([
+            {'user_id': user_id, 'item_id': deleted_id, 'deleted_at': now}
+            for deleted_id in deleted_ids
+        ]))
+
+    db.session.commit()
+
+    return len(deleted_ids)
+
+
+def purge_fridge_deletions(retention_days, batch_size=1000):
+    cutoff = datetime.now() - timedelta(days=retention_days)
+    total = 0
+
+    while True:
+        batch = db.session.query(FridgeItemDeletion.id).filter(
+            FridgeItemDeletion.deleted_at < cutoff
+        ).order_by(FridgeItemDeletion.id).limit(batch_size).scalar_subquery()
+
+        deleted = FridgeItemDeletion.query.filter(
+            FridgeItemDeletion.id.in_(batch)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+
+def normalize_name(name):
+    return name.strip().lower() if name and name.strip() else None
+
+
+def add_quantities(current, extra):
+    if current is None and extra is None:
+        return None
+    return (current or 0) + (extra or 0)
+
+
+def resolve_ingredients(items):
+    ingredient_ids = {item.ingredient_id for item in items if item.ingredient_id}
+    names = {
+        normalize_name(item.ingredient_name) for item in items
+        if not item.ingredient_id and normalize_name(item.ingredient_name)
+    }
+
+    conditions = []
+    if ingredient_ids:
+        conditions.append(Ingredient.id.in_(ingredient_ids))
+    if names:
+        conditions.append(func.lower(Ingredient.name).in_(names))
+    if not conditions:
+        return [None] * len(items)
+
+    ingredients = Ingredient.query.filter(or_(*conditions)).order_by(Ingredient.id).all()
+    by_id = {ingredient.id: ingredient for ingredient in ingredients}
+    by_name = {}
+    for ingredient in ingredients:
+        by_name.setdefault(ingredient.name.lower(), ingredient)
+
+    return [
+        by_id.get(item.ingredient_id) if item.ingredient_id
+        else by_name.get(normalize_name(item.ingredient_name))
+        for item in items
+    ]
+
+
+def batch_add_fridge_items(user_id, items):
+    ingredients = resolve_ingredients(items)
+    ingredient_ids = {ingredient.id for ingredient in ingredients if ingredient}
+
+    existing_units = {}
+    if ingredient_ids:
+        existing_units = dict(db.session.query(
+            FridgeItem.ingredient_id, FridgeItem.unit
+        ).filter(
+            FridgeItem.user_id == user_id,
+            FridgeItem.ingredient_id.in_(ingredient_ids)
+        ).all())
+
+    now = datetime.now()
+    rows = {}
+    results = []
+    for index, (item, ingredient) in enumerate(zip(items, ingredients)):
+        result = {
+            'index': index,
+            'ingredient_id': ingredient.id if ingredient else item.ingredient_id,
+            'ingredient_name': ingredient.name if ingredient else item.ingredient_name
+        }
+        results.append(result)
+
+        if not ingredient:
+            result.update(status='error', error='Ingredient not found')
+            continue
+
+        if ingredient.id in rows:
+            target_unit = rows[ingredient.id]['unit']
+        elif ingredient.id in existing_units:
+            target_unit = existing_units[ingredient.id]
+        else:
+            target_unit = item.unit or ingredient.default_unit
+
+        quantity = item.quantity
+        unit = item.unit or target_unit
+        if quantity and target_unit and unit != target_unit:
+            quantity = convert_unit(quantity, unit, target_unit)
+            if quantity is None:
+                result.update(status='error', error=f'Cannot convert {unit} to {target_unit}')
+                continue
+
+        if ingredient.id in rows or ingredient.id in existing_units:
+            result['status'] = 'updated'
+        else:
+            result['status'] = 'added'
+
+        if ingredient.id in rows:
+            row = rows[ingredient.id]
+            row['quantity'] = add_quantities(row['quantity'], quantity)
+        else:
+            rows[ingredient.id] = {
+                'user_id': user_id,
+                'ingredient_id': ingredient.id,
+                'quantity': quantity,
+                'unit': target_unit,
+                'added_at': now,
+                'updated_at': now
+            }
+
+        result.update(quantity=quantity, unit=target_unit)
+
+    if rows:
+        statement = insert(FridgeItem).values(list(rows.values()))
+        statement = statement.on_conflict_do_update(
+            index_elements=[FridgeItem.user_id, FridgeItem.ingredient_id],
+            set_={
+                'quantity': func.coalesce(FridgeItem.quantity, 0)
+                + func.coalesce(statement.excluded.quantity, 0),
+                'updated_at': statement.excluded.updated_at
+            }
+        )
+        db.session.execute(statement)
+
+    db.session.commit()
+
+    return results
@@ -1,7 +1,6 @@
-from sqlalchemy import func
-
 from backend.extensions import db
 from .utils.storage import build_image_url
+from .utils.search import build_search_vector
 
 from datetime import datetime
 
@@ -34,6 +33,17 @@ class Recipe(db.Model):
     directions = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.now)
 
+    __table_args__ = (
+        db.Index(
+            'ix_recipe_search_vector',
+            build_search_vector(title, description, directions),
+            postgresql_using='gin'
+        ),
+        db.Index('ix_recipe_created_at_id', created_at, id),
+        db.Index('ix_recipe_title_id', title, id),
+        db.Index('ix_recipe_author_created_at', author_id, created_at),
+    )
+
     author = db.relationship('User', backref='recipes')
     ingredients = db.relationship('RecipeIngredient', back_populates='recipe', cascade='all, delete-orphan')
 
@@ -76,6 +86,45 @@ class MealPlan(db.Model):
         return f'<MealPlan user_id={self.user_id} date={self.plan_date} type={self.meal_type}>'
 
 
+class MealPlanTemplate(db.Model):
+    __tablename__ = 'meal_plan_templates'
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    user_id = db.Column(db.BigInteger, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    name = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'name'),
+    )
+
+    items = db.relationship('MealPlanTemplateItem', back_populates='template', cascade='all, delete-orphan')
+
+    def __repr__(self):
+        return f'<MealPlanTemplate user_id={self.user_id} name={self.name}>'
+
+
+class MealPlanTemplateItem(db.Model):
+    __tablename__ = 'meal_plan_template_items'
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    template_id = db.Column(
+        db.BigInteger, db.ForeignKey('meal_plan_templates.id', ondelete='CASCADE'), nullable=False
+    )
+    day_offset = db.Column(db.Integer, nullable=False)
+    meal_type = db.Column(db.Text, nullable=False)
+    recipe_id = db.Column(db.BigInteger, db.ForeignKey('recipe.id', ondelete='SET NULL'))
+
+    __table_args__ = (
+        db.UniqueConstraint('template_id', 'day_offset', 'meal_type'),
+    )
+
+    template = db.relationship('MealPlanTemplate', back_populates='items')
+
+    def __repr__(self):
+        return f'<MealPlanTemplateItem template_id={self.template_id} day={self.day_offset} type={self.meal_type}>'
+
+
 class ShoppingList(db.Model):
     __tablename__ = 'shopping_list'
 
@@ -89,6 +138,10 @@ class ShoppingList(db.Model):
     source_id = db.Column(db.BigInteger)
     created_at = db.Column(db.DateTime, default=datetime.now)
 
+    __table_args__ = (
+        db.Index('ix_shopping_list_user_ingredient', user_id, ingredient_id, unique=True),
+    )
+
     user = db.relationship('User', backref='shopping_lists')
     ingredient = db.relationship('Ingredient', backref='shopping_lists')
 
@@ -124,9 +177,12 @@ class FridgeItem(db.Model):
     quantity = db.Column(db.Float)
     unit = db.Column(db.Text)
     added_at = db.Column(db.DateTime, default=datetime.now)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
 
     __table_args__ = (
         db.UniqueConstraint('user_id', 'ingredient_id'),
+        db.Index('ix_fridge_items_user_added_at', user_id, added_at, id),
+        db.Index('ix_fridge_items_user_updated_at', user_id, updated_at, id),
     )
 
     user = db.relationship('User', backref='fridge_items')
@@ -136,12 +192,28 @@ class FridgeItem(db.Model):
         return f'<FridgeItem user_id={self.user_id} ingredient={self.ingredient_id}>'
 
 
+class FridgeItemDeletion(db.Model):
+    __tablename__ = 'fridge_item_deletions'
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    user_id = db.Column(db.BigInteger, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    item_id = db.Column(db.BigInteger, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    __table_args__ = (
+        db.Index('ix_fridge_item_deletions_user_deleted_at', user_id, deleted_at),
+    )
+
+    def __repr__(self):
+        return f'<FridgeItemDeletion user_id={self.user_id} item_id={self.item_id}>'
+
+
 class Rating(db.Model):
     __tablename__ = 'ratings'
 
     id = db.Column(db.BigInteger, primary_key=True)
     user_id = db.Column(db.BigInteger, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
-    recipe_id = db.Column(db.BigInteger, db.ForeignKey('recipe.id', ondelete='CASCADE'), nullable=False)
+    recipe_id = db.Column(db.BigInteger, db.ForeignKey('recipe.id', ondelete='CASCADE'), nullable=False, index=True)
     score = db.Column(db.Integer, nullable=False)
     comment = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.now)
@@ -159,6 +231,25 @@ class Rating(db.Model):
         return f'<Rating user_id={self.user_id} recipe_id={self.recipe_id} score={self.score}>'
 
 
+class RecipeRatingStats(db.Model):
+    __tablename__ = 'recipe_rating_stats'
+
+    recipe_id = db.Column(db.BigInteger, db.ForeignKey('recipe.id', ondelete='CASCADE'), primary_key=True)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    average_rating = db.Column(db.Float)
+    score_1_count = db.Column(db.Integer, nullable=False, default=0)
+    score_2_count = db.Column(db.Integer, nullable=False, default=0)
+    score_3_count = db.Column(db.Integer, nullable=False, default=0)
+    score_4_count = db.Column(db.Integer, nullable=False, default=0)
+    score_5_count = db.Column(db.Integer, nullable=False, default=0)
+
+    recipe = db.relationship('Recipe', backref=db.backref('rating_stats', uselist=False, passive_deletes=True))
+
+    def __repr__(self):
+        return f'<RecipeRatingStats recipe_id={self.recipe_id} count={self.rating_count}>'
+
+
 class RecipeCollection(db.Model):
     __tablename__ = 'recipe_collections'
 
@@ -180,23 +271,31 @@ class RecipeCollection(db.Model):
     def __repr__(self):
         return f'<RecipeCollection {self.name} (user_id={self.user_id})>'
 
-    def to_dict(self, include_recipes=False):
+    def to_dict(self, include_recipes=False, recipe_count=None, items=None, ratings=None):
         data = {
             'id': self.id,
             'name': self.name,
             'description': self.description,
             'is_public': self.is_public,
-            'recipe_count': self.items.count(),
+            'recipe_count': self.items.count() if recipe_count is None else recipe_count,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
         if include_recipes:
-            data['recipes'] = [
-                item.to_dict() for item in self.items.order_by(
-                    CollectionItem.added_at.desc()
-                ).all()
-            ]
+            if items is None:
+                items = self.items.options(
+                    db.joinedload(CollectionItem.recipe)
+                ).order_by(CollectionItem.added_at.desc()).all()
+
+            if ratings is None:
+                ratings = {
+                    stats.recipe_id: stats for stats in RecipeRatingStats.query.filter(
+                        RecipeRatingStats.recipe_id.in_([item.recipe_id for item in items])
+                    ).all()
+                }
+
+            data['recipes'] = [item.to_dict(ratings) for item in items]
 
         return data
 
@@ -214,10 +313,12 @@ class CollectionItem(db.Model):
     def __repr__(self):
         return f'<CollectionItem collection_id={self.collection_id} recipe_id={self.recipe_id}>'
 
-    def to_dict(self):
-        avg_rating = db.session.query(func.avg(Rating.score)).filter(
-            Rating.recipe_id == self.recipe_id
-        ).scalar()
+    def to_dict(self, ratings=None):
+        if ratings is None:
+            rating_stats = db.session.get(RecipeRatingStats, self.recipe_id)
+        else:
+            rating_stats = ratings.get(self.recipe_id)
+        avg_rating = rating_stats.average_rating if rating_stats else None
 
         return {
             'recipe_id': self.recipe_id,
@@ -1,21 +1,28 @@
 from datetime import datetime, timedelta
 
+from flask import Response, stream_with_context
 from flask_openapi3 import APIBlueprint, Tag
-from flask_jwt_extended import get_jwt_identity
-from sqlalchemy import func
+from flask_jwt_extended import get_current_user
+from sqlalchemy.exc import IntegrityError
 
 from backend.extensions import db
-from ..auth.models import User
 from ..auth.schemas import UnauthorizedResponse
 from ..decorators import login_required
-from ..models import MealPlan, Recipe, FridgeItem
-from ..utils.unit_converter import get_unit_group, convert_unit, get_primary_unit
-from ..utils.storage import build_image_url
+from ..models import MealPlan, MealPlanTemplate, Recipe
+from .stats import load_planning_stats
+from .services import (
+    find_missing_ingredients, resolve_date_range, iter_plan_days, stream_plan_range,
+    bulk_upsert_meal_plans, copy_meal_plans, get_meal_plan_templates,
+    create_template_from_week, apply_meal_plan_template
+)
 from .schemas import (
     MealIdPath, WeeklyPlanResponse, AddMealBody, MealResponse, UpdateMealBody,
     MessageResponse, NeededIngredientsResponse, BulkImportBody,
     BulkImportResponse, PlanningStatsResponse, ClearWeekResponse,
-    WeeklyPlanQuery, MissingIngredientsQuery, ClearWeekQuery
+    WeeklyPlanQuery, MissingIngredientsQuery, ClearWeekQuery, PlanRangeQuery,
+    PlanRangeResponse, PlanningStatsQuery, CopyWeekBody, CopyWeekResponse,
+    TemplateIdPath, TemplateCreateBody, TemplateResponse, TemplateListResponse,
+    ApplyTemplateBody, ApplyTemplateResponse
 )
 
 
@@ -31,82 +38,48 @@ planning_bp = APIBlueprint(
     responses={"200": WeeklyPlanResponse, "400": MessageResponse, "404": MessageResponse})
 @login_required
 def get_weekly_plan(query: WeeklyPlanQuery):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
 
-    start_date_str = query.start_date
-
-    if start_date_str:
-        try:
-            start_date = datetime.fromisoformat(start_date_str.replace('Z', '+00:00')).date()
-        except ValueError:
-            return {'msg': 'Invalid start_date format. Use ISO format.'}, 400
-    else:
-        today = datetime.now().date()
-        start_date = today - timedelta(days=today.weekday())
-
-    end_date = start_date + timedelta(days=6)
-
-    meal_plans = MealPlan.query.filter(
-        MealPlan.user_id == user.id,
-        MealPlan.plan_date >= start_date,
-        MealPlan.plan_date <= end_date
-    ).all()
-
-    plans_by_date = {}
-    for mp in meal_plans:
-        date_str = mp.plan_date.isoformat()
-        if date_str not in plans_by_date:
-            plans_by_date[date_str] = {}
-
-        recipe_data = None
-        if mp.recipe:
-            recipe_data = {
-                'id': mp.recipe.id,
-                'title': mp.recipe.title,
-                'image_url': build_image_url(mp.recipe.image_name)
-            }
-
-        plans_by_date[date_str][mp.meal_type] = {
-            'id': mp.id,
-            'recipe': recipe_data
-        }
-
-    day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    days = []
-    for i in range(7):
-        current_date = start_date + timedelta(days=i)
-        date_str = current_date.isoformat()
-
-        meals = plans_by_date.get(date_str, {})
-
-        days.append({
-            'date': date_str,
-            'day_name': day_names[i],
-            'meals': {
-                'breakfast': meals.get('breakfast'),
-                'lunch': meals.get('lunch'),
-                'dinner': meals.get('dinner'),
-                'snack': meals.get('snack')
-            }
-        })
+    try:
+        start_date, end_date = resolve_date_range(query.start_date)
+    except ValueError as e:
+        return {'msg': str(e)}, 400
 
     return {
         'week_start': start_date.isoformat(),
         'week_end': end_date.isoformat(),
-        'days': days
+        'days': list(iter_plan_days(user.id, start_date, end_date))
     }, 200
 
 
+@planning_bp.get('/range',
+    responses={"200": PlanRangeResponse, "400": MessageResponse, "404": MessageResponse})
+@login_required
+def get_plan_range(query: PlanRangeQuery):
+    user = get_current_user()
+
+    if not user:
+        return {'msg': 'User not found'}, 404
+
+    try:
+        start_date, end_date = resolve_date_range(query.start_date, query.end_date)
+    except ValueError as e:
+        return {'msg': str(e)}, 400
+
+    return Response(
+        stream_with_context(stream_plan_range(user.id, start_date, end_date)),
+        mimetype='application/json'
+    )
+
+
 @planning_bp.post('/meals',
     responses={"200": MealResponse, "201": MealResponse, "400": MessageResponse, "404": MessageResponse})
 @login_required
 def add_meal(body: AddMealBody):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -155,8 +128,7 @@ def add_meal(body: AddMealBody):
 @login_required
 def update_meal(path: MealIdPath, body: UpdateMealBody):
     meal_id = path.meal_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -193,8 +165,7 @@ def update_meal(path: MealIdPath, body: UpdateMealBody):
 @login_required
 def delete_meal(path: MealIdPath):
     meal_id = path.meal_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -213,120 +184,17 @@ def delete_meal(path: MealIdPath):
     responses={"200": NeededIngredientsResponse, "400": MessageResponse, "404": MessageResponse})
 @login_required
 def get_missing_ingredients(query: MissingIngredientsQuery):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
 
-    start_date_str = query.start_date
-
-    if start_date_str:
-        try:
-            start_date = datetime.fromisoformat(start_date_str.replace('Z', '+00:00')).date()
-        except ValueError:
-            return {'msg': 'Invalid start_date format. Use ISO format.'}, 400
-    else:
-        today = datetime.now().date()
-        start_date = today - timedelta(days=today.weekday())
+    try:
+        start_date, end_date = resolve_date_range(query.start_date, query.end_date)
+    except ValueError as e:
+        return {'msg': str(e)}, 400
 
-    end_date = start_date + timedelta(days=6)
-
-    meal_plans = MealPlan.query.filter(
-        MealPlan.user_id == user.id,
-        MealPlan.plan_date >= start_date,
-        MealPlan.plan_date <= end_date,
-        MealPlan.recipe_id.isnot(None)
-    ).all()
-
-    needed_ingredients = {}
-
-    for mp in meal_plans:
-        if mp.recipe:
-            for ri in mp.recipe.ingredients:
-                ing_id = ri.ingredient_id
-                if ing_id not in needed_ingredients:
-                    needed_ingredients[ing_id] = {
-                        'name': ri.ingredient.name,
-                        'quantities': {},
-                        'unit': ri.unit
-                    }
-
-                unit = ri.unit or 'piece'
-                qty = ri.quantity or 0
-
-                if unit not in needed_ingredients[ing_id]['quantities']:
-                    needed_ingredients[ing_id]['quantities'][unit] = 0
-
-                try:
-                    needed_ingredients[ing_id]['quantities'][unit] += float(qty)
-                except (ValueError, TypeError):
-                    pass
-
-    fridge_items_dict = {
-        item.ingredient_id: {'quantity': item.quantity, 'unit': item.unit}
-        for item in FridgeItem.query.filter_by(user_id=user.id).all()
-    }
-
-    missing = []
-    for ing_id, data in needed_ingredients.items():
-        fridge_data = fridge_items_dict.get(ing_id)
-
-        primary_unit = None
-        total_needed = 0
-        quantities_by_unit = []
-
-        for unit, qty in data['quantities'].items():
-            if qty > 0:
-                unit_group = get_unit_group(unit)
-                if unit_group:
-                    primary = get_primary_unit(unit)
-                    converted = convert_unit(qty, unit, primary)
-                    if converted:
-                        total_needed += converted
-                        primary_unit = primary
-                    else:
-                        total_needed += qty
-                        primary_unit = unit
-                else:
-                    total_needed += qty
-                    primary_unit = unit
-
-                quantities_by_unit.append({
-                    'quantity': round(qty, 2),
-                    'unit': unit
-                })
-
-        fridge_quantity = None
-        is_sufficient = False
-
-        if fridge_data:
-            fridge_qty = fridge_data['quantity'] or 0
-            fridge_unit = fridge_data['unit']
-
-            if primary_unit and fridge_unit:
-                converted_fridge = convert_unit(fridge_qty, fridge_unit, primary_unit)
-                if converted_fridge:
-                    fridge_quantity = round(converted_fridge, 2)
-                    is_sufficient = converted_fridge >= total_needed
-                else:
-                    fridge_quantity = fridge_qty
-            else:
-                fridge_quantity = fridge_qty
-
-        missing.append({
-            'ingredient_id': ing_id,
-            'name': data['name'],
-            'needed_total': round(total_needed, 2) if total_needed else None,
-            'needed_unit': primary_unit,
-            'needed_breakdown': quantities_by_unit,
-            'in_fridge': fridge_quantity,
-            'fridge_unit': fridge_data['unit'] if fridge_data else None,
-            'is_available': fridge_data is not None,
-            'is_sufficient': is_sufficient
-        })
-
-    missing.sort(key=lambda x: (x['is_sufficient'], x['is_available'], x['name']))
+    missing = find_missing_ingredients(user.id, start_date, end_date)
 
     return {
         'week_start': start_date.isoformat(),
@@ -341,80 +209,29 @@ def get_missing_ingredients(query: MissingIngredientsQuery):
 @planning_bp.post('/bulk-import', responses={"200": BulkImportResponse, "404": MessageResponse})
 @login_required
 def bulk_import_meals(body: BulkImportBody):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
 
-    added_count = 0
-    updated_count = 0
-    errors = []
-
-    for meal_data in body.meals:
-        try:
-            plan_date = datetime.fromisoformat(meal_data.plan_date.replace('Z', '+00:00')).date()
-        except ValueError:
-            errors.append(f'Invalid date format: {meal_data.plan_date}')
-            continue
-
-        if meal_data.recipe_id:
-            recipe = db.session.get(Recipe, meal_data.recipe_id)
-            if not recipe:
-                errors.append(f'Recipe not found: {meal_data.recipe_id}')
-                continue
-
-        existing = MealPlan.query.filter_by(
-            user_id=user.id,
-            plan_date=plan_date,
-            meal_type=meal_data.meal_type
-        ).first()
-
-        if existing:
-            existing.recipe_id = meal_data.recipe_id
-            updated_count += 1
-        else:
-            meal_plan = MealPlan(
-                user_id=user.id,
-                plan_date=plan_date,
-                meal_type=meal_data.meal_type,
-                recipe_id=meal_data.recipe_id
-            )
-            db.session.add(meal_plan)
-            added_count += 1
-
-    db.session.commit()
+    result = bulk_upsert_meal_plans(user.id, body.meals)
 
-    return {
-        'msg': 'Bulk import completed',
-        'added': added_count,
-        'updated': updated_count,
-        'errors': errors
-    }, 200
+    return {'msg': 'Bulk import completed', **result}, 200
 
 
 @planning_bp.delete('/clear-week',
     responses={"200": ClearWeekResponse, "400": MessageResponse, "404": MessageResponse})
 @login_required
 def clear_week(query: ClearWeekQuery):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
 
-    start_date_str = query.start_date
-
-    if start_date_str:
-        try:
-            start_date = datetime.fromisoformat(start_date_str.replace('Z', '+00:00')).date()
-        except ValueError:
-            return {'msg': 'Invalid start_date format. Use ISO format.'}, 400
-    else:
-        today = datetime.now().date()
-        start_date = today - timedelta(days=today.weekday())
-
-    end_date = start_date + timedelta(days=6)
+    try:
+        start_date, end_date = resolve_date_range(query.start_date, query.end_date)
+    except ValueError as e:
+        return {'msg': str(e)}, 400
 
     count = MealPlan.query.filter(
         MealPlan.user_id == user.id,
@@ -432,46 +249,133 @@ def clear_week(query: ClearWeekQuery):
     }, 200
 
 
-@planning_bp.get('/stats', responses={"200": PlanningStatsResponse, "404": MessageResponse})
+@planning_bp.post('/copy-week',
+    responses={"200": CopyWeekResponse, "400": MessageResponse, "404": MessageResponse})
 @login_required
-def get_planning_stats():
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+def copy_week(body: CopyWeekBody):
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
 
-    total_plans = MealPlan.query.filter_by(user_id=user.id).count()
+    try:
+        source_start, _ = resolve_date_range(body.source_start)
+        target_start, target_end = resolve_date_range(body.target_start)
+    except ValueError as e:
+        return {'msg': str(e)}, 400
 
-    plans_with_recipes = MealPlan.query.filter(
-        MealPlan.user_id == user.id,
-        MealPlan.recipe_id.isnot(None)
-    ).count()
+    if source_start == target_start:
+        return {'msg': 'Source and target weeks must differ'}, 400
 
-    today = datetime.now().date()
-    week_start = today - timedelta(days=today.weekday())
-    week_end = week_start + timedelta(days=6)
+    count = copy_meal_plans(user.id, source_start, target_start, overwrite=body.overwrite)
 
-    current_week_plans = MealPlan.query.filter(
-        MealPlan.user_id == user.id,
-        MealPlan.plan_date >= week_start,
-        MealPlan.plan_date <= week_end
-    ).count()
+    return {
+        'msg': f'Copied {count} meal plans',
+        'copied_count': count,
+        'week_start': target_start.isoformat(),
+        'week_end': target_end.isoformat()
+    }, 200
 
-    meal_type_counts = db.session.query(
-        MealPlan.meal_type,
-        func.count(MealPlan.id)
-    ).filter(
-        MealPlan.user_id == user.id
-    ).group_by(MealPlan.meal_type).all()
 
-    meal_type_distribution = {meal_type: count for meal_type, count in meal_type_counts}
+@planning_bp.get('/templates', responses={"200": TemplateListResponse, "404": MessageResponse})
+@login_required
+def list_templates():
+    user = get_current_user()
+
+    if not user:
+        return {'msg': 'User not found'}, 404
+
+    return {'templates': get_meal_plan_templates(user.id)}, 200
+
+
+@planning_bp.post('/templates',
+    responses={"201": TemplateResponse, "400": MessageResponse, "404": MessageResponse, "409": MessageResponse})
+@login_required
+def create_template(body: TemplateCreateBody):
+    user = get_current_user()
+
+    if not user:
+        return {'msg': 'User not found'}, 404
+
+    try:
+        source_start, _ = resolve_date_range(body.source_start)
+    except ValueError as e:
+        return {'msg': str(e)}, 400
+
+    name = body.name.strip()
+    if not name:
+        return {'msg': 'Template name cannot be blank'}, 400
+
+    if MealPlanTemplate.query.filter_by(user_id=user.id, name=name).first():
+        return {'msg': 'Template with this name already exists'}, 409
+
+    try:
+        template = create_template_from_week(user.id, name, source_start)
+    except IntegrityError:
+        db.session.rollback()
+        return {'msg': 'Template with this name already exists'}, 409
+
+    return {
+        'msg': 'Template created',
+        'template': template
+    }, 201
+
+
+@planning_bp.delete('/templates/<int:template_id>',
+    responses={"200": MessageResponse, "404": MessageResponse})
+@login_required
+def delete_template(path: TemplateIdPath):
+    user = get_current_user()
+
+    if not user:
+        return {'msg': 'User not found'}, 404
+
+    template = MealPlanTemplate.query.filter_by(id=path.template_id, user_id=user.id).first()
+    if not template:
+        return {'msg': 'Template not found'}, 404
+
+    db.session.delete(template)
+    db.session.commit()
+
+    return {'msg': 'Template deleted'}, 200
+
+
+@planning_bp.post('/templates/<int:template_id>/apply',
+    responses={"200": ApplyTemplateResponse, "400": MessageResponse, "404": MessageResponse})
+@login_required
+def apply_template(path: TemplateIdPath, body: ApplyTemplateBody):
+    user = get_current_user()
+
+    if not user:
+        return {'msg': 'User not found'}, 404
+
+    template = MealPlanTemplate.query.filter_by(id=path.template_id, user_id=user.id).first()
+    if not template:
+        return {'msg': 'Template not found'}, 404
+
+    try:
+        start_date, _ = resolve_date_range(body.start_date)
+    except ValueError as e:
+        return {'msg': str(e)}, 400
+
+    count = apply_meal_plan_template(
+        user.id, template.id, start_date, weeks=body.weeks, overwrite=body.overwrite
+    )
 
     return {
-        'total_plans': total_plans,
-        'plans_with_recipes': plans_with_recipes,
-        'current_week_plans': current_week_plans,
-        'week_start': week_start.isoformat(),
-        'week_end': week_end.isoformat(),
-        'meal_type_distribution': meal_type_distribution
+        'msg': f'Applied template to {body.weeks} week(s)',
+        'applied_count': count,
+        'start_date': start_date.isoformat(),
+        'end_date': (start_date + timedelta(days=7 * body.weeks - 1)).isoformat()
     }, 200
+
+
+@planning_bp.get('/stats', responses={"200": PlanningStatsResponse, "404": MessageResponse})
+@login_required
+def get_planning_stats(query: PlanningStatsQuery):
+    user = get_current_user()
+
+    if not user:
+        return {'msg': 'User not found'}, 404
+
+    return load_planning_stats(user.id, query.range), 200
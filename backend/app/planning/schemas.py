@@ -36,6 +36,12 @@ class WeeklyPlanResponse(BaseModel):
     days: list[WeekDay]
 
 
+class PlanRangeResponse(BaseModel):
+    start_date: str
+    end_date: str
+    days: list[WeekDay]
+
+
 class AddMealBody(BaseModel):
     plan_date: str
     meal_type: str = Field(pattern="^(breakfast|lunch|dinner|snack)$")
@@ -114,6 +120,11 @@ class PlanningStatsResponse(BaseModel):
     week_start: str
     week_end: str
     meal_type_distribution: dict[str, int]
+    range: Optional[str] = None
+    range_start: Optional[str] = None
+    range_end: Optional[str] = None
+    range_plans: Optional[int] = None
+    range_meal_type_distribution: Optional[dict[str, int]] = None
 
 
 class WeeklyPlanQuery(BaseModel):
@@ -122,7 +133,69 @@ class WeeklyPlanQuery(BaseModel):
 
 class MissingIngredientsQuery(BaseModel):
     start_date: Optional[str] = None
+    end_date: Optional[str] = None
 
 
 class ClearWeekQuery(BaseModel):
     start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
+
+class PlanRangeQuery(BaseModel):
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
+
+class PlanningStatsQuery(BaseModel):
+    range: Optional[str] = Field(None, pattern="^(month|year)$")
+
+
+class CopyWeekBody(BaseModel):
+    source_start: str
+    target_start: str
+    overwrite: bool = True
+
+
+class CopyWeekResponse(BaseModel):
+    msg: str
+    copied_count: int
+    week_start: str
+    week_end: str
+
+
+class TemplateIdPath(BaseModel):
+    template_id: int
+
+
+class TemplateCreateBody(BaseModel):
+    name: str = Field(min_length=1, max_length=100)
+    source_start: Optional[str] = None
+
+
+class TemplateInfo(BaseModel):
+    id: int
+    name: str
+    meal_count: int
+    created_at: Optional[str]
+
+
+class TemplateResponse(BaseModel):
+    msg: str
+    template: TemplateInfo
+
+
+class TemplateListResponse(BaseModel):
+    templates: list[TemplateInfo]
+
+
+class ApplyTemplateBody(BaseModel):
+    start_date: Optional[str] = None
+    weeks: int = Field(1, ge=1, le=52)
+    overwrite: bool = True
+
+
+class ApplyTemplateResponse(BaseModel):
+    msg: str
+    applied_count: int
+    start_date: str
+    end_date: str
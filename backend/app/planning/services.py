@@ -0,0 +1,354 @@
+from sqlalchemy import func, and_, literal, literal_column, select, cast
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import joinedload
+
+from backend.extensions import db
+from ..models import (
+    MealPlan, MealPlanTemplate, MealPlanTemplateItem, Recipe, RecipeIngredient,
+    Ingredient, FridgeItem
+)
+from ..utils.unit_converter import get_unit_group, convert_unit, get_primary_unit
+from ..utils.storage import build_image_url
+
+import json
+from datetime import datetime, timedelta
+
+
+MAX_PLAN_RANGE_DAYS = 92
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+MEAL_TYPES = ('breakfast', 'lunch', 'dinner', 'snack')
+
+MEAL_PLAN_COLUMNS = ['user_id', 'plan_date', 'meal_type', 'recipe_id']
+
+
+def parse_plan_date(value, field):
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+    except ValueError:
+        raise ValueError(f'Invalid {field} format. Use ISO format.')
+
+
+def resolve_date_range(start_date_str=None, end_date_str=None):
+    if start_date_str:
+        start_date = parse_plan_date(start_date_str, 'start_date')
+    else:
+        today = datetime.now().date()
+        start_date = today - timedelta(days=today.weekday())
+
+    if not end_date_str:
+        return start_date, start_date + timedelta(days=6)
+
+    end_date = parse_plan_date(end_date_str, 'end_date')
+    if end_date < start_date:
+        raise ValueError('end_date must not be before start_date')
+    if (end_date - start_date).days >= MAX_PLAN_RANGE_DAYS:
+        raise ValueError(f'Date range cannot exceed {MAX_PLAN_RANGE_DAYS} days')
+
+    return start_date, end_date
+
+
+def serialize_plan_day(day, meals):
+    return {
+        'date': day.isoformat(),
+        'day_name': DAY_NAMES[day.weekday()],
+        'meals': {meal_type: meals.get(meal_type) for meal_type in MEAL_TYPES}
+    }
+
+
+def iter_plan_days(user_id, start_date, end_date):
+    meal_plans = MealPlan.query.options(
+        joinedload(MealPlan.recipe).load_only(Recipe.id, Recipe.title, Recipe.image_name)
+    ).filter(
+        MealPlan.user_id == user_id,
+        MealPlan.plan_date >= start_date,
+        MealPlan.plan_date <= end_date
+    ).order_by(MealPlan.plan_date).yield_per(500)
+
+    day = start_date
+    meals = {}
+    for mp in meal_plans:
+        while day < mp.plan_date:
+            yield serialize_plan_day(day, meals)
+            meals = {}
+            day += timedelta(days=1)
+
+        recipe_data = None
+        if mp.recipe:
+            recipe_data = {
+                'id': mp.recipe.id,
+                'title': mp.recipe.title,
+                'image_url': build_image_url(mp.recipe.image_name)
+            }
+        meals[mp.meal_type] = {'id': mp.id, 'recipe': recipe_data}
+
+    while day <= end_date:
+        yield serialize_plan_day(day, meals)
+        meals = {}
+        day += timedelta(days=1)
+
+
+def stream_plan_range(user_id, start_date, end_date):
+    yield '{"start_date": %s, "end_date": %s, "days": [' % (
+        json.dumps(start_date.isoformat()), json.dumps(end_date.isoformat())
+    )
+    for index, day in enumerate(iter_plan_days(user_id, start_date, end_date)):
+        yield (',' if index else '') + json.dumps(day)
+    yield ']}'
+
+
+def get_needed_ingredient_totals(user_id, start_date, end_date):
+    return db.session.query(
+        RecipeIngredient.ingredient_id,
+        Ingredient.name,
+        RecipeIngredient.unit,
+        func.sum(func.coalesce(RecipeIngredient.quantity, 0)).label('quantity'),
+        FridgeItem.id.label('fridge_item_id'),
+        FridgeItem.quantity.label('fridge_quantity'),
+        FridgeItem.unit.label('fridge_unit')
+    ).select_from(MealPlan).join(
+        RecipeIngredient, RecipeIngredient.recipe_id == MealPlan.recipe_id
+    ).join(
+        Ingredient, Ingredient.id == RecipeIngredient.ingredient_id
+    ).outerjoin(
+        FridgeItem, and_(
+            FridgeItem.ingredient_id == RecipeIngredient.ingredient_id,
+            FridgeItem.user_id == user_id
+        )
+    ).filter(
+        MealPlan.user_id == user_id,
+        MealPlan.plan_date >= start_date,
+        MealPlan.plan_date <= end_date
+    ).group_by(
+        RecipeIngredient.ingredient_id, Ingredient.name, RecipeIngredient.unit,
+        FridgeItem.id, FridgeItem.quantity, FridgeItem.unit
+    ).order_by(
+        RecipeIngredient.ingredient_id, RecipeIngredient.unit
+    ).all()
+
+
+def group_needed_ingredients(rows):
+    needed = {}
+    for row in rows:
+        if row.ingredient_id not in needed:
+            needed[row.ingredient_id] = {
+                'name': row.name,
+                'quantities': {},
+                'fridge': None
+            }
+            if row.fridge_item_id is not None:
+                needed[row.ingredient_id]['fridge'] = {
+                    'quantity': row.fridge_quantity,
+                    'unit': row.fridge_unit
+                }
+
+        quantities = needed[row.ingredient_id]['quantities']
+        unit = row.unit or 'piece'
+        quantities[unit] = quantities.get(unit, 0) + float(row.quantity or 0)
+
+    return needed
+
+
+def summarize_needed_ingredient(ingredient_id, data):
+    fridge_data = data['fridge']
+
+    primary_unit = None
+    total_needed = 0
+    quantities_by_unit = []
+
+    for unit, qty in data['quantities'].items():
+        if qty > 0:
+            unit_group = get_unit_group(unit)
+            if unit_group:
+                primary = get_primary_unit(unit)
+                converted = convert_unit(qty, unit, primary)
+                if converted:
+                    total_needed += converted
+                    primary_unit = primary
+                else:
+                    total_needed += qty
+                    primary_unit = unit
+            else:
+                total_needed += qty
+                primary_unit = unit
+
+            quantities_by_unit.append({
+                'quantity': round(qty, 2),
+                'unit': unit
+            })
+
+    fridge_quantity = None
+    is_sufficient = False
+
+    if fridge_data:
+        fridge_qty = fridge_data['quantity'] or 0
+        fridge_unit = fridge_data['unit']
+
+        if primary_unit and fridge_unit:
+            converted_fridge = convert_unit(fridge_qty, fridge_unit, primary_unit)
+            if converted_fridge:
+                fridge_quantity = round(converted_fridge, 2)
+                is_sufficient = converted_fridge >= total_needed
+            else:
+                fridge_quantity = fridge_qty
+        else:
+            fridge_quantity = fridge_qty
+
+    return {
+        'ingredient_id': ingredient_id,
+        'name': data['name'],
+        'needed_total': round(total_needed, 2) if total_needed else None,
+        'needed_unit': primary_unit,
+        'needed_breakdown': quantities_by_unit,
+        'in_fridge': fridge_quantity,
+        'fridge_unit': fridge_data['unit'] if fridge_data else None,
+        'is_available': fridge_data is not None,
+        'is_sufficient': is_sufficient
+    }
+
+
+def find_missing_ingredients(user_id, start_date, end_date):
+    needed = group_needed_ingredients(
+        get_needed_ingredient_totals(user_id, start_date, end_date)
+    )
+
+    missing = [
+        summarize_needed_ingredient(ingredient_id, data)
+        for ingredient_id, data in needed.items()
+    ]
+    missing.sort(key=lambda x: (x['is_sufficient'], x['is_available'], x['name']))
+    return missing
+
+
+def on_meal_conflict(statement, overwrite=True):
+    index_elements = [MealPlan.user_id, MealPlan.plan_date, MealPlan.meal_type]
+    if not overwrite:
+        return statement.on_conflict_do_nothing(index_elements=index_elements)
+
+    return statement.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={'recipe_id': statement.excluded.recipe_id}
+    )
+
+
+def bulk_upsert_meal_plans(user_id, meals):
+    recipe_ids = {meal.recipe_id for meal in meals if meal.recipe_id}
+    known_recipe_ids = set()
+    if recipe_ids:
+        known_recipe_ids = {
+            recipe_id for recipe_id, in db.session.query(Recipe.id).filter(Recipe.id.in_(recipe_ids))
+        }
+
+    rows = {}
+    errors = []
+    for meal in meals:
+        try:
+            plan_date = parse_plan_date(meal.plan_date, 'plan_date')
+        except ValueError:
+            errors.append(f'Invalid date format: {meal.plan_date}')
+            continue
+
+        if meal.recipe_id and meal.recipe_id not in known_recipe_ids:
+            errors.append(f'Recipe not found: {meal.recipe_id}')
+            continue
+
+        rows[(plan_date, meal.meal_type)] = {
+            'user_id': user_id,
+            'plan_date': plan_date,
+            'meal_type': meal.meal_type,
+            'recipe_id': meal.recipe_id
+        }
+
+    applied = len(meals) - len(errors)
+    added = 0
+    if rows:
+        statement = on_meal_conflict(
+            insert(MealPlan).values(list(rows.values()))
+        ).returning(literal_column('xmax = 0').label('inserted'))
+        added = sum(1 for inserted, in db.session.execute(statement) if inserted)
+
+    db.session.commit()
+
+    return {'added': added, 'updated': applied - added, 'errors': errors}
+
+
+def copy_meal_plans(user_id, source_start, target_start, days=7, overwrite=True):
+    shift = (target_start - source_start).days
+    source = select(
+        MealPlan.user_id,
+        MealPlan.plan_date + shift,
+        MealPlan.meal_type,
+        MealPlan.recipe_id
+    ).where(
+        MealPlan.user_id == user_id,
+        MealPlan.plan_date >= source_start,
+        MealPlan.plan_date < source_start + timedelta(days=days)
+    )
+
+    result = db.session.execute(on_meal_conflict(
+        insert(MealPlan).from_select(MEAL_PLAN_COLUMNS, source), overwrite
+    ))
+    db.session.commit()
+    return result.rowcount
+
+
+def get_meal_plan_templates(user_id):
+    rows = db.session.query(
+        MealPlanTemplate,
+        func.count(MealPlanTemplateItem.id)
+    ).outerjoin(
+        MealPlanTemplateItem, MealPlanTemplateItem.template_id == MealPlanTemplate.id
+    ).filter(
+        MealPlanTemplate.user_id == user_id
+    ).group_by(MealPlanTemplate.id).order_by(MealPlanTemplate.name).all()
+
+    return [serialize_template(template, meal_count) for template, meal_count in rows]
+
+
+def serialize_template(template, meal_count):
+    return {
+        'id': template.id,
+        'name': template.name,
+        'meal_count': meal_count,
+        'created_at': template.created_at.isoformat() if template.created_at else None
+    }
+
+
+def create_template_from_week(user_id, name, source_start):
+    template = MealPlanTemplate(user_id=user_id, name=name)
+    db.session.add(template)
+    db.session.flush()
+
+    source = select(
+        literal(template.id, db.BigInteger),
+        cast(MealPlan.plan_date - source_start, db.Integer),
+        MealPlan.meal_type,
+        MealPlan.recipe_id
+    ).where(
+        MealPlan.user_id == user_id,
+        MealPlan.plan_date >= source_start,
+        MealPlan.plan_date <= source_start + timedelta(days=6)
+    )
+
+    result = db.session.execute(insert(MealPlanTemplateItem).from_select(
+        ['template_id', 'day_offset', 'meal_type', 'recipe_id'], source
+    ))
+    db.session.commit()
+    return serialize_template(template, result.rowcount)
+
+
+def apply_meal_plan_template(user_id, template_id, start_date, weeks=1, overwrite=True):
+    week = func.generate_series(0, weeks - 1).column_valued('week')
+    source = select(
+        literal(user_id, db.BigInteger),
+        literal(start_date, db.Date) + (MealPlanTemplateItem.day_offset + week * 7),
+        MealPlanTemplateItem.meal_type,
+        MealPlanTemplateItem.recipe_id
+    ).where(MealPlanTemplateItem.template_id == template_id)
+
+    result = db.session.execute(on_meal_conflict(
+        insert(MealPlan).from_select(MEAL_PLAN_COLUMNS, source), overwrite
+    ))
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,138 @@
+from flask import current_app
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from backend.extensions import db
+from ..models import MealPlan
+
+import threading
+import time
+from datetime import datetime, timedelta
+from itertools import chain
+
+
+class PlanningStatsCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def get(self, user_id, key):
+        ttl = current_app.config.get('PLANNING_STATS_CACHE_TTL', 60)
+        entry = self.entries.get(user_id, {}).get(key)
+        if entry is None or not ttl:
+            return None
+
+        values, cached_at = entry
+        if time.monotonic() - cached_at > ttl:
+            return None
+
+        return values
+
+    def set(self, user_id, key, values):
+        if not current_app.config.get('PLANNING_STATS_CACHE_TTL', 60):
+            return
+
+        with self.lock:
+            self.entries.setdefault(user_id, {})[key] = (values, time.monotonic())
+
+    def invalidate(self, *user_ids):
+        with self.lock:
+            for user_id in user_ids:
+                self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+planning_stats_cache = PlanningStatsCache()
+
+
+def get_stats_range(today, range_name):
+    if range_name == 'year':
+        return today.replace(month=1, day=1), today.replace(month=12, day=31)
+
+    month_start = today.replace(day=1)
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    return month_start, next_month - timedelta(days=1)
+
+
+def compute_planning_stats(user_id, today, range_name=None):
+    week_start = today - timedelta(days=today.weekday())
+    week_end = week_start + timedelta(days=6)
+
+    columns = [
+        MealPlan.meal_type,
+        func.count(MealPlan.id),
+        func.count(MealPlan.id).filter(MealPlan.recipe_id.isnot(None)),
+        func.count(MealPlan.id).filter(MealPlan.plan_date.between(week_start, week_end))
+    ]
+    if range_name:
+        range_start, range_end = get_stats_range(today, range_name)
+        columns.append(func.count(MealPlan.id).filter(MealPlan.plan_date.between(range_start, range_end)))
+
+    rows = db.session.query(*columns).filter(
+        MealPlan.user_id == user_id
+    ).group_by(MealPlan.meal_type).all()
+
+    stats = {
+        'total_plans': sum(row[1] for row in rows),
+        'plans_with_recipes': sum(row[2] for row in rows),
+        'current_week_plans': sum(row[3] for row in rows),
+        'week_start': week_start.isoformat(),
+        'week_end': week_end.isoformat(),
+        'meal_type_distribution': {row[0]: row[1] for row in rows}
+    }
+
+    if range_name:
+        stats.update({
+            'range': range_name,
+            'range_start': range_start.isoformat(),
+            'range_end': range_end.isoformat(),
+            'range_plans': sum(row[4] for row in rows),
+            'range_meal_type_distribution': {row[0]: row[4] for row in rows if row[4]}
+        })
+
+    return stats
+
+
+def load_planning_stats(user_id, range_name=None):
+    today = datetime.now().date()
+    key = (today, range_name)
+
+    stats = planning_stats_cache.get(user_id, key)
+    if stats is None:
+        stats = compute_planning_stats(user_id, today, range_name)
+        planning_stats_cache.set(user_id, key, stats)
+
+    return stats
+
+
+@event.listens_for(Session, 'after_flush')
+def track_meal_plan_changes(session, flush_context):
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, MealPlan):
+            session.info.setdefault('changed_plan_users', set()).add(obj.user_id)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def track_bulk_meal_plan_changes(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, MealPlan):
+        orm_execute_state.session.info['planning_stats_stale'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def publish_meal_plan_changes(session):
+    if session.info.pop('planning_stats_stale', False):
+        planning_stats_cache.clear()
+    planning_stats_cache.invalidate(*session.info.pop('changed_plan_users', ()))
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_meal_plan_changes(session):
+    session.info.pop('planning_stats_stale', None)
+    session.info.pop('changed_plan_users', None)
@@ -1,11 +1,11 @@
 from flask_openapi3 import APIBlueprint, Tag
-from flask_jwt_extended import get_jwt_identity
+from flask_jwt_extended import get_current_user
 
 from backend.extensions import db
-from ..auth.models import User
 from ..auth.schemas import UnauthorizedResponse
 from ..decorators import login_required
-from ..models import Recipe, Rating
+from ..models import Recipe, Rating, RecipeRatingStats
+from .services import format_average, format_histogram
 from .schemas import (
     RecipeIdPath, RatingIdPath,
     AddRatingBody, UpdateRatingBody, RatingResponse, MessageResponse,
@@ -35,10 +35,7 @@ def get_recipe_ratings(path: RecipeIdPath):
     )
     ratings = query.all()
 
-    all_ratings = Rating.query.filter_by(recipe_id=recipe_id).all()
-    avg_score = None
-    if all_ratings:
-        avg_score = round(sum(r.score for r in all_ratings) / len(all_ratings), 1)
+    rating_stats = db.session.get(RecipeRatingStats, recipe_id)
 
     return {
         'recipe_id': recipe_id,
@@ -51,8 +48,9 @@ def get_recipe_ratings(path: RecipeIdPath):
             'comment': r.comment,
             'created_at': r.created_at.isoformat() if r.created_at else None
         } for r in ratings],
-        'average_rating': avg_score,
-        'total_ratings': len(all_ratings)
+        'average_rating': format_average(rating_stats),
+        'total_ratings': rating_stats.rating_count if rating_stats else 0,
+        'histogram': format_histogram(rating_stats)
     }, 200
 
 
@@ -61,8 +59,7 @@ def get_recipe_ratings(path: RecipeIdPath):
 @login_required
 def add_rating(path: RecipeIdPath, body: AddRatingBody):
     recipe_id = path.recipe_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -99,8 +96,7 @@ def add_rating(path: RecipeIdPath, body: AddRatingBody):
 @login_required
 def update_rating(path: RatingIdPath, body: UpdateRatingBody):
     rating_id = path.rating_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -130,8 +126,7 @@ def update_rating(path: RatingIdPath, body: UpdateRatingBody):
 @login_required
 def delete_rating(path: RatingIdPath):
     rating_id = path.rating_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -152,8 +147,7 @@ def delete_rating(path: RatingIdPath):
 @rating_bp.get('/user/ratings', responses={"200": UserRatingsResponse, "404": MessageResponse})
 @login_required
 def get_user_ratings():
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -59,3 +59,4 @@ class RecipeRatingsResponse(BaseModel):
     ratings: list[RecipeRatingInfo]
     average_rating: Optional[float]
     total_ratings: int
+    histogram: dict[str, int] = {}
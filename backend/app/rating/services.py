@@ -0,0 +1,162 @@
+from sqlalchemy import event, func, inspect, select, case, cast, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from backend.extensions import db
+from ..models import Recipe, Rating, RecipeRatingStats
+
+
+SCORES = range(1, 6)
+
+
+def rating_stats_select(recipe_id=None):
+    stmt = select(
+        Rating.recipe_id,
+        func.count(Rating.id),
+        func.sum(Rating.score),
+        cast(func.avg(Rating.score), db.Float),
+        *[func.count(case((Rating.score == score, 1))) for score in SCORES]
+    ).group_by(Rating.recipe_id)
+
+    if recipe_id is not None:
+        stmt = stmt.where(Rating.recipe_id == recipe_id)
+
+    return stmt
+
+
+def rebuild_rating_stats(connection, recipe_id=None):
+    table = RecipeRatingStats.__table__
+    columns = [
+        'recipe_id', 'rating_count', 'rating_sum', 'average_rating',
+        *[f'score_{score}_count' for score in SCORES]
+    ]
+
+    stmt = insert(table).from_select(columns, rating_stats_select(recipe_id))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.recipe_id],
+        set_={name: stmt.excluded[name] for name in columns[1:]}
+    )
+    connection.execute(stmt)
+
+    stale = delete(table).where(~table.c.recipe_id.in_(select(Rating.recipe_id)))
+    if recipe_id is not None:
+        stale = stale.where(table.c.recipe_id == recipe_id)
+    return connection.execute(stale)
+
+
+def apply_rating_change(connection, recipe_id, removed_score=None, added_score=None):
+    if removed_score == added_score:
+        return
+
+    table = RecipeRatingStats.__table__
+    deltas = {
+        'rating_count': (added_score is not None) - (removed_score is not None),
+        'rating_sum': (added_score or 0) - (removed_score or 0)
+    }
+    for score in SCORES:
+        deltas[f'score_{score}_count'] = (added_score == score) - (removed_score == score)
+
+    stmt = insert(table).values(
+        recipe_id=recipe_id,
+        average_rating=added_score if removed_score is None else None,
+        **{name: max(delta, 0) for name, delta in deltas.items()}
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.recipe_id],
+        set_={
+            'average_rating': cast(table.c.rating_sum + deltas['rating_sum'], db.Float) / func.nullif(
+                table.c.rating_count + deltas['rating_count'], 0
+            ),
+            **{name: table.c[name] + delta for name, delta in deltas.items() if delta}
+        }
+    )
+    connection.execute(stmt)
+
+
+@event.listens_for(Rating, 'after_insert')
+def rating_inserted(mapper, connection, target):
+    apply_rating_change(connection, target.recipe_id, added_score=target.score)
+
+
+@event.listens_for(Rating, 'after_update')
+def rating_updated(mapper, connection, target):
+    state = inspect(target)
+    score_history = state.attrs.score.history
+    recipe_history = state.attrs.recipe_id.history
+
+    if not score_history.has_changes() and not recipe_history.has_changes():
+        return
+
+    old_score = score_history.deleted[0] if score_history.deleted else target.score
+    old_recipe_id = recipe_history.deleted[0] if recipe_history.deleted else target.recipe_id
+
+    if old_recipe_id == target.recipe_id:
+        apply_rating_change(connection, target.recipe_id, old_score, target.score)
+    else:
+        apply_rating_change(connection, old_recipe_id, removed_score=old_score)
+        apply_rating_change(connection, target.recipe_id, added_score=target.score)
+
+
+@event.listens_for(Rating, 'after_delete')
+def rating_deleted(mapper, connection, target):
+    score_history = inspect(target).attrs.score.history
+    score = score_history.deleted[0] if score_history.deleted else target.score
+    apply_rating_change(connection, target.recipe_id, removed_score=score)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def track_bulk_rating_changes(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, Rating):
+        orm_execute_state.session.info['rating_stats_stale'] = True
+
+
+@event.listens_for(Session, 'before_commit')
+def rebuild_stale_rating_stats(session):
+    if session.info.pop('rating_stats_stale', False):
+        rebuild_rating_stats(session.connection())
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_stale_rating_stats(session):
+    session.info.pop('rating_stats_stale', None)
+
+
+def get_rating_stats(recipe_ids):
+    if not recipe_ids:
+        return {}
+
+    stats = RecipeRatingStats.query.filter(
+        RecipeRatingStats.recipe_id.in_(recipe_ids)
+    ).all()
+    return {s.recipe_id: s for s in stats}
+
+
+def get_author_rating_totals(author_id):
+    total_ratings, rating_sum = db.session.query(
+        func.coalesce(func.sum(RecipeRatingStats.rating_count), 0),
+        func.coalesce(func.sum(RecipeRatingStats.rating_sum), 0)
+    ).join(
+        Recipe, Recipe.id == RecipeRatingStats.recipe_id
+    ).filter(
+        Recipe.author_id == author_id
+    ).one()
+
+    avg_rating = rating_sum / total_ratings if total_ratings else None
+    return total_ratings, avg_rating
+
+
+def format_average(stats):
+    if not stats or not stats.average_rating:
+        return
+    return round(stats.average_rating, 1)
+
+
+def format_histogram(stats):
+    return {
+        str(score): getattr(stats, f'score_{score}_count') if stats else 0
+        for score in SCORES
+    }
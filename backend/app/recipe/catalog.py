@@ -0,0 +1,92 @@
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..models import Recipe, RecipeIngredient, Ingredient
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from itertools import chain
+
+
+CATALOG_MODELS = (Recipe, RecipeIngredient, Ingredient)
+
+
+class CatalogVersion:
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def bump(self):
+        with self.lock:
+            self.value += 1
+            return self.value
+
+
+catalog_version = CatalogVersion()
+
+
+def get_catalog_version():
+    return catalog_version.value
+
+
+def bump_catalog_version():
+    return catalog_version.bump()
+
+
+class CatalogCache(ABC):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.built_at = 0.0
+
+    def is_stale(self, version):
+        ttl = current_app.config.get('CATALOG_CACHE_TTL', 300)
+        return self.version != version or time.monotonic() - self.built_at > ttl
+
+    def refresh(self):
+        version = get_catalog_version()
+        if not self.is_stale(version):
+            return
+
+        with self.lock:
+            if not self.is_stale(version):
+                return
+
+            self.build()
+            self.version = version
+            self.built_at = time.monotonic()
+
+    @abstractmethod
+    def build(self):
+        pass
+
+
+@event.listens_for(Session, 'after_flush')
+def track_catalog_changes(session, flush_context):
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, CATALOG_MODELS):
+            session.info['catalog_changed'] = True
+            return
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def track_bulk_catalog_changes(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, CATALOG_MODELS):
+        orm_execute_state.session.info['catalog_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def publish_catalog_changes(session):
+    if session.info.pop('catalog_changed', False):
+        bump_catalog_version()
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_catalog_changes(session):
+    session.info.pop('catalog_changed', None)
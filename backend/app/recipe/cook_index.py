@@ -0,0 +1,155 @@
+from backend.extensions import db
+from ..models import RecipeIngredient, Ingredient
+from ..utils.unit_converter import convert_unit
+from .catalog import CatalogCache
+
+import heapq
+from array import array
+from collections import namedtuple
+
+
+RecipeMatrix = namedtuple('RecipeMatrix', [
+    'recipe_ids', 'row_offsets', 'entry_rows', 'entry_ingredients',
+    'entry_quantities', 'entry_units', 'postings', 'ingredient_names'
+])
+
+MISSING, INSUFFICIENT, SUFFICIENT = 0, 1, 2
+
+
+def build_matrix(rows):
+    recipe_ids = array('q')
+    row_offsets = array('l')
+    entry_rows = array('l')
+    entry_ingredients = array('q')
+    entry_quantities = array('d')
+    entry_units = []
+    postings = {}
+    ingredient_names = {}
+
+    for recipe_id, ingredient_id, quantity, unit, name in rows:
+        if not recipe_ids or recipe_ids[-1] != recipe_id:
+            recipe_ids.append(recipe_id)
+            row_offsets.append(len(entry_rows))
+
+        position = len(entry_rows)
+        entry_rows.append(len(recipe_ids) - 1)
+        entry_ingredients.append(ingredient_id)
+        entry_quantities.append(quantity or 0.0)
+        entry_units.append(unit)
+        if ingredient_id not in postings:
+            postings[ingredient_id] = array('l')
+        postings[ingredient_id].append(position)
+        ingredient_names[ingredient_id] = name
+
+    row_offsets.append(len(entry_rows))
+
+    return RecipeMatrix(
+        recipe_ids, row_offsets, entry_rows, entry_ingredients,
+        entry_quantities, entry_units, postings, ingredient_names
+    )
+
+
+def covers(have, have_unit, need, need_unit, conversions):
+    if not need:
+        return True
+
+    have = have or 0
+    if not need_unit or not have_unit or need_unit == have_unit:
+        return have >= need
+
+    key = (need, need_unit, have_unit)
+    if key not in conversions:
+        conversions[key] = convert_unit(need, need_unit, have_unit)
+
+    converted = conversions[key]
+    return converted is not None and have >= converted
+
+
+class CookNowIndex(CatalogCache):
+    def __init__(self):
+        super().__init__()
+        self.matrix = build_matrix([])
+
+    def build(self):
+        rows = db.session.query(
+            RecipeIngredient.recipe_id,
+            RecipeIngredient.ingredient_id,
+            RecipeIngredient.quantity,
+            RecipeIngredient.unit,
+            Ingredient.name
+        ).join(
+            Ingredient, RecipeIngredient.ingredient_id == Ingredient.id
+        ).order_by(
+            RecipeIngredient.recipe_id, Ingredient.name
+        ).all()
+
+        self.matrix = build_matrix(rows)
+
+    def rank(self, fridge, limit=10, min_coverage=0.0):
+        self.refresh()
+        matrix = self.matrix
+
+        recipe_count = len(matrix.recipe_ids)
+        matched = array('l', [0]) * recipe_count
+        sufficient = array('l', [0]) * recipe_count
+        coverage = bytearray(len(matrix.entry_rows))
+        conversions = {}
+
+        for ingredient_id, (quantity, unit) in fridge.items():
+            for position in matrix.postings.get(ingredient_id, ()):
+                row = matrix.entry_rows[position]
+                matched[row] += 1
+                if covers(
+                    quantity, unit,
+                    matrix.entry_quantities[position], matrix.entry_units[position],
+                    conversions
+                ):
+                    sufficient[row] += 1
+                    coverage[position] = SUFFICIENT
+                else:
+                    coverage[position] = INSUFFICIENT
+
+        offsets = matrix.row_offsets
+
+        def total(row):
+            return offsets[row + 1] - offsets[row]
+
+        candidates = [
+            row for row in range(recipe_count)
+            if matched[row] and matched[row] / total(row) >= min_coverage
+        ]
+        top_rows = heapq.nlargest(limit, candidates, key=lambda row: (
+            sufficient[row] / total(row),
+            matched[row] / total(row),
+            matched[row],
+            -matrix.recipe_ids[row]
+        ))
+
+        ranked = []
+        for row in top_rows:
+            missing = []
+            for position in range(offsets[row], offsets[row + 1]):
+                if coverage[position] == SUFFICIENT:
+                    continue
+                ingredient_id = matrix.entry_ingredients[position]
+                missing.append({
+                    'ingredient_id': ingredient_id,
+                    'name': matrix.ingredient_names[ingredient_id],
+                    'quantity': matrix.entry_quantities[position] or None,
+                    'unit': matrix.entry_units[position],
+                    'status': 'insufficient' if coverage[position] == INSUFFICIENT else 'missing'
+                })
+
+            ranked.append({
+                'recipe_id': matrix.recipe_ids[row],
+                'matched_count': matched[row],
+                'sufficient_count': sufficient[row],
+                'total_ingredients': total(row),
+                'coverage': round(matched[row] / total(row), 4),
+                'missing_ingredients': missing
+            })
+
+        return ranked
+
+
+cook_index = CookNowIndex()
@@ -0,0 +1,53 @@
+from sqlalchemy import func
+
+from backend.extensions import db
+from ..models import Recipe
+from .catalog import CatalogCache
+
+import hashlib
+import json
+
+
+DEFAULT_MEAL_TYPES = ['breakfast', 'lunch', 'dinner', 'snack', 'dessert']
+
+SORT_OPTIONS = [
+    {'value': 'created_at', 'label': 'Date Added'},
+    {'value': 'title', 'label': 'Title'},
+    {'value': 'relevance', 'label': 'Relevance'}
+]
+
+
+def distinct_values(column):
+    return func.array_remove(func.array_agg(column.distinct()), None)
+
+
+class FilterCatalog(CatalogCache):
+    def __init__(self):
+        super().__init__()
+        self.filters = None
+        self.etag = None
+
+    def build(self):
+        categories, cuisines, meal_types = db.session.query(
+            distinct_values(Recipe.category),
+            distinct_values(Recipe.cuisine),
+            distinct_values(Recipe.meal_type)
+        ).one()
+
+        filters = {
+            'categories': sorted(c for c in categories or [] if c),
+            'cuisines': sorted(c for c in cuisines or [] if c),
+            'meal_types': sorted(m for m in meal_types or [] if m) or DEFAULT_MEAL_TYPES,
+            'sort_options': SORT_OPTIONS
+        }
+        payload = json.dumps(filters, sort_keys=True).encode()
+
+        self.filters = filters
+        self.etag = hashlib.sha1(payload).hexdigest()
+
+    def get(self):
+        self.refresh()
+        return self.filters, self.etag
+
+
+filter_catalog = FilterCatalog()
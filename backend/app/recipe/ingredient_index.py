@@ -0,0 +1,59 @@
+from backend.extensions import db
+from ..models import RecipeIngredient, Ingredient
+from .catalog import CatalogCache
+
+from array import array
+
+
+class IngredientIndex(CatalogCache):
+    def __init__(self):
+        super().__init__()
+        self.postings = {}
+
+    def build(self):
+        rows = db.session.query(
+            Ingredient.name,
+            RecipeIngredient.recipe_id
+        ).join(
+            RecipeIngredient, RecipeIngredient.ingredient_id == Ingredient.id
+        ).order_by(
+            Ingredient.name, RecipeIngredient.recipe_id
+        ).all()
+
+        postings = {}
+        for name, recipe_id in rows:
+            key = name.lower()
+            if key not in postings:
+                postings[key] = array('q')
+            postings[key].append(recipe_id)
+
+        self.postings = postings
+
+    def match(self, term):
+        recipe_ids = set()
+        for name, posting in self.postings.items():
+            if term in name:
+                recipe_ids.update(posting)
+        return recipe_ids
+
+    def resolve(self, include_terms, exclude_terms):
+        self.refresh()
+
+        included = None
+        for term in include_terms:
+            matched = self.match(term)
+            included = matched if included is None else included & matched
+            if not included:
+                return set(), set()
+
+        excluded = set()
+        for term in exclude_terms:
+            excluded |= self.match(term)
+
+        if included is not None:
+            return included - excluded, set()
+
+        return None, excluded
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,40 @@
+from backend.extensions import db
+from ..models import Recipe
+from .catalog import CatalogCache
+
+import random
+from array import array
+
+
+class RandomRecipeSampler(CatalogCache):
+    def __init__(self):
+        super().__init__()
+        self.recipe_ids = array('q')
+
+    def build(self):
+        rows = db.session.query(Recipe.id).filter(
+            Recipe.image_name.isnot(None)
+        ).order_by(Recipe.id).all()
+
+        self.recipe_ids = array('q', (recipe_id for recipe_id, in rows))
+
+    def sample(self, count=1):
+        self.refresh()
+        recipe_ids = self.recipe_ids
+        return random.sample(recipe_ids, min(count, len(recipe_ids)))
+
+    def sample_recipes(self, count=1):
+        recipe_ids = self.sample(count)
+        if not recipe_ids:
+            return []
+
+        recipes = {
+            recipe.id: recipe for recipe in Recipe.query.filter(
+                Recipe.id.in_(recipe_ids),
+                Recipe.image_name.isnot(None)
+            ).all()
+        }
+        return [recipes[recipe_id] for recipe_id in recipe_ids if recipe_id in recipes]
+
+
+random_sampler = RandomRecipeSampler()
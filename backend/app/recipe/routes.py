@@ -1,21 +1,22 @@
+from flask import current_app, jsonify, request
 from flask_openapi3 import APIBlueprint, Tag
-from flask_jwt_extended import get_jwt_identity
-from sqlalchemy import func
+from flask_jwt_extended import get_current_user
 
 from backend.extensions import db
-from ..auth.models import User
 from ..auth.schemas import UnauthorizedResponse
 from ..decorators import login_required
 from ..models import Ingredient, Recipe
 from ..utils.storage import build_image_url
+from ..utils.fields import parse_fields
 from .services import (
     get_recipe_list, get_recipe_detail, add_to_favorites,
     remove_from_favorites, get_user_favorites, get_available_filters,
     get_user_collections, get_collection_detail, create_collection,
     update_collection, delete_collection, add_recipe_to_collection,
     bulk_add_recipes_to_collection, remove_recipe_from_collection,
-    get_recipe_collections
+    get_recipe_collections, get_cook_now_recipes
 )
+from .random_sampler import random_sampler
 from .schemas import (
     RecipeIdPath, CollectionIdPath, CollectionRecipePath,
     RecipeListResponse, RecipeDetail, MessageResponse, RandomRecipeDetail,
@@ -23,7 +24,8 @@ from .schemas import (
     IngredientSearchResponse, FilterOptions, CollectionCreateBody,
     CollectionUpdateBody, CollectionCreateResponse, AddRecipeToCollectionBody,
     BulkAddRecipesBody, BulkAddResponse, CollectionList, CollectionDetail,
-    RecipeCollectionsResponse, RecipeListQuery, IngredientSearchQuery, CollectionListQuery
+    RecipeCollectionsResponse, RecipeListQuery, IngredientSearchQuery, CollectionListQuery,
+    RandomRecipeQuery, RecipeSummary, FieldsQuery, CookNowQuery, CookNowResponse
 )
 
 
@@ -35,11 +37,10 @@ recipe_bp = APIBlueprint(
 )
 
 
-@recipe_bp.get('', responses={"200": RecipeListResponse})
+@recipe_bp.get('', responses={"200": RecipeListResponse, "400": MessageResponse})
 @login_required
 def list_recipes(query: RecipeListQuery):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     search_query = query.q
     ingredients_str = query.ingredients
@@ -54,31 +55,44 @@ def list_recipes(query: RecipeListQuery):
     sort_by = query.sort_by
     sort_order = query.sort_order
 
-    result = get_recipe_list(
-        search_query=search_query,
-        ingredients=ingredients,
-        exclude_ingredients=exclude_ingredients,
-        category=category,
-        cuisine=cuisine,
-        is_vegan=is_vegan,
-        is_vegetarian=is_vegetarian,
-        meal_type=meal_type,
-        sort_by=sort_by,
-        sort_order=sort_order,
-        user_id=user.id if user else None
-    )
+    try:
+        fields = parse_fields(query.fields, RecipeSummary.model_fields)
+        result = get_recipe_list(
+            search_query=search_query,
+            ingredients=ingredients,
+            exclude_ingredients=exclude_ingredients,
+            category=category,
+            cuisine=cuisine,
+            is_vegan=is_vegan,
+            is_vegetarian=is_vegetarian,
+            meal_type=meal_type,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            user_id=user.id if user else None,
+            limit=query.limit,
+            cursor=query.cursor,
+            facets=query.facets,
+            fields=fields
+        )
+    except ValueError as e:
+        return {'msg': str(e)}, 400
 
     return result, 200
 
 
-@recipe_bp.get('/<int:recipe_id>', responses={"200": RecipeDetail, "404": MessageResponse})
+@recipe_bp.get('/<int:recipe_id>',
+    responses={"200": RecipeDetail, "400": MessageResponse, "404": MessageResponse})
 @login_required
-def get_recipe(path: RecipeIdPath):
+def get_recipe(path: RecipeIdPath, query: FieldsQuery):
     recipe_id = path.recipe_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
+
+    try:
+        fields = parse_fields(query.fields, RecipeDetail.model_fields)
+    except ValueError as e:
+        return {'msg': str(e)}, 400
 
-    recipe = get_recipe_detail(recipe_id, user.id if user else None)
+    recipe = get_recipe_detail(recipe_id, user.id if user else None, fields)
 
     if not recipe:
         return {'msg': 'Recipe not found'}, 404
@@ -86,15 +100,7 @@ def get_recipe(path: RecipeIdPath):
     return recipe, 200
 
 
-@recipe_bp.get('/random', responses={"200": RandomRecipeDetail, "404": MessageResponse})
-def get_random_recipe():
-    recipe = Recipe.query.filter(
-        Recipe.image_name.isnot(None)
-    ).order_by(func.random()).first()
-
-    if not recipe:
-        return {'msg': 'No recipes available'}, 404
-
+def serialize_random_recipe(recipe):
     return {
         'id': recipe.id,
         'title': recipe.title,
@@ -106,14 +112,32 @@ def get_random_recipe():
         'is_vegetarian': recipe.is_vegetarian,
         'image_url': build_image_url(recipe.image_name),
         'directions': recipe.directions
-    }, 200
+    }
+
+
+@recipe_bp.get('/random', responses={"200": RandomRecipeDetail, "404": MessageResponse})
+def get_random_recipe(query: RandomRecipeQuery):
+    recipes = random_sampler.sample_recipes(query.count or 1)
+
+    if not recipes:
+        return {'msg': 'No recipes available'}, 404
 
+    if query.count is None:
+        return serialize_random_recipe(recipes[0]), 200
 
-@recipe_bp.get('/filters', responses={"200": FilterOptions})
+    return {'recipes': [serialize_random_recipe(recipe) for recipe in recipes]}, 200
+
+
+@recipe_bp.get('/filters', responses={"200": FilterOptions, "304": None})
 @login_required
 def get_filters():
-    filters = get_available_filters()
-    return filters, 200
+    filters, etag = get_available_filters()
+
+    response = jsonify(filters)
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.max_age = current_app.config.get('FILTERS_MAX_AGE', 60)
+    return response.make_conditional(request)
 
 
 @recipe_bp.get('/ingredients/search', responses={"200": IngredientSearchResponse})
@@ -135,25 +159,40 @@ def search_ingredients(query: IngredientSearchQuery):
     }, 200
 
 
-@recipe_bp.get('/favorites', responses={"200": FavoritesListResponse, "404": MessageResponse})
+@recipe_bp.get('/favorites',
+    responses={"200": FavoritesListResponse, "400": MessageResponse, "404": MessageResponse})
 @login_required
-def get_favorites():
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+def get_favorites(query: FieldsQuery):
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
 
-    result = get_user_favorites(user.id)
+    try:
+        fields = parse_fields(query.fields, RecipeSummary.model_fields)
+    except ValueError as e:
+        return {'msg': str(e)}, 400
+
+    result = get_user_favorites(user.id, fields)
     return {'favorites': result['recipes']}, 200
 
 
+@recipe_bp.get('/cook-now', responses={"200": CookNowResponse, "404": MessageResponse})
+@login_required
+def get_cook_now(query: CookNowQuery):
+    user = get_current_user()
+
+    if not user:
+        return {'msg': 'User not found'}, 404
+
+    return get_cook_now_recipes(user.id, query.limit, query.min_coverage), 200
+
+
 @recipe_bp.post('/favorites',
     responses={"201": FavoriteAddResponse, "404": MessageResponse, "409": MessageResponse})
 @login_required
 def add_favorite(body: FavoriteAddBody):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -167,8 +206,7 @@ def add_favorite(body: FavoriteAddBody):
 @login_required
 def remove_favorite(path: RecipeIdPath):
     recipe_id = path.recipe_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -177,17 +215,22 @@ def remove_favorite(path: RecipeIdPath):
     return result, status
 
 
-@recipe_bp.get('/collections', responses={"200": CollectionList, "404": MessageResponse})
+@recipe_bp.get('/collections',
+    responses={"200": CollectionList, "400": MessageResponse, "404": MessageResponse})
 @login_required
 def list_collections(query: CollectionListQuery):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
 
+    try:
+        fields = parse_fields(query.fields, CollectionDetail.model_fields)
+    except ValueError as e:
+        return {'msg': str(e)}, 400
+
     include_recipes = query.include_recipes
-    result = get_user_collections(user.id, include_recipes=include_recipes)
+    result = get_user_collections(user.id, include_recipes=include_recipes, fields=fields)
     return result, 200
 
 
@@ -196,8 +239,7 @@ def list_collections(query: CollectionListQuery):
 @login_required
 def get_collection(path: CollectionIdPath):
     collection_id = path.collection_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -214,8 +256,7 @@ def get_collection(path: CollectionIdPath):
     responses={"201": CollectionCreateResponse, "404": MessageResponse, "409": MessageResponse})
 @login_required
 def create_new_collection(body: CollectionCreateBody):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -229,8 +270,7 @@ def create_new_collection(body: CollectionCreateBody):
 @login_required
 def update_collection_endpoint(path: CollectionIdPath, body: CollectionUpdateBody):
     collection_id = path.collection_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -246,8 +286,7 @@ def update_collection_endpoint(path: CollectionIdPath, body: CollectionUpdateBod
 @login_required
 def delete_collection_endpoint(path: CollectionIdPath):
     collection_id = path.collection_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -261,8 +300,7 @@ def delete_collection_endpoint(path: CollectionIdPath):
 @login_required
 def add_recipe_to_collection_endpoint(path: CollectionIdPath, body: AddRecipeToCollectionBody):
     collection_id = path.collection_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -276,8 +314,7 @@ def add_recipe_to_collection_endpoint(path: CollectionIdPath, body: AddRecipeToC
 @login_required
 def bulk_add_recipes_to_collection_endpoint(path: CollectionIdPath, body: BulkAddRecipesBody):
     collection_id = path.collection_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -292,8 +329,7 @@ def bulk_add_recipes_to_collection_endpoint(path: CollectionIdPath, body: BulkAd
 def remove_recipe_from_collection_endpoint(path: CollectionRecipePath):
     collection_id = path.collection_id
     recipe_id = path.recipe_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -307,8 +343,7 @@ def remove_recipe_from_collection_endpoint(path: CollectionRecipePath):
 @login_required
 def get_recipe_collections_endpoint(path: RecipeIdPath):
     recipe_id = path.recipe_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -52,10 +52,24 @@ class RecipeSummary(BaseModel):
     average_rating: Optional[float]
     is_favorite: bool
     in_collections_count: int
+    snippet: Optional[str] = None
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class RecipeFacets(BaseModel):
+    categories: list[FacetCount]
+    cuisines: list[FacetCount]
+    meal_types: list[FacetCount]
 
 
 class RecipeListResponse(BaseModel):
     recipes: list[RecipeSummary]
+    next_cursor: Optional[str] = None
+    facets: Optional[RecipeFacets] = None
 
 
 class CollectionInfo(BaseModel):
@@ -122,6 +136,26 @@ class FavoritesListResponse(BaseModel):
     favorites: list[RecipeSummary]
 
 
+class CookNowIngredient(BaseModel):
+    ingredient_id: int
+    name: str
+    quantity: Optional[float]
+    unit: Optional[str]
+    status: str
+
+
+class CookNowRecipe(RecipeSummary):
+    matched_count: int
+    sufficient_count: int
+    total_ingredients: int
+    coverage: float
+    missing_ingredients: list[CookNowIngredient]
+
+
+class CookNowResponse(BaseModel):
+    recipes: list[CookNowRecipe]
+
+
 class FilterOptions(BaseModel):
     categories: list[str]
     cuisines: list[str]
@@ -205,6 +239,19 @@ class RecipeListQuery(BaseModel):
     meal_type: Optional[str] = None
     sort_by: Optional[str] = "created_at"
     sort_order: Optional[str] = "desc"
+    limit: Optional[int] = Field(None, ge=1, le=100)
+    cursor: Optional[str] = None
+    facets: Optional[bool] = False
+    fields: Optional[str] = None
+
+
+class CookNowQuery(BaseModel):
+    limit: Optional[int] = Field(10, ge=1, le=50)
+    min_coverage: Optional[float] = Field(0.0, ge=0, le=1)
+
+
+class RandomRecipeQuery(BaseModel):
+    count: Optional[int] = Field(None, ge=1, le=20)
 
 
 class IngredientSearchQuery(BaseModel):
@@ -214,3 +261,8 @@ class IngredientSearchQuery(BaseModel):
 
 class CollectionListQuery(BaseModel):
     include_recipes: Optional[bool] = False
+    fields: Optional[str] = None
+
+
+class FieldsQuery(BaseModel):
+    fields: Optional[str] = None
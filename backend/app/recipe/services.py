@@ -1,161 +1,282 @@
-from sqlalchemy import func, or_
+from sqlalchemy import func, and_, or_, tuple_, cast
+from sqlalchemy.orm import joinedload, load_only
 
 from backend.extensions import db
 from ..utils.unit_converter import format_quantity_with_conversions
 from ..utils.storage import build_image_url
+from ..utils.search import build_search_vector, build_search_query, build_headline
+from ..utils.fields import wants, select_fields
 from ..models import (
-    Recipe, Favorite, Rating, RecipeIngredient,
-    Ingredient, RecipeCollection, CollectionItem
+    Recipe, Favorite, RecipeCollection, CollectionItem, RecipeRatingStats, FridgeItem
 )
+from ..rating.services import get_rating_stats, format_average
+from .ingredient_index import ingredient_index
+from .filter_catalog import filter_catalog
+from .cook_index import cook_index
 
+import base64
+import json
+from datetime import datetime
 
-def get_recipe_list(
+
+SORT_COLUMNS = {
+    'created_at': Recipe.created_at,
+    'title': Recipe.title,
+    'id': Recipe.id
+}
+
+SEARCH_VECTOR = build_search_vector(Recipe.title, Recipe.description, Recipe.directions)
+
+RECIPE_CARD_COLUMNS = load_only(
+    Recipe.id, Recipe.title, Recipe.description, Recipe.category,
+    Recipe.cuisine, Recipe.meal_type, Recipe.is_vegan, Recipe.is_vegetarian,
+    Recipe.image_name, Recipe.num_ingredients, Recipe.created_at
+)
+
+FACET_COLUMNS = {
+    'category': Recipe.category,
+    'cuisine': Recipe.cuisine,
+    'meal_type': Recipe.meal_type
+}
+
+FACET_KEYS = {
+    'category': 'categories',
+    'cuisine': 'cuisines',
+    'meal_type': 'meal_types'
+}
+
+
+def encode_cursor(sort_by, sort_order, value, recipe_id):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+
+    payload = json.dumps([sort_by, sort_order, value, recipe_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort_by, sort_order):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort_by, cursor_order, value, last_id = json.loads(
+            base64.urlsafe_b64decode(padded.encode())
+        )
+        if sort_by == 'created_at':
+            value = datetime.fromisoformat(value)
+        elif sort_by == 'relevance':
+            value = float(value)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+    if cursor_sort_by != sort_by or cursor_order != sort_order or not isinstance(last_id, int):
+        raise ValueError('Cursor does not match the requested sort')
+
+    return value, last_id
+
+
+def build_recipe_filters(
     search_query=None, ingredients=None, exclude_ingredients=None,
-    category=None, cuisine=None, is_vegan=None, is_vegetarian=None,
-    meal_type=None, sort_by='created_at', sort_order='desc', user_id=None
+    is_vegan=None, is_vegetarian=None
 ):
-    query = Recipe.query
+    conditions = []
 
+    ts_query = None
     if search_query:
+        ts_query = build_search_query(search_query)
         search_pattern = f'%{search_query}%'
-        query = query.filter(
+        conditions.append(
             or_(
+                SEARCH_VECTOR.op('@@')(ts_query),
                 Recipe.title.ilike(search_pattern),
                 Recipe.description.ilike(search_pattern)
             )
         )
 
-    if ingredients:
-        ingredient_list = [i.strip().lower() for i in ingredients if i.strip()]
-        if ingredient_list:
-            for ing in ingredient_list:
-                subquery = db.session.query(RecipeIngredient.recipe_id).join(
-                    Ingredient, RecipeIngredient.ingredient_id == Ingredient.id
-                ).filter(
-                    func.lower(Ingredient.name).contains(ing)
-                )
-                query = query.filter(Recipe.id.in_(subquery))
-
-    if exclude_ingredients:
-        exclude_list = [i.strip().lower() for i in exclude_ingredients if i.strip()]
-        if exclude_list:
-            for ing in exclude_list:
-                exclude_subquery = db.session.query(RecipeIngredient.recipe_id).join(
-                    Ingredient, RecipeIngredient.ingredient_id == Ingredient.id
-                ).filter(
-                    func.lower(Ingredient.name).contains(ing)
-                )
-                query = query.filter(~Recipe.id.in_(exclude_subquery))
-
-    if category:
-        query = query.filter(func.lower(Recipe.category) == category.lower())
-
-    if cuisine:
-        query = query.filter(func.lower(Recipe.cuisine) == cuisine.lower())
+    ingredient_list = [i.strip().lower() for i in ingredients or [] if i.strip()]
+    exclude_list = [i.strip().lower() for i in exclude_ingredients or [] if i.strip()]
+
+    if ingredient_list or exclude_list:
+        included_ids, excluded_ids = ingredient_index.resolve(ingredient_list, exclude_list)
+        if included_ids is not None:
+            if not included_ids:
+                return None, ts_query
+            conditions.append(Recipe.id.in_(sorted(included_ids)))
+        if excluded_ids:
+            conditions.append(Recipe.id.notin_(sorted(excluded_ids)))
 
     if is_vegan is not None:
-        query = query.filter(Recipe.is_vegan == is_vegan)
+        conditions.append(Recipe.is_vegan == is_vegan)
 
     if is_vegetarian is not None:
-        query = query.filter(Recipe.is_vegetarian == is_vegetarian)
+        conditions.append(Recipe.is_vegetarian == is_vegetarian)
 
-    if meal_type:
-        query = query.filter(func.lower(Recipe.meal_type) == meal_type.lower())
+    return conditions, ts_query
 
-    sort_column = getattr(Recipe, sort_by, Recipe.created_at)
-    if sort_order == 'asc':
-        query = query.order_by(sort_column.asc())
+
+def build_facet_filters(category=None, cuisine=None, meal_type=None):
+    selected = {'category': category, 'cuisine': cuisine, 'meal_type': meal_type}
+
+    return {
+        name: func.lower(FACET_COLUMNS[name]) == value.lower()
+        for name, value in selected.items() if value
+    }
+
+
+def get_recipe_facets(conditions, facet_conditions):
+    if conditions is None:
+        return {key: [] for key in FACET_KEYS.values()}
+
+    facet_counts = []
+    for name in FACET_COLUMNS:
+        other_conditions = [
+            condition for other, condition in facet_conditions.items() if other != name
+        ]
+        count = func.count()
+        if other_conditions:
+            count = count.filter(and_(*other_conditions))
+        facet_counts.append(count)
+
+    rows = db.session.query(
+        *FACET_COLUMNS.values(),
+        *[func.grouping(column) for column in FACET_COLUMNS.values()],
+        *facet_counts
+    ).filter(*conditions).group_by(
+        func.grouping_sets(*[tuple_(column) for column in FACET_COLUMNS.values()])
+    ).all()
+
+    facet_total = len(FACET_COLUMNS)
+    facets = {key: [] for key in FACET_KEYS.values()}
+    for row in rows:
+        for position, name in enumerate(FACET_COLUMNS):
+            if row[facet_total + position] != 0:
+                continue
+
+            value = row[position]
+            count = row[2 * facet_total + position]
+            if value and count:
+                facets[FACET_KEYS[name]].append({'value': value, 'count': count})
+            break
+
+    for values in facets.values():
+        values.sort(key=lambda facet: (-facet['count'], facet['value']))
+
+    return facets
+
+
+def get_recipe_list(
+    search_query=None, ingredients=None, exclude_ingredients=None,
+    category=None, cuisine=None, is_vegan=None, is_vegetarian=None,
+    meal_type=None, sort_by='created_at', sort_order='desc', user_id=None,
+    limit=None, cursor=None, facets=False, fields=None
+):
+    conditions, ts_query = build_recipe_filters(
+        search_query=search_query,
+        ingredients=ingredients,
+        exclude_ingredients=exclude_ingredients,
+        is_vegan=is_vegan,
+        is_vegetarian=is_vegetarian
+    )
+    facet_conditions = build_facet_filters(category=category, cuisine=cuisine, meal_type=meal_type)
+
+    result = {'recipes': [], 'next_cursor': None}
+    if facets:
+        result['facets'] = get_recipe_facets(conditions, facet_conditions)
+
+    if conditions is None:
+        return result
+
+    query = Recipe.query.options(RECIPE_CARD_COLUMNS).filter(
+        *conditions, *facet_conditions.values()
+    )
+
+    if sort_by == 'relevance' and ts_query is not None:
+        sort_column = cast(func.ts_rank_cd(SEARCH_VECTOR, ts_query), db.Float)
     else:
-        query = query.order_by(sort_column.desc())
+        if sort_by not in SORT_COLUMNS:
+            sort_by = 'created_at'
+        sort_column = SORT_COLUMNS[sort_by]
+    if sort_order != 'asc':
+        sort_order = 'desc'
 
-    recipes_list = query.all()
+    query = query.add_columns(sort_column.label('sort_value'))
 
-    if not recipes_list:
-        return {'recipes': []}
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_by, sort_order)
+        if sort_order == 'asc':
+            query = query.filter(tuple_(sort_column, Recipe.id) > tuple_(value, last_id))
+        else:
+            query = query.filter(tuple_(sort_column, Recipe.id) < tuple_(value, last_id))
 
-    recipe_ids = [r.id for r in recipes_list]
+    if sort_order == 'asc':
+        query = query.order_by(sort_column.asc(), Recipe.id.asc())
+    else:
+        query = query.order_by(sort_column.desc(), Recipe.id.desc())
+
+    next_cursor = None
+    if limit:
+        rows = query.limit(limit + 1).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_recipe, last_value = rows[-1]
+            next_cursor = encode_cursor(sort_by, sort_order, last_value, last_recipe.id)
+    else:
+        rows = query.all()
 
-    favorites_set = set()
-    if user_id:
-        favorites = Favorite.query.filter(
-            Favorite.user_id == user_id,
-            Favorite.recipe_id.in_(recipe_ids)
-        ).all()
-        favorites_set = {f.recipe_id for f in favorites}
+    if not rows:
+        return result
 
-    collections_count = {}
-    if user_id:
-        collection_counts_query = db.session.query(
-            CollectionItem.recipe_id,
-            func.count(CollectionItem.collection_id).label('count')
-        ).join(RecipeCollection).filter(
-            RecipeCollection.user_id == user_id,
-            CollectionItem.recipe_id.in_(recipe_ids)
-        ).group_by(CollectionItem.recipe_id).all()
-        collections_count = {r.recipe_id: r.count for r in collection_counts_query}
+    recipes_list = [recipe for recipe, _ in rows]
+    recipe_ids = [r.id for r in recipes_list]
 
-    ratings_dict = {}
-    ratings_query = db.session.query(
-        Rating.recipe_id,
-        func.avg(Rating.score).label('avg_rating')
-    ).filter(
-        Rating.recipe_id.in_(recipe_ids)
-    ).group_by(Rating.recipe_id).all()
-    ratings_dict = {r.recipe_id: r.avg_rating for r in ratings_query}
+    recipes = serialize_recipe_summaries(recipes_list, user_id, fields)
 
-    recipes = []
-    for recipe in recipes_list:
-        is_favorite = recipe.id in favorites_set
-        in_collections_count = collections_count.get(recipe.id, 0)
-        avg_rating = ratings_dict.get(recipe.id)
+    if wants(fields, 'snippet'):
+        snippets = {}
+        if ts_query is not None:
+            snippets_query = db.session.query(
+                Recipe.id,
+                build_headline(ts_query, Recipe.description, Recipe.directions)
+            ).filter(Recipe.id.in_(recipe_ids)).all()
+            snippets = {recipe_id: snippet for recipe_id, snippet in snippets_query}
 
-        recipe_data = {
-            'id': recipe.id,
-            'title': recipe.title,
-            'description': recipe.description,
-            'category': recipe.category,
-            'cuisine': recipe.cuisine,
-            'meal_type': recipe.meal_type,
-            'is_vegan': recipe.is_vegan,
-            'is_vegetarian': recipe.is_vegetarian,
-            'image_url': build_image_url(recipe.image_name),
-            'num_ingredients': recipe.num_ingredients,
-            'average_rating': round(avg_rating, 1) if avg_rating else None,
-            'is_favorite': is_favorite,
-            'in_collections_count': in_collections_count
-        }
-        recipes.append(recipe_data)
+        for recipe_data in recipes:
+            recipe_data['snippet'] = snippets.get(recipe_data['id'])
 
-    return {'recipes': recipes}
+    result['recipes'] = recipes
+    result['next_cursor'] = next_cursor
+    return result
 
 
-def get_recipe_detail(recipe_id, user_id=None):
+def get_recipe_detail(recipe_id, user_id=None, fields=None):
     recipe = db.session.get(Recipe, recipe_id)
     if not recipe:
         return
 
     ingredients = []
-    for ri in recipe.ingredients:
-        formatted = format_quantity_with_conversions(ri.quantity, ri.unit, include_conversions=False)
-        ingredients.append({
-            'id': ri.ingredient.id,
-            'name': ri.ingredient.name,
-            'quantity': formatted['quantity'],
-            'unit': formatted['unit'],
-            'alternatives': formatted['alternatives']
-        })
+    if wants(fields, 'ingredients'):
+        for ri in recipe.ingredients:
+            formatted = format_quantity_with_conversions(ri.quantity, ri.unit, include_conversions=False)
+            ingredients.append({
+                'id': ri.ingredient.id,
+                'name': ri.ingredient.name,
+                'quantity': formatted['quantity'],
+                'unit': formatted['unit'],
+                'alternatives': formatted['alternatives']
+            })
 
-    ratings_data = get_recipe_ratings_summary(recipe_id)
+    ratings_data = None
+    if wants(fields, 'ratings'):
+        ratings_data = get_recipe_ratings_summary(recipe_id)
 
     is_favorite = False
-    in_collections = []
-    if user_id:
+    if user_id and wants(fields, 'is_favorite'):
         favorite = Favorite.query.filter_by(
             user_id=user_id,
             recipe_id=recipe_id
         ).first()
         is_favorite = favorite is not None
 
+    in_collections = []
+    if user_id and wants(fields, 'in_collections'):
         collection_items = CollectionItem.query.join(
             RecipeCollection
         ).filter(
@@ -170,13 +291,13 @@ def get_recipe_detail(recipe_id, user_id=None):
             })
 
     author_data = None
-    if recipe.author:
+    if recipe.author and wants(fields, 'author'):
         author_data = {
             'id': recipe.author.id,
             'username': recipe.author.username
         }
 
-    return {
+    return select_fields({
         'id': recipe.id,
         'title': recipe.title,
         'description': recipe.description,
@@ -193,32 +314,36 @@ def get_recipe_detail(recipe_id, user_id=None):
         'is_favorite': is_favorite,
         'in_collections': in_collections,
         'created_at': recipe.created_at.isoformat() if recipe.created_at else None
-    }
+    }, fields)
 
 
-def serialize_recipe_summary(recipe, user_id=None):
-    is_favorite = False
-    in_collections_count = 0
+def serialize_recipe_summaries(recipes, user_id=None, fields=None):
+    recipe_ids = [r.id for r in recipes]
+    if not recipe_ids:
+        return []
 
-    if user_id:
-        favorite = Favorite.query.filter_by(
-            user_id=user_id,
-            recipe_id=recipe.id
-        ).first()
-        is_favorite = favorite is not None
+    favorites_set = set()
+    collections_count = {}
+    if user_id and wants(fields, 'is_favorite'):
+        favorites = db.session.query(Favorite.recipe_id).filter(
+            Favorite.user_id == user_id,
+            Favorite.recipe_id.in_(recipe_ids)
+        ).all()
+        favorites_set = {f.recipe_id for f in favorites}
 
-        in_collections_count = CollectionItem.query.join(
-            RecipeCollection
-        ).filter(
+    if user_id and wants(fields, 'in_collections_count'):
+        collection_counts_query = db.session.query(
+            CollectionItem.recipe_id,
+            func.count(CollectionItem.collection_id).label('count')
+        ).join(RecipeCollection).filter(
             RecipeCollection.user_id == user_id,
-            CollectionItem.recipe_id == recipe.id
-        ).count()
+            CollectionItem.recipe_id.in_(recipe_ids)
+        ).group_by(CollectionItem.recipe_id).all()
+        collections_count = {r.recipe_id: r.count for r in collection_counts_query}
 
-    avg_rating = db.session.query(func.avg(Rating.score)).filter(
-        Rating.recipe_id == recipe.id
-    ).scalar()
+    ratings_dict = get_rating_stats(recipe_ids) if wants(fields, 'average_rating') else {}
 
-    return {
+    return [select_fields({
         'id': recipe.id,
         'title': recipe.title,
         'description': recipe.description,
@@ -229,25 +354,52 @@ def serialize_recipe_summary(recipe, user_id=None):
         'is_vegetarian': recipe.is_vegetarian,
         'image_url': build_image_url(recipe.image_name),
         'num_ingredients': recipe.num_ingredients,
-        'average_rating': round(avg_rating, 1) if avg_rating else None,
-        'is_favorite': is_favorite,
-        'in_collections_count': in_collections_count
-    }
+        'average_rating': format_average(ratings_dict.get(recipe.id)),
+        'is_favorite': recipe.id in favorites_set,
+        'in_collections_count': collections_count.get(recipe.id, 0)
+    }, fields) for recipe in recipes]
+
+
+def serialize_recipe_summary(recipe, user_id=None):
+    return serialize_recipe_summaries([recipe], user_id)[0]
+
+
+def serialize_chef_recipe_summaries(recipes, fields=None):
+    ratings_dict = {}
+    if wants(fields, 'average_rating', 'rating_count'):
+        ratings_dict = get_rating_stats([r.id for r in recipes])
+
+    summaries = []
+    for recipe in recipes:
+        rating_stats = ratings_dict.get(recipe.id)
+        summaries.append(select_fields({
+            'id': recipe.id,
+            'title': recipe.title,
+            'description': recipe.description,
+            'image_url': build_image_url(recipe.image_name),
+            'category': recipe.category,
+            'cuisine': recipe.cuisine,
+            'num_ingredients': recipe.num_ingredients,
+            'average_rating': format_average(rating_stats),
+            'rating_count': rating_stats.rating_count if rating_stats else 0,
+            'created_at': recipe.created_at.isoformat() if recipe.created_at else None
+        }, fields))
+
+    return summaries
 
 
 def get_recipe_ratings_summary(recipe_id):
-    ratings = Rating.query.filter_by(recipe_id=recipe_id).all()
+    rating_stats = db.session.get(RecipeRatingStats, recipe_id)
 
-    if not ratings:
+    if not rating_stats or not rating_stats.rating_count:
         return {
             'average': None,
             'count': 0
         }
 
-    total_score = sum(r.score for r in ratings)
     return {
-        'average': round(total_score / len(ratings), 1),
-        'count': len(ratings)
+        'average': format_average(rating_stats),
+        'count': rating_stats.rating_count
     }
 
 
@@ -286,8 +438,8 @@ def remove_from_favorites(user_id, recipe_id):
     return {'msg': 'Recipe removed from favorites'}, 200
 
 
-def get_user_favorites(user_id):
-    query = Recipe.query.join(
+def get_user_favorites(user_id, fields=None):
+    query = Recipe.query.options(RECIPE_CARD_COLUMNS).join(
         Favorite, Recipe.id == Favorite.recipe_id
     ).filter(
         Favorite.user_id == user_id
@@ -295,49 +447,85 @@ def get_user_favorites(user_id):
         Favorite.created_at.desc()
     )
 
-    recipes = []
-    for recipe in query.all():
-        recipe_data = serialize_recipe_summary(recipe, user_id)
-        recipes.append(recipe_data)
+    return {'recipes': serialize_recipe_summaries(query.all(), user_id, fields)}
 
-    return {'recipes': recipes}
 
+def get_cook_now_recipes(user_id, limit=10, min_coverage=0.0):
+    fridge = {
+        ingredient_id: (quantity, unit)
+        for ingredient_id, quantity, unit in db.session.query(
+            FridgeItem.ingredient_id, FridgeItem.quantity, FridgeItem.unit
+        ).filter(FridgeItem.user_id == user_id)
+    }
+    if not fridge:
+        return {'recipes': []}
 
-def get_available_filters():
-    categories = db.session.query(Recipe.category).distinct().filter(
-        Recipe.category.isnot(None)
-    ).all()
-    categories = [c[0] for c in categories if c[0]]
+    ranked = cook_index.rank(fridge, limit, min_coverage)
+    if not ranked:
+        return {'recipes': []}
 
-    cuisines = db.session.query(Recipe.cuisine).distinct().filter(
-        Recipe.cuisine.isnot(None)
-    ).all()
-    cuisines = [c[0] for c in cuisines if c[0]]
+    recipes = {
+        recipe.id: recipe for recipe in Recipe.query.options(RECIPE_CARD_COLUMNS).filter(
+            Recipe.id.in_([entry['recipe_id'] for entry in ranked])
+        )
+    }
+    ranked = [entry for entry in ranked if entry['recipe_id'] in recipes]
+    summaries = serialize_recipe_summaries(
+        [recipes[entry['recipe_id']] for entry in ranked], user_id
+    )
 
-    meal_types = db.session.query(Recipe.meal_type).distinct().filter(
-        Recipe.meal_type.isnot(None)
-    ).all()
-    meal_types = [m[0] for m in meal_types if m[0]]
+    results = []
+    for summary, entry in zip(summaries, ranked):
+        summary.update(entry)
+        del summary['recipe_id']
+        results.append(summary)
 
-    return {
-        'categories': sorted(categories),
-        'cuisines': sorted(cuisines),
-        'meal_types': sorted(meal_types) if meal_types else
-            ['breakfast', 'lunch', 'dinner', 'snack', 'dessert'],
-        'sort_options': [
-            {'value': 'created_at', 'label': 'Date Added'},
-            {'value': 'title', 'label': 'Title'}
-        ]
-    }
+    return {'recipes': results}
 
 
-def get_user_collections(user_id, include_recipes=False):
+def get_available_filters():
+    return filter_catalog.get()
+
+
+def get_user_collections(user_id, include_recipes=False, fields=None):
     collections = RecipeCollection.query.filter_by(user_id=user_id).order_by(
         RecipeCollection.created_at.desc()
     ).all()
+    collection_ids = [col.id for col in collections]
+
+    if not collection_ids:
+        return {'collections': []}
+
+    counts = {}
+    if wants(fields, 'recipe_count'):
+        counts = dict(db.session.query(
+            CollectionItem.collection_id,
+            func.count(CollectionItem.recipe_id)
+        ).filter(
+            CollectionItem.collection_id.in_(collection_ids)
+        ).group_by(CollectionItem.collection_id).all())
+
+    include_recipes = include_recipes and wants(fields, 'recipes')
+    items_by_collection = {}
+    ratings_dict = {}
+    if include_recipes:
+        items = CollectionItem.query.options(
+            joinedload(CollectionItem.recipe)
+        ).filter(
+            CollectionItem.collection_id.in_(collection_ids)
+        ).order_by(CollectionItem.added_at.desc()).all()
+
+        for item in items:
+            items_by_collection.setdefault(item.collection_id, []).append(item)
+        ratings_dict = get_rating_stats({item.recipe_id for item in items})
 
     return {
-        'collections': [col.to_dict(include_recipes=include_recipes) for col in collections]
+        'collections': [select_fields(col.to_dict(
+            include_recipes=include_recipes,
+            recipe_count=counts.get(col.id, 0),
+            items=items_by_collection.get(col.id, []),
+            ratings=ratings_dict
+        ), fields) for col in collections]
     }
 
 
@@ -1,14 +1,13 @@
-from datetime import datetime, timedelta
-
 from flask_openapi3 import APIBlueprint, Tag
-from flask_jwt_extended import get_jwt_identity
+from flask_jwt_extended import get_current_user
 
 from backend.extensions import db
-from ..auth.models import User
 from ..auth.schemas import UnauthorizedResponse
 from ..decorators import login_required
-from ..models import ShoppingList, Ingredient, Recipe, MealPlan, FridgeItem
-from ..utils.unit_converter import format_quantity_with_conversions, get_unit_group, convert_unit
+from ..models import ShoppingList, Ingredient, Recipe, FridgeItem
+from ..utils.unit_converter import format_quantity_with_conversions
+from ..planning.services import resolve_date_range
+from .services import generate_shopping_list_from_meal_plan, transfer_purchased_to_fridge
 from .schemas import (
     RecipeIdPath, ItemIdPath,
     ShoppingListResponse, AddItemBody, AddItemResponse, MessageResponse,
@@ -29,8 +28,7 @@ shopping_bp = APIBlueprint(
 @shopping_bp.get('', responses={"200": ShoppingListResponse, "404": MessageResponse})
 @login_required
 def get_shopping_list():
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -73,8 +71,7 @@ def get_shopping_list():
     responses={"200": AddItemResponse, "201": AddItemResponse, "400": MessageResponse, "404": MessageResponse})
 @login_required
 def add_item(body: AddItemBody):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -127,8 +124,7 @@ def add_item(body: AddItemBody):
 @login_required
 def add_from_recipe(path: RecipeIdPath):
     recipe_id = path.recipe_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -170,62 +166,26 @@ def add_from_recipe(path: RecipeIdPath):
 
 
 @shopping_bp.post('/from-meal-plan',
-    responses={"201": FromMealPlanResponse, "404": MessageResponse})
+    responses={"201": FromMealPlanResponse, "400": MessageResponse, "404": MessageResponse})
 @login_required
 def add_from_meal_plan(body: FromMealPlanBody):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
 
-    if body.start_date:
-        start_date = datetime.fromisoformat(body.start_date.replace('Z', '+00:00')).date()
-    else:
-        today = datetime.now().date()
-        start_date = today - timedelta(days=today.weekday())
-
-    if body.end_date:
-        end_date = datetime.fromisoformat(body.end_date.replace('Z', '+00:00')).date()
-    else:
-        end_date = start_date + timedelta(days=6)
-
-    meal_plans = MealPlan.query.filter(
-        MealPlan.user_id == user.id,
-        MealPlan.plan_date >= start_date,
-        MealPlan.plan_date <= end_date,
-        MealPlan.recipe_id.isnot(None)
-    ).all()
-
-    added_count = 0
-
-    for meal_plan in meal_plans:
-        recipe = meal_plan.recipe
-        if recipe:
-            for ri in recipe.ingredients:
-                existing = ShoppingList.query.filter_by(
-                    user_id=user.id,
-                    ingredient_id=ri.ingredient_id
-                ).first()
-
-                if not existing:
-                    item = ShoppingList(
-                        user_id=user.id,
-                        ingredient_id=ri.ingredient_id,
-                        amount=ri.quantity,
-                        unit=ri.unit,
-                        source_type='meal_plan',
-                        source_id=meal_plan.id
-                    )
-                    db.session.add(item)
-                    added_count += 1
+    try:
+        start_date, end_date = resolve_date_range(body.start_date, body.end_date)
+    except ValueError as e:
+        return {'msg': str(e)}, 400
 
-    db.session.commit()
+    result = generate_shopping_list_from_meal_plan(
+        user.id, start_date, end_date, subtract_fridge=body.subtract_fridge
+    )
 
     return {
         'msg': f'Shopping list generated from meal plan ({start_date} to {end_date})',
-        'added_count': added_count,
-        'meal_plans_processed': len(meal_plans)
+        **result
     }, 201
 
 
@@ -234,8 +194,7 @@ def add_from_meal_plan(body: FromMealPlanBody):
 @login_required
 def toggle_purchased(path: ItemIdPath):
     item_id = path.item_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -258,8 +217,7 @@ def toggle_purchased(path: ItemIdPath):
 @login_required
 def update_item(path: ItemIdPath, body: UpdateItemBody):
     item_id = path.item_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -283,8 +241,7 @@ def update_item(path: ItemIdPath, body: UpdateItemBody):
 @login_required
 def delete_item(path: ItemIdPath):
     item_id = path.item_id
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -303,8 +260,7 @@ def delete_item(path: ItemIdPath):
     responses={"200": BulkDeleteResponse, "404": MessageResponse})
 @login_required
 def bulk_delete_items(body: BulkDeleteBody):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -326,18 +282,14 @@ def bulk_delete_items(body: BulkDeleteBody):
     responses={"200": TransferResponse, "404": MessageResponse})
 @login_required
 def transfer_to_fridge():
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
 
-    purchased_items = ShoppingList.query.filter_by(
-        user_id=user.id,
-        is_purchased=True
-    ).all()
+    result = transfer_purchased_to_fridge(user.id)
 
-    if not purchased_items:
+    if not result:
         return {
             'msg': 'No purchased items to transfer',
             'transferred_count': 0,
@@ -345,74 +297,17 @@ def transfer_to_fridge():
             'total_processed': 0
         }, 200
 
-    transferred_count = 0
-    updated_count = 0
-
-    for shop_item in purchased_items:
-        if not shop_item.ingredient_id:
-            continue
-
-        fridge_item = FridgeItem.query.filter_by(
-            user_id=user.id,
-            ingredient_id=shop_item.ingredient_id
-        ).first()
-
-        shop_unit = shop_item.unit or (
-            shop_item.ingredient.default_unit if shop_item.ingredient else None
-        )
-
-        if fridge_item:
-            try:
-                amount = float(shop_item.amount) if shop_item.amount else 0
-
-                if shop_unit and fridge_item.unit:
-                    shop_group = get_unit_group(shop_unit)
-                    fridge_group = get_unit_group(fridge_item.unit)
-
-                    if shop_group and fridge_group and shop_group == fridge_group:
-                        converted_amount = convert_unit(amount, shop_unit, fridge_item.unit)
-                        if converted_amount:
-                            amount = converted_amount
-
-                fridge_item.quantity = (fridge_item.quantity or 0) + amount
-                updated_count += 1
-            except (ValueError, TypeError):
-                fridge_item.quantity = (fridge_item.quantity or 0) + (
-                    float(shop_item.amount) if shop_item.amount else 0
-                )
-                updated_count += 1
-        else:
-            try:
-                amount = float(shop_item.amount) if shop_item.amount else None
-            except ValueError:
-                amount = None
-
-            new_fridge_item = FridgeItem(
-                user_id=user.id,
-                ingredient_id=shop_item.ingredient_id,
-                quantity=amount,
-                unit=shop_unit
-            )
-            db.session.add(new_fridge_item)
-            transferred_count += 1
-
-        db.session.delete(shop_item)
-
-    db.session.commit()
-
     return {
         'msg': 'Purchased items transferred to fridge',
-        'transferred_count': transferred_count,
-        'updated_count': updated_count,
-        'total_processed': transferred_count + updated_count
+        **result,
+        'total_processed': result['transferred_count'] + result['updated_count']
     }, 200
 
 
 @shopping_bp.delete('/clear', responses={"200": MessageResponse, "404": MessageResponse})
 @login_required
 def clear_list(query: ClearListQuery):
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -435,8 +330,7 @@ def clear_list(query: ClearListQuery):
     responses={"200": CompareResponse, "404": MessageResponse})
 @login_required
 def compare_with_fridge():
-    current_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_email).first()
+    user = get_current_user()
 
     if not user:
         return {'msg': 'User not found'}, 404
@@ -47,6 +47,7 @@ class AddItemBody(BaseModel):
 class FromMealPlanBody(BaseModel):
     start_date: Optional[str] = None
     end_date: Optional[str] = None
+    subtract_fridge: bool = False
 
 
 class FromRecipeResponse(BaseModel):
@@ -55,10 +56,24 @@ class FromRecipeResponse(BaseModel):
     updated_count: int
 
 
+class UnitQuantity(BaseModel):
+    quantity: float
+    unit: str
+
+
+class MixedUnitIngredient(BaseModel):
+    ingredient_id: int
+    name: str
+    quantities: list[UnitQuantity]
+
+
 class FromMealPlanResponse(BaseModel):
     msg: str
     added_count: int
+    updated_count: int = 0
+    skipped_count: int = 0
     meal_plans_processed: int
+    mixed_unit_ingredients: list[MixedUnitIngredient] = []
 
 
 class ToggleResponse(BaseModel):
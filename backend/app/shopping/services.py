@@ -0,0 +1,216 @@
+from sqlalchemy import and_, func, literal_column
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.extensions import db
+from ..models import ShoppingList, MealPlan, Ingredient, FridgeItem
+from ..fridge.services import add_quantities
+from ..planning.services import get_needed_ingredient_totals, group_needed_ingredients
+from ..utils.unit_converter import convert_unit, get_unit_group, get_primary_unit
+
+from datetime import datetime
+
+
+def remaining_quantity(needed, fridge_data):
+    if not fridge_data or not needed['needed_total']:
+        return needed['needed_total']
+
+    fridge_qty = fridge_data['quantity'] or 0
+    fridge_unit = fridge_data['unit']
+    needed_unit = needed['needed_unit']
+
+    if fridge_unit and needed_unit and fridge_unit != needed_unit:
+        fridge_qty = convert_unit(fridge_qty, fridge_unit, needed_unit)
+        if fridge_qty is None:
+            return needed['needed_total']
+
+    return round(needed['needed_total'] - fridge_qty, 2)
+
+
+def total_by_unit_group(quantities):
+    totals = {}
+    for unit, qty in quantities.items():
+        if qty <= 0:
+            continue
+
+        base_unit = get_primary_unit(unit)
+        converted = convert_unit(qty, unit, base_unit)
+        if converted is None:
+            base_unit, converted = unit, qty
+
+        group = get_unit_group(base_unit) or base_unit
+        total, _ = totals.get(group, (0, base_unit))
+        totals[group] = (total + converted, base_unit)
+
+    return list(totals.values())
+
+
+def build_meal_plan_shopping_rows(user_id, start_date, end_date, subtract_fridge=False):
+    needed = group_needed_ingredients(
+        get_needed_ingredient_totals(user_id, start_date, end_date)
+    )
+
+    now = datetime.now()
+    rows = []
+    mixed = []
+    for ingredient_id, data in needed.items():
+        totals = total_by_unit_group(data['quantities'])
+
+        if len(totals) > 1:
+            mixed.append({
+                'ingredient_id': ingredient_id,
+                'name': data['name'],
+                'quantities': [
+                    {'quantity': round(total, 2), 'unit': unit} for total, unit in totals
+                ]
+            })
+            continue
+
+        total, unit = totals[0] if totals else (0, None)
+        amount = round(total, 2)
+        if subtract_fridge:
+            amount = remaining_quantity(
+                {'needed_total': amount, 'needed_unit': unit}, data['fridge']
+            )
+            if amount is not None and amount <= 0:
+                continue
+
+        rows.append({
+            'user_id': user_id,
+            'ingredient_id': ingredient_id,
+            'amount': amount,
+            'unit': unit,
+            'is_purchased': False,
+            'source_type': 'meal_plan',
+            'source_id': None,
+            'created_at': now
+        })
+
+    return rows, mixed
+
+
+def generate_shopping_list_from_meal_plan(user_id, start_date, end_date, subtract_fridge=False):
+    meal_plans_processed = MealPlan.query.filter(
+        MealPlan.user_id == user_id,
+        MealPlan.plan_date >= start_date,
+        MealPlan.plan_date <= end_date,
+        MealPlan.recipe_id.isnot(None)
+    ).count()
+
+    rows, mixed = build_meal_plan_shopping_rows(user_id, start_date, end_date, subtract_fridge)
+
+    added = updated = 0
+    if rows:
+        statement = insert(ShoppingList).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[ShoppingList.user_id, ShoppingList.ingredient_id],
+            set_={
+                'amount': statement.excluded.amount,
+                'unit': statement.excluded.unit
+            },
+            where=and_(
+                ShoppingList.source_type == 'meal_plan',
+                ShoppingList.is_purchased.is_(False)
+            )
+        ).returning(literal_column('xmax = 0').label('inserted'))
+
+        for inserted, in db.session.execute(statement):
+            if inserted:
+                added += 1
+            else:
+                updated += 1
+
+    db.session.commit()
+
+    return {
+        'added_count': added,
+        'updated_count': updated,
+        'skipped_count': len(rows) - added - updated,
+        'meal_plans_processed': meal_plans_processed,
+        'mixed_unit_ingredients': mixed
+    }
+
+
+def parse_amount(amount):
+    try:
+        return float(amount) if amount else None
+    except (ValueError, TypeError):
+        return None
+
+
+def transfer_purchased_to_fridge(user_id):
+    purchased = db.session.query(
+        ShoppingList.id,
+        ShoppingList.ingredient_id,
+        ShoppingList.amount,
+        ShoppingList.unit,
+        Ingredient.default_unit,
+        FridgeItem.id.label('fridge_item_id'),
+        FridgeItem.unit.label('fridge_unit')
+    ).join(
+        Ingredient, Ingredient.id == ShoppingList.ingredient_id
+    ).outerjoin(
+        FridgeItem, and_(
+            FridgeItem.user_id == user_id,
+            FridgeItem.ingredient_id == ShoppingList.ingredient_id
+        )
+    ).filter(
+        ShoppingList.user_id == user_id,
+        ShoppingList.is_purchased.is_(True)
+    ).with_for_update(of=ShoppingList).all()
+
+    if not purchased:
+        return None
+
+    now = datetime.now()
+    conversions = {}
+    rows = {}
+    transferred = updated = 0
+
+    for item in purchased:
+        amount = parse_amount(item.amount)
+        unit = item.unit or item.default_unit
+
+        if item.fridge_item_id is not None:
+            amount = amount or 0
+            target_unit = item.fridge_unit
+            if unit and target_unit and get_unit_group(unit) and get_unit_group(unit) == get_unit_group(target_unit):
+                key = (amount, unit, target_unit)
+                if key not in conversions:
+                    conversions[key] = convert_unit(amount, unit, target_unit)
+                amount = conversions[key] or amount
+            updated += 1
+        else:
+            target_unit = unit
+            transferred += 1
+
+        if item.ingredient_id in rows:
+            row = rows[item.ingredient_id]
+            row['quantity'] = add_quantities(row['quantity'], amount)
+        else:
+            rows[item.ingredient_id] = {
+                'user_id': user_id,
+                'ingredient_id': item.ingredient_id,
+                'quantity': amount,
+                'unit': target_unit,
+                'added_at': now,
+                'updated_at': now
+            }
+
+    statement = insert(FridgeItem).values(list(rows.values()))
+    statement = statement.on_conflict_do_update(
+        index_elements=[FridgeItem.user_id, FridgeItem.ingredient_id],
+        set_={
+            'quantity': func.coalesce(FridgeItem.quantity, 0)
+            + func.coalesce(statement.excluded.quantity, 0),
+            'updated_at': statement.excluded.updated_at
+        }
+    )
+    db.session.execute(statement)
+
+    ShoppingList.query.filter(
+        ShoppingList.id.in_([item.id for item in purchased])
+    ).delete(synchronize_session=False)
+
+    db.session.commit()
+
+    return {'transferred_count': transferred, 'updated_count': updated}
@@ -0,0 +1,22 @@
+def parse_fields(value, allowed):
+    if not value:
+        return None
+
+    fields = {field.strip() for field in value.split(',') if field.strip()}
+    unknown = fields - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    fields.add('id')
+    return fields
+
+
+def wants(fields, *names):
+    return fields is None or any(name in fields for name in names)
+
+
+def select_fields(data, fields):
+    if fields is None:
+        return data
+
+    return {key: value for key, value in data.items() if key in fields}
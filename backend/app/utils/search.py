@@ -0,0 +1,27 @@
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects import postgresql
+
+
+SEARCH_CONFIG = literal_column("'english'")
+HEADLINE_OPTIONS = 'StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=12, MaxFragments=2'
+
+
+def build_search_document(*columns):
+    document = None
+    for column in columns:
+        part = func.coalesce(column, literal_column("''"))
+        document = part if document is None else document + literal_column("' '") + part
+
+    return document
+
+
+def build_search_vector(*columns):
+    return postgresql.to_tsvector(SEARCH_CONFIG, build_search_document(*columns))
+
+
+def build_search_query(search_query):
+    return postgresql.websearch_to_tsquery(SEARCH_CONFIG, search_query)
+
+
+def build_headline(ts_query, *columns):
+    return postgresql.ts_headline(SEARCH_CONFIG, build_search_document(*columns), ts_query, HEADLINE_OPTIONS)
@@ -46,6 +46,26 @@ class Config:
     MAIL_PASSWORD = os.environ["MAIL_PASSWORD"]
     MAIL_DEFAULT_SENDER = os.environ.get("MAIL_DEFAULT_SENDER", os.environ["MAIL_USERNAME"])
 
+    EMAIL_DISPATCHER_ENABLED = os.getenv("EMAIL_DISPATCHER_ENABLED", "0").lower() in ['true', '1']
+    EMAIL_POLL_INTERVAL = int(os.getenv("EMAIL_POLL_INTERVAL", "30"))
+    EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+    EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+    EMAIL_RETRY_BASE_DELAY = int(os.getenv("EMAIL_RETRY_BASE_DELAY", "30"))
+    EMAIL_CLAIM_TIMEOUT = int(os.getenv("EMAIL_CLAIM_TIMEOUT", "300"))
+    EMAIL_RETENTION_DAYS = int(os.getenv("EMAIL_RETENTION_DAYS", "7"))
+
+    CATALOG_CACHE_TTL = int(os.getenv("CATALOG_CACHE_TTL", "300"))
+    FILTERS_MAX_AGE = int(os.getenv("FILTERS_MAX_AGE", "60"))
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "30"))
+    PLANNING_STATS_CACHE_TTL = int(os.getenv("PLANNING_STATS_CACHE_TTL", "60"))
+    FRIDGE_SYNC_OVERLAP = int(os.getenv("FRIDGE_SYNC_OVERLAP", "30"))
+    FRIDGE_DELETION_RETENTION_DAYS = int(os.getenv("FRIDGE_DELETION_RETENTION_DAYS", "30"))
+
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+    PASSWORD_SALT_LENGTH = int(os.getenv("PASSWORD_SALT_LENGTH", "16"))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "16"))
+
     ENABLE_DOCS = os.environ["ENABLE_DOCS"].lower() in ['true', '1']
     ADMIN_URL = os.environ["ADMIN_URL"]
     FIREBASE_STORAGE_BASE_URL = os.environ["FIREBASE_STORAGE_BASE_URL"]
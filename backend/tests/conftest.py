@@ -1,10 +1,13 @@
 import os
 import pytest
+from contextlib import contextmanager
+from sqlalchemy import event
 from flask_jwt_extended import create_access_token
 from dotenv import load_dotenv
 from backend.app import create_app
 from backend.extensions import db as _db
 from backend.app.auth.models import User
+from backend.app.planning.stats import planning_stats_cache
 
 
 base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -18,6 +21,8 @@ class TestConfig:
     SQLALCHEMY_DATABASE_URI = os.environ["TEST_DATABASE_URL"]
     SECRET_KEY = "test-secret-key"
     JWT_SECRET_KEY = "test-jwt-secret-key"
+    FIREBASE_STORAGE_BASE_URL = "https://storage.test"
+    MAIL_DEFAULT_SENDER = "noreply@nutrify.test"
 
 
 @pytest.fixture(scope='session')
@@ -34,6 +39,25 @@ def db_session(app):
     yield _db.session
     _db.session.remove()
     _db.drop_all()
+    planning_stats_cache.clear()
+
+
+@pytest.fixture
+def count_queries(app):
+    @contextmanager
+    def recorder():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(_db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(_db.engine, 'before_cursor_execute', record)
+
+    return recorder
 
 
 @pytest.fixture
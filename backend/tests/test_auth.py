@@ -1,6 +1,11 @@
 from datetime import datetime, timezone, timedelta
+from flask_jwt_extended import decode_token
 from werkzeug.security import generate_password_hash
-from backend.app.auth.models import VerificationCode
+from backend.extensions import db, mail
+from backend.app import create_app
+from backend.app.auth.models import User, VerificationCode, EmailOutbox
+from backend.app.auth.email_dispatcher import dispatch_pending_emails
+from backend.app.auth.passwords import password_hasher
 
 
 class TestLogin:
@@ -13,6 +18,17 @@ class TestLogin:
         data = response.get_json()
         assert "access_token" in data
 
+    def test_login_token_claims(self, app, client, consumer_user):
+        response = client.post('/api/auth/login', json={
+            "email": "consumer@test.com",
+            "password": "password123"
+        })
+        claims = decode_token(response.get_json()["access_token"])
+        assert claims["sub"] == "consumer@test.com"
+        assert claims["user_id"] == consumer_user.id
+        assert claims["role"] == "consumer"
+        assert claims["token_version"] == 0
+
     def test_login_wrong_password(self, client, consumer_user):
         response = client.post('/api/auth/login', json={
             "email": "consumer@test.com",
@@ -32,6 +48,41 @@ class TestLogin:
         assert data["msg"] == "Bad email or password"
 
 
+class TestPasswordHashing:
+    def test_login_rehashes_when_method_changes(self, app, client, consumer_user, monkeypatch):
+        assert consumer_user.password_hash.startswith("scrypt:")
+        monkeypatch.setitem(app.config, 'PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1000')
+
+        response = client.post('/api/auth/login', json={
+            "email": "consumer@test.com",
+            "password": "password123"
+        })
+        assert response.status_code == 200
+
+        user = User.query.filter_by(email="consumer@test.com").first()
+        assert user.password_hash.startswith("pbkdf2:sha256:1000$")
+        assert user.check_password("password123")
+
+    def test_upgrade_leaves_commit_to_caller(self, app, db_session, consumer_user, monkeypatch):
+        monkeypatch.setitem(app.config, 'PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1000')
+
+        assert consumer_user.check_password_and_upgrade("password123")
+        assert consumer_user in db_session.dirty
+        db_session.rollback()
+        assert consumer_user.password_hash.startswith("scrypt:")
+
+    def test_process_pool_hashing(self, app, monkeypatch):
+        monkeypatch.setitem(app.config, 'PASSWORD_HASH_WORKERS', 1)
+        try:
+            password_hash = password_hasher.hash("secret123")
+            assert password_hasher.executor._mp_context.get_start_method() == 'forkserver'
+            assert password_hasher.verify(password_hash, "secret123")
+            assert not password_hasher.verify(password_hash, "wrong")
+            assert not password_hasher.needs_rehash(password_hash)
+        finally:
+            password_hasher.shutdown()
+
+
 class TestRegister:
     def test_register_success(self, client, db_session, mocker):
         mocker.patch('backend.app.auth.routes.send_verification_email', return_value=True)
@@ -99,6 +150,140 @@ class TestRegister:
         assert data[0]["msg"] == "String should have at least 3 characters"
 
 
+class TestEmailQueue:
+    def test_register_queues_email(self, client, db_session):
+        with mail.record_messages() as outbox:
+            response = client.post('/api/auth/register', json={
+                "email": "queued@test.com",
+                "username": "queued",
+                "password": "password123"
+            })
+            assert response.status_code == 200
+            assert outbox == []
+
+            email = EmailOutbox.query.filter_by(to_email="queued@test.com").one()
+            assert email.status == 'pending'
+
+            assert dispatch_pending_emails() == 1
+            assert len(outbox) == 1
+            assert outbox[0].recipients == ["queued@test.com"]
+            code = VerificationCode.query.filter_by(email="queued@test.com").one().code
+            assert code in outbox[0].html
+
+        db_session.refresh(email)
+        assert email.status == 'sent'
+        assert email.sent_at is not None
+        assert email.html_body == ''
+        assert email.body is None
+
+    def test_failed_send_retries_with_backoff(self, app, db_session, mocker, monkeypatch):
+        monkeypatch.setitem(app.config, 'EMAIL_MAX_ATTEMPTS', 2)
+        email = EmailOutbox(to_email="retry@test.com", subject="Hi", html_body="<p>Hi</p>")
+        db_session.add(email)
+        db_session.commit()
+
+        mocker.patch('flask_mail.Connection.send', side_effect=ConnectionError("smtp down"))
+        assert dispatch_pending_emails() == 1
+        db_session.refresh(email)
+        assert email.status == 'pending'
+        assert email.attempts == 1
+        assert email.last_error == "smtp down"
+        assert email.next_attempt_at > datetime.now(timezone.utc)
+
+        assert dispatch_pending_emails() == 0
+
+        email.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db_session.commit()
+        assert dispatch_pending_emails() == 1
+        db_session.refresh(email)
+        assert email.status == 'failed'
+        assert email.attempts == 2
+        assert email.html_body == ''
+
+
+    def test_rows_are_claimed_before_smtp(self, app, db_session, mocker):
+        email = EmailOutbox(to_email="claim@test.com", subject="Hi", html_body="<p>Hi</p>")
+        db_session.add(email)
+        db_session.commit()
+        email_id = email.id
+        seen = []
+
+        def send(message):
+            with db.engine.connect() as connection:
+                seen.append(connection.execute(
+                    EmailOutbox.__table__.select().where(EmailOutbox.id == email_id)
+                ).one().status)
+
+        mocker.patch('flask_mail.Connection.send', side_effect=send)
+        assert dispatch_pending_emails() == 1
+        assert seen == ['sending']
+        assert db_session.get(EmailOutbox, email_id).status == 'sent'
+
+    def test_expired_claim_is_retried(self, db_session):
+        email = EmailOutbox(to_email="stuck@test.com", subject="Hi", html_body="<p>Hi</p>", status="sending",
+                            next_attempt_at=datetime.now(timezone.utc) + timedelta(minutes=5))
+        db_session.add(email)
+        db_session.commit()
+        assert dispatch_pending_emails() == 0
+
+        email.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db_session.commit()
+        assert dispatch_pending_emails() == 1
+        db_session.refresh(email)
+        assert email.status == 'sent'
+
+    def test_dispatcher_starts_with_app_when_enabled(self, app, mocker):
+        start = mocker.patch('backend.app.email_dispatcher.start')
+        config = {key: value for key, value in app.config.items() if key.isupper()}
+
+        create_app(type('DispatcherConfig', (), config))
+        start.assert_not_called()
+
+        config['EMAIL_DISPATCHER_ENABLED'] = True
+        started = create_app(type('DispatcherConfig', (), config))
+        start.assert_called_once_with(started)
+
+
+class TestPurgeVerificationCodes:
+    def test_purge_removes_expired_and_used_codes(self, app, db_session):
+        now = datetime.now(timezone.utc)
+        db_session.add_all([
+            VerificationCode(email="a@test.com", code="111111", purpose="registration",
+                             expires_at=now - timedelta(minutes=1)),
+            VerificationCode(email="b@test.com", code="222222", purpose="registration",
+                             expires_at=now + timedelta(minutes=10), used=True),
+            VerificationCode(email="c@test.com", code="333333", purpose="password_reset",
+                             expires_at=now - timedelta(days=1)),
+            VerificationCode(email="d@test.com", code="444444", purpose="registration",
+                             expires_at=now + timedelta(minutes=10))
+        ])
+        db_session.commit()
+
+        result = app.test_cli_runner().invoke(args=['purge-verification-codes', '--batch-size', '2'])
+        assert result.exit_code == 0
+        assert "Deleted 3" in result.output
+
+        remaining = [code.email for code in VerificationCode.query.all()]
+        assert remaining == ["d@test.com"]
+
+    def test_purge_email_outbox_keeps_pending_and_recent(self, app, db_session):
+        old = datetime.now(timezone.utc) - timedelta(days=30)
+        db_session.add_all([
+            EmailOutbox(to_email="sent@test.com", subject="Hi", html_body="", status="sent", created_at=old),
+            EmailOutbox(to_email="failed@test.com", subject="Hi", html_body="", status="failed", created_at=old),
+            EmailOutbox(to_email="pending@test.com", subject="Hi", html_body="<p>Hi</p>", created_at=old),
+            EmailOutbox(to_email="recent@test.com", subject="Hi", html_body="", status="sent")
+        ])
+        db_session.commit()
+
+        result = app.test_cli_runner().invoke(args=['purge-email-outbox', '--batch-size', '1'])
+        assert result.exit_code == 0
+        assert "Deleted 2" in result.output
+
+        remaining = sorted(email.to_email for email in EmailOutbox.query.all())
+        assert remaining == ["pending@test.com", "recent@test.com"]
+
+
 class TestVerifyRegistration:
     def test_verify_registration_success(self, client, db_session):
         verification = VerificationCode(
@@ -163,6 +348,63 @@ class TestProfile:
         assert data["msg"] == "This is already your username"
 
 
+class TestCurrentUserCache:
+    def test_password_change_keeps_token_valid(self, client, consumer_headers):
+        response = client.post('/api/auth/change-password', headers=consumer_headers, json={
+            "current_password": "password123",
+            "new_password": "password456"
+        })
+        assert response.status_code == 200
+        assert client.get('/api/auth/profile', headers=consumer_headers).status_code == 200
+
+    def test_cached_user_skips_lookup(self, client, consumer_headers, count_queries):
+        client.get('/api/auth/profile', headers=consumer_headers)
+
+        with count_queries() as statements:
+            response = client.get('/api/auth/profile', headers=consumer_headers)
+        assert response.status_code == 200
+        assert response.get_json()["email"] == "consumer@test.com"
+        assert not any('FROM users' in s for s in statements)
+
+        with count_queries() as statements:
+            response = client.get('/api/chef/recipes', headers=consumer_headers)
+        assert response.status_code == 403
+        assert not any('FROM users' in s for s in statements)
+
+    def test_profile_update_invalidates_cache(self, client, consumer_headers):
+        client.get('/api/auth/profile', headers=consumer_headers)
+
+        response = client.put('/api/auth/profile', headers=consumer_headers, json={"username": "renamed"})
+        assert response.status_code == 200
+
+        response = client.get('/api/auth/profile', headers=consumer_headers)
+        assert response.get_json()["username"] == "renamed"
+
+    def test_role_change_and_delete_invalidate_cache(self, client, consumer_user, consumer_headers, admin_headers):
+        assert client.get('/api/chef/recipes', headers=consumer_headers).status_code == 403
+
+        response = client.put(
+            f'/api/admin/users/{consumer_user.id}/change-role',
+            headers=admin_headers, json={"role": "chef"}
+        )
+        assert response.status_code == 200
+        assert client.get('/api/chef/recipes', headers=consumer_headers).status_code == 401
+
+        response = client.post('/api/auth/login', json={
+            "email": "consumer@test.com",
+            "password": "password123"
+        })
+        chef_headers = {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+        assert client.get('/api/chef/recipes', headers=chef_headers).status_code == 200
+
+        response = client.delete(f'/api/admin/users/{consumer_user.id}', headers=admin_headers)
+        assert response.status_code == 200
+
+        response = client.get('/api/auth/profile', headers=chef_headers)
+        assert response.status_code == 404
+        assert response.get_json()["msg"] == "User not found"
+
+
 class TestChangePassword:
     def test_change_password_success(self, client, consumer_headers):
         response = client.post('/api/auth/change-password',
@@ -31,6 +31,21 @@ class TestGetChefRecipes:
         assert len(data["recipes"]) == 1
         assert data["recipes"][0]["title"] == "Chef's Special"
 
+    def test_get_chef_recipes_sparse_fields(self, client, db_session, chef_headers):
+        user = User.query.filter_by(role='chef').first()
+        db_session.add(Recipe(title="Chef's Special", description="Delicious", author_id=user.id))
+        db_session.commit()
+
+        response = client.get('/api/chef/recipes?fields=title,rating_count', headers=chef_headers)
+        assert response.status_code == 200
+        assert set(response.get_json()["recipes"][0]) == {"id", "title", "rating_count"}
+
+        response = client.get(f'/api/public/chefs/{user.id}/recipes?fields=title')
+        assert set(response.get_json()["recipes"][0]) == {"id", "title"}
+
+        response = client.get('/api/chef/recipes?fields=directions', headers=chef_headers)
+        assert response.status_code == 400
+
 
 class TestCreateRecipe:
     def test_create_recipe_success(self, client, db_session, chef_headers):
@@ -1,4 +1,8 @@
-from backend.app.models import Ingredient, FridgeItem
+
+from datetime import datetime, timedelta
+
+from backend.app.models import Ingredient, FridgeItem, FridgeItemDeletion
+from backend.app.auth.models import User
 
 
 class TestGetFridgeItems:
@@ -263,6 +267,44 @@ class TestBatchAddItems:
         assert updated_item.quantity == 8
 
 
+    def test_batch_add_merges_and_converts_units(self, client, db_session, consumer_headers, count_queries):
+        flour = Ingredient(name="BatchTest Flour", default_unit="gram")
+        sugar = Ingredient(name="BatchTest Sugar", default_unit="gram")
+        db_session.add_all([flour, sugar])
+        db_session.commit()
+
+        client.post('/api/fridge/items', headers=consumer_headers, json={
+            "ingredient_id": flour.id,
+            "quantity": 500,
+            "unit": "gram"
+        })
+
+        flour_id, sugar_id = flour.id, sugar.id
+        with count_queries() as statements:
+            response = client.post('/api/fridge/batch', headers=consumer_headers, json={
+                "items": [
+                    {"ingredient_id": flour_id, "quantity": 2, "unit": "pound"},
+                    {"ingredient_name": "batchtest sugar", "quantity": 100, "unit": "gram"},
+                    {"ingredient_id": sugar_id, "quantity": 50, "unit": "gram"},
+                    {"ingredient_id": flour_id, "quantity": 2, "unit": "piece"},
+                    {"ingredient_name": "BatchTest Missing", "quantity": 1}
+                ]
+            })
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["added"] == 1
+        assert data["updated"] == 2
+        assert [r["status"] for r in data["results"]] == ["updated", "added", "updated", "error", "error"]
+        assert data["results"][4]["error"] == "Ingredient not found"
+        assert len([s for s in statements if 'fridge_items' in s or 'FROM ingredient' in s]) == 3
+
+        db_session.expire_all()
+        assert round(FridgeItem.query.filter_by(ingredient_id=flour_id).one().quantity, 2) == 1407.18
+        sugar_item = FridgeItem.query.filter_by(ingredient_id=sugar_id).one()
+        assert sugar_item.quantity == 150
+        assert sugar_item.unit == "gram"
+
 class TestClearFridge:
     def test_clear_fridge_empty(self, client, consumer_headers):
         response = client.delete('/api/fridge/clear', headers=consumer_headers)
@@ -340,3 +382,117 @@ class TestFridgeSearch:
         assert "Organic Banana" in names
         assert "Banana Chips" in names
         assert "Orange Juice" not in names
+
+
+class TestFridgePagination:
+    def add_items(self, client, db_session, headers, names):
+        ingredients = [Ingredient(name=name, default_unit="piece") for name in names]
+        db_session.add_all(ingredients)
+        db_session.commit()
+        ingredient_ids = [ingredient.id for ingredient in ingredients]
+
+        for ingredient_id in ingredient_ids:
+            client.post('/api/fridge/items', headers=headers, json={
+                "ingredient_id": ingredient_id,
+                "quantity": 1,
+                "unit": "piece"
+            })
+        return ingredient_ids
+
+    def test_items_keyset_pagination(self, client, db_session, consumer_headers):
+        self.add_items(client, db_session, consumer_headers, [f"PageTest Item {i}" for i in range(5)])
+
+        seen = []
+        cursor = None
+        while True:
+            url = '/api/fridge/items?limit=2'
+            if cursor:
+                url += f'&cursor={cursor}'
+            response = client.get(url, headers=consumer_headers)
+            assert response.status_code == 200
+            data = response.get_json()
+            assert data["total"] == 5
+            seen.extend(item["id"] for item in data["items"])
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
+
+    def test_items_invalid_cursor(self, client, consumer_headers):
+        response = client.get('/api/fridge/items?limit=2&cursor=notacursor', headers=consumer_headers)
+        assert response.status_code == 400
+
+    def test_items_since_returns_changed_items(self, app, client, db_session, consumer_headers, monkeypatch):
+        monkeypatch.setitem(app.config, 'FRIDGE_SYNC_OVERLAP', 0)
+        self.add_items(client, db_session, consumer_headers, ["SinceTest Old", "SinceTest Other"])
+
+        response = client.get('/api/fridge/items', headers=consumer_headers)
+        old_item = response.get_json()["items"][0]
+
+        recent = (datetime.now() - timedelta(minutes=1)).isoformat()
+        response = client.get(f'/api/fridge/items?since={recent}', headers=consumer_headers)
+        synced_at = response.get_json()["synced_at"]
+        assert synced_at
+        assert response.get_json()["total"] == 2
+
+        client.put(f'/api/fridge/{old_item["id"]}', headers=consumer_headers, json={"quantity": 4})
+
+        response = client.get(f'/api/fridge/items?since={synced_at}', headers=consumer_headers)
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [item["id"] for item in data["items"]] == [old_item["id"]]
+        assert data["items"][0]["quantity"] == 4
+
+    def test_items_since_reports_deletions(self, app, client, db_session, consumer_headers, monkeypatch):
+        monkeypatch.setitem(app.config, 'FRIDGE_SYNC_OVERLAP', 0)
+        self.add_items(client, db_session, consumer_headers, ["SinceDel One", "SinceDel Two", "SinceDel Three"])
+        ids = [item["id"] for item in client.get('/api/fridge/items', headers=consumer_headers).get_json()["items"]]
+
+        recent = (datetime.now() - timedelta(minutes=1)).isoformat()
+        synced_at = client.get(f'/api/fridge/items?since={recent}', headers=consumer_headers).get_json()["synced_at"]
+        assert client.delete(f'/api/fridge/{ids[0]}', headers=consumer_headers).status_code == 200
+        assert client.delete(f'/api/fridge/{ids[0]}', headers=consumer_headers).status_code == 404
+
+        data = client.get(f'/api/fridge/items?since={synced_at}', headers=consumer_headers).get_json()
+        assert data["items"] == []
+        assert data["deleted_ids"] == [ids[0]]
+
+        response = client.delete('/api/fridge/clear', headers=consumer_headers)
+        assert response.get_json()["msg"] == "Cleared 2 items from fridge"
+
+        data = client.get(f'/api/fridge/items?since={synced_at}', headers=consumer_headers).get_json()
+        assert data["deleted_ids"] == sorted(ids)
+
+    def test_items_since_overlaps_watermark(self, client, db_session, consumer_headers):
+        before = datetime.now()
+        data = client.get(f'/api/fridge/items?since={before.isoformat()}', headers=consumer_headers).get_json()
+        assert datetime.fromisoformat(data["synced_at"]) <= before - timedelta(seconds=29)
+
+    def test_items_since_requires_resync_past_retention(self, app, client, db_session, consumer_headers):
+        old = (datetime.now() - timedelta(days=31)).isoformat()
+        data = client.get(f'/api/fridge/items?since={old}', headers=consumer_headers).get_json()
+        assert data["resync_required"] is True
+        assert "synced_at" not in data
+
+        user = User.query.filter_by(role='consumer').first()
+        db_session.add_all([
+            FridgeItemDeletion(user_id=user.id, item_id=1, deleted_at=datetime.now() - timedelta(days=40)),
+            FridgeItemDeletion(user_id=user.id, item_id=2)
+        ])
+        db_session.commit()
+
+        result = app.test_cli_runner().invoke(args=['purge-fridge-deletions'])
+        assert "Deleted 1 fridge deletion records" in result.output
+        assert [row.item_id for row in FridgeItemDeletion.query.all()] == [2]
+
+    def test_items_load_ingredients_eagerly(self, client, db_session, consumer_headers, count_queries):
+        self.add_items(client, db_session, consumer_headers, [f"EagerTest Item {i}" for i in range(4)])
+
+        with count_queries() as statements:
+            assert client.get('/api/fridge/items', headers=consumer_headers).status_code == 200
+            assert client.get('/api/fridge/search?q=EagerTest', headers=consumer_headers).status_code == 200
+            assert client.get('/api/fridge/stats', headers=consumer_headers).status_code == 200
+
+        assert not [s for s in statements if 'WHERE ingredient.id = ' in s]
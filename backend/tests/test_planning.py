@@ -1,4 +1,6 @@
 from datetime import datetime, timedelta
+
+
 from backend.app.models import MealPlan, Recipe, Ingredient, RecipeIngredient, FridgeItem
 from backend.app.auth.models import User
 
@@ -43,6 +45,72 @@ class TestGetWeeklyPlan:
         assert monday["meals"]["lunch"]["recipe"]["title"] == "Weekly Meal"
 
 
+class TestPlanRange:
+    def test_range_streams_every_day(self, client, db_session, consumer_headers, chef_user, count_queries):
+        user = User.query.filter_by(role='consumer').first()
+        recipes = [Recipe(title=f"Range Meal {i}", author_id=chef_user.id) for i in range(3)]
+        db_session.add_all(recipes)
+        db_session.commit()
+
+        start_date = datetime(2025, 3, 1).date()
+        db_session.add_all([
+            MealPlan(user_id=user.id, plan_date=start_date + timedelta(days=day),
+                     meal_type="dinner", recipe_id=recipes[day % 3].id)
+            for day in range(0, 31, 5)
+        ])
+        db_session.commit()
+
+        with count_queries() as statements:
+            response = client.get(
+                '/api/planning/range?start_date=2025-03-01&end_date=2025-03-31',
+                headers=consumer_headers
+            )
+            data = response.get_json()
+
+        assert response.status_code == 200
+        assert data["start_date"] == "2025-03-01"
+        assert data["end_date"] == "2025-03-31"
+        assert len(data["days"]) == 31
+        assert data["days"][0]["day_name"] == "Saturday"
+        assert data["days"][5]["meals"]["dinner"]["recipe"]["title"] == "Range Meal 2"
+        assert data["days"][6]["meals"]["dinner"] is None
+        assert data["days"][30]["meals"]["dinner"]["recipe"]["title"] == "Range Meal 0"
+        assert len([s for s in statements if 'FROM recipe' in s or 'FROM meal_plans' in s]) == 1
+
+    def test_range_validation(self, client, consumer_headers):
+        response = client.get(
+            '/api/planning/range?start_date=2025-01-01&end_date=2025-06-01',
+            headers=consumer_headers
+        )
+        assert response.status_code == 400
+
+        response = client.get(
+            '/api/planning/range?start_date=2025-02-01&end_date=2025-01-01',
+            headers=consumer_headers
+        )
+        assert response.status_code == 400
+
+        response = client.get('/api/planning/range?start_date=bad', headers=consumer_headers)
+        assert response.status_code == 400
+
+    def test_clear_range(self, client, db_session, consumer_headers):
+        user = User.query.filter_by(role='consumer').first()
+        start_date = datetime(2025, 4, 1).date()
+        db_session.add_all([
+            MealPlan(user_id=user.id, plan_date=start_date + timedelta(days=day), meal_type="lunch")
+            for day in range(20)
+        ])
+        db_session.commit()
+
+        response = client.delete(
+            '/api/planning/clear-week?start_date=2025-04-01&end_date=2025-04-15',
+            headers=consumer_headers
+        )
+        assert response.status_code == 200
+        assert response.get_json()["deleted_count"] == 15
+        assert MealPlan.query.filter_by(user_id=user.id).count() == 5
+
+
 class TestAddMeal:
     def test_add_meal_recipe_not_found(self, client, consumer_headers):
         response = client.post('/api/planning/meals', headers=consumer_headers, json={
@@ -344,6 +412,46 @@ class TestMissingIngredients:
         assert onion["needed_total"] == 1
         assert onion["in_fridge"] is None
 
+    def test_missing_ingredients_aggregates_week_in_one_query(self, client, db_session, consumer_headers, chef_user, count_queries):
+        user = User.query.filter_by(role='consumer').first()
+        flour = Ingredient(name="Week Flour", default_unit="gram")
+        db_session.add(flour)
+        db_session.commit()
+
+        recipes = [Recipe(title=f"Week Bake {i}", author_id=chef_user.id) for i in range(3)]
+        db_session.add_all(recipes)
+        db_session.commit()
+
+        db_session.add_all([
+            RecipeIngredient(recipe_id=recipes[0].id, ingredient_id=flour.id, quantity=200, unit="gram"),
+            RecipeIngredient(recipe_id=recipes[1].id, ingredient_id=flour.id, quantity=1, unit="pound"),
+            RecipeIngredient(recipe_id=recipes[2].id, ingredient_id=flour.id, quantity=100, unit="gram")
+        ])
+        start = datetime.now().date()
+        db_session.add_all([
+            MealPlan(user_id=user.id, plan_date=start + timedelta(days=day),
+                     meal_type=meal_type, recipe_id=recipes[day % 3].id)
+            for day in range(7) for meal_type in ("lunch", "dinner")
+        ])
+        db_session.add(FridgeItem(user_id=user.id, ingredient_id=flour.id, quantity=10, unit="pound"))
+        db_session.commit()
+
+        with count_queries() as statements:
+            response = client.get(
+                f'/api/planning/missing-ingredients?start_date={start.isoformat()}',
+                headers=consumer_headers
+            )
+
+        assert response.status_code == 200
+        assert len([s for s in statements if 'meal_plans' in s]) == 1
+        assert not [s for s in statements if 'FROM recipe_ingredients \nWHERE' in s]
+
+        flour_data = response.get_json()["missing_ingredients"][0]
+        breakdown = {b["unit"]: b["quantity"] for b in flour_data["needed_breakdown"]}
+        assert breakdown == {"gram": 1600.0, "pound": 4.0}
+        assert flour_data["needed_total"] == 3414.37
+        assert flour_data["is_sufficient"] is True
+
 
 class TestBulkImport:
     def test_bulk_import_meals(self, client, db_session, consumer_headers, chef_user):
@@ -442,6 +550,37 @@ class TestBulkImport:
         updated_meal = db_session.get(MealPlan, meal_id)
         assert updated_meal.recipe_id == recipe2.id
 
+    def test_bulk_import_year_in_constant_queries(self, client, db_session, consumer_headers, chef_user, count_queries):
+        recipes = [Recipe(title=f"Year Bulk {i}", author_id=chef_user.id) for i in range(4)]
+        db_session.add_all(recipes)
+        db_session.commit()
+        recipe_ids = [recipe.id for recipe in recipes]
+
+        start_date = datetime(2025, 1, 1).date()
+        meals = [
+            {
+                "plan_date": (start_date + timedelta(days=day)).isoformat(),
+                "meal_type": meal_type,
+                "recipe_id": recipe_ids[day % 4]
+            }
+            for day in range(365) for meal_type in ("breakfast", "lunch", "dinner", "snack")
+        ]
+        meals.append({"plan_date": "2025-01-01", "meal_type": "lunch", "recipe_id": recipe_ids[3]})
+        meals.append({"plan_date": "not-a-date", "meal_type": "lunch"})
+
+        with count_queries() as statements:
+            response = client.post('/api/planning/bulk-import', headers=consumer_headers, json={"meals": meals})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["added"] == 1460
+        assert data["updated"] == 1
+        assert data["errors"] == ["Invalid date format: not-a-date"]
+        assert len([s for s in statements if 'meal_plans' in s or 'FROM recipe' in s]) == 2
+
+        lunch = MealPlan.query.filter_by(plan_date=start_date, meal_type="lunch").one()
+        assert lunch.recipe_id == recipe_ids[3]
+
 
 class TestClearWeek:
     def test_clear_week(self, client, db_session, consumer_headers, chef_user):
@@ -504,3 +643,161 @@ class TestPlanningStats:
     def test_get_planning_stats_unauthorized(self, client):
         response = client.get('/api/planning/stats')
         assert response.status_code == 401
+
+    def test_stats_range_in_single_query(self, client, db_session, consumer_headers, count_queries):
+        user = User.query.filter_by(role='consumer').first()
+        today = datetime.now().date()
+        db_session.add_all([
+            MealPlan(user_id=user.id, plan_date=today, meal_type="dinner"),
+            MealPlan(user_id=user.id, plan_date=today.replace(day=1), meal_type="lunch"),
+            MealPlan(user_id=user.id, plan_date=today - timedelta(days=400), meal_type="lunch")
+        ])
+        db_session.commit()
+
+        with count_queries() as statements:
+            response = client.get('/api/planning/stats?range=month', headers=consumer_headers)
+        assert response.status_code == 200
+        assert len([s for s in statements if 'FROM meal_plans' in s]) == 1
+        data = response.get_json()
+        assert data["total_plans"] == 3
+        assert data["range"] == "month"
+        assert data["range_start"] == today.replace(day=1).isoformat()
+        assert data["range_plans"] == 2
+        assert data["range_meal_type_distribution"] == {"dinner": 1, "lunch": 1}
+
+        response = client.get('/api/planning/stats?range=year', headers=consumer_headers)
+        assert response.get_json()["range_plans"] == 2
+
+        response = client.get('/api/planning/stats?range=decade', headers=consumer_headers)
+        assert response.status_code == 422
+
+    def test_stats_cached_until_meal_write(self, client, db_session, consumer_headers, count_queries):
+        client.get('/api/planning/stats', headers=consumer_headers)
+        with count_queries() as statements:
+            response = client.get('/api/planning/stats', headers=consumer_headers)
+        assert not any('FROM meal_plans' in s for s in statements)
+        assert response.get_json()["total_plans"] == 0
+
+        client.post('/api/planning/meals', headers=consumer_headers, json={
+            "plan_date": "2025-01-01",
+            "meal_type": "lunch"
+        })
+        assert client.get('/api/planning/stats', headers=consumer_headers).get_json()["total_plans"] == 1
+
+        client.post('/api/planning/bulk-import', headers=consumer_headers, json={
+            "meals": [{"plan_date": "2025-01-02", "meal_type": "lunch"}]
+        })
+        assert client.get('/api/planning/stats', headers=consumer_headers).get_json()["total_plans"] == 2
+
+        client.delete('/api/planning/clear-week?start_date=2025-01-01', headers=consumer_headers)
+        assert client.get('/api/planning/stats', headers=consumer_headers).get_json()["total_plans"] == 0
+
+
+class TestCopyWeekAndTemplates:
+    def plan_week(self, db_session, user, chef, start_date):
+        recipes = [Recipe(title=f"Template Meal {i}", author_id=chef.id) for i in range(3)]
+        db_session.add_all(recipes)
+        db_session.commit()
+        db_session.add_all([
+            MealPlan(user_id=user.id, plan_date=start_date, meal_type="breakfast", recipe_id=recipes[0].id),
+            MealPlan(user_id=user.id, plan_date=start_date + timedelta(days=2), meal_type="dinner", recipe_id=recipes[1].id),
+            MealPlan(user_id=user.id, plan_date=start_date + timedelta(days=6), meal_type="lunch", recipe_id=recipes[2].id)
+        ])
+        db_session.commit()
+        return [recipe.id for recipe in recipes]
+
+    def test_copy_week(self, client, db_session, consumer_headers, chef_user):
+        user = User.query.filter_by(role='consumer').first()
+        source = datetime(2025, 6, 2).date()
+        target = source + timedelta(days=7)
+        recipe_ids = self.plan_week(db_session, user, chef_user, source)
+        db_session.add(MealPlan(user_id=user.id, plan_date=target, meal_type="breakfast"))
+        db_session.commit()
+
+        response = client.post('/api/planning/copy-week', headers=consumer_headers, json={
+            "source_start": source.isoformat(),
+            "target_start": target.isoformat(),
+            "overwrite": False
+        })
+        assert response.status_code == 200
+        assert response.get_json()["copied_count"] == 2
+        assert MealPlan.query.filter_by(plan_date=target, meal_type="breakfast").one().recipe_id is None
+
+        response = client.post('/api/planning/copy-week', headers=consumer_headers, json={
+            "source_start": source.isoformat(),
+            "target_start": target.isoformat()
+        })
+        assert response.get_json()["copied_count"] == 3
+
+        db_session.expire_all()
+        copied = {
+            (mp.plan_date, mp.meal_type): mp.recipe_id
+            for mp in MealPlan.query.filter(MealPlan.plan_date >= target).all()
+        }
+        assert copied == {
+            (target, "breakfast"): recipe_ids[0],
+            (target + timedelta(days=2), "dinner"): recipe_ids[1],
+            (target + timedelta(days=6), "lunch"): recipe_ids[2]
+        }
+
+    def test_copy_week_same_week(self, client, consumer_headers):
+        response = client.post('/api/planning/copy-week', headers=consumer_headers, json={
+            "source_start": "2025-06-02",
+            "target_start": "2025-06-02"
+        })
+        assert response.status_code == 400
+
+    def test_template_lifecycle(self, client, db_session, consumer_headers, chef_user):
+        user = User.query.filter_by(role='consumer').first()
+        source = datetime(2025, 6, 2).date()
+        recipe_ids = self.plan_week(db_session, user, chef_user, source)
+
+        response = client.post('/api/planning/templates', headers=consumer_headers, json={
+            "name": "Busy week",
+            "source_start": source.isoformat()
+        })
+        assert response.status_code == 201
+        template = response.get_json()["template"]
+        assert template["meal_count"] == 3
+
+        response = client.post('/api/planning/templates', headers=consumer_headers, json={
+            "name": "Busy week",
+            "source_start": source.isoformat()
+        })
+        assert response.status_code == 409
+
+        response = client.get('/api/planning/templates', headers=consumer_headers)
+        assert response.get_json()["templates"] == [template]
+
+        start = datetime(2025, 9, 1).date()
+        response = client.post(f'/api/planning/templates/{template["id"]}/apply', headers=consumer_headers, json={
+            "start_date": start.isoformat(),
+            "weeks": 4
+        })
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["applied_count"] == 12
+        assert data["end_date"] == (start + timedelta(days=27)).isoformat()
+
+        fourth_week = start + timedelta(days=21)
+        meal = MealPlan.query.filter_by(plan_date=fourth_week + timedelta(days=2), meal_type="dinner").one()
+        assert meal.recipe_id == recipe_ids[1]
+
+        response = client.delete(f'/api/planning/templates/{template["id"]}', headers=consumer_headers)
+        assert response.status_code == 200
+        response = client.post(f'/api/planning/templates/{template["id"]}/apply', headers=consumer_headers, json={})
+        assert response.status_code == 404
+
+    def test_template_name_validation_and_race(self, client, db_session, consumer_headers, mocker):
+        response = client.post('/api/planning/templates', headers=consumer_headers, json={"name": "   "})
+        assert response.status_code == 400
+
+        response = client.post('/api/planning/templates', headers=consumer_headers, json={"name": " Race "})
+        assert response.status_code == 201
+        assert response.get_json()["template"]["name"] == "Race"
+
+        existing = mocker.patch('backend.app.planning.routes.MealPlanTemplate')
+        existing.query.filter_by.return_value.first.return_value = None
+        response = client.post('/api/planning/templates', headers=consumer_headers, json={"name": "Race"})
+        assert response.status_code == 409
+        assert response.get_json()["msg"] == "Template with this name already exists"
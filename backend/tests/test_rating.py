@@ -1,4 +1,4 @@
-from backend.app.models import Recipe, Rating
+from backend.app.models import Recipe, Rating, RecipeRatingStats
 from backend.app.auth.models import User
 
 
@@ -214,3 +214,91 @@ class TestGetUserRatings:
         assert data["total"] == 2
         assert len(data["ratings"]) == 2
         assert any(r["recipe_title"] == "My Rated 1" for r in data["ratings"])
+
+
+class TestRecipeRatingStats:
+    def test_stats_follow_rating_writes(self, client, db_session, consumer_headers, chef_user, chef_headers):
+        recipe = Recipe(title="Stats Recipe", author_id=chef_user.id)
+        db_session.add(recipe)
+        db_session.commit()
+
+        response = client.post(f'/api/recipes/{recipe.id}/ratings', headers=consumer_headers, json={
+            "recipe_id": recipe.id,
+            "score": 4
+        })
+        rating_id = response.get_json()["rating_id"]
+        client.post(f'/api/recipes/{recipe.id}/ratings', headers=chef_headers, json={
+            "recipe_id": recipe.id,
+            "score": 2
+        })
+
+        stats = db_session.get(RecipeRatingStats, recipe.id)
+        db_session.refresh(stats)
+        assert stats.rating_count == 2
+        assert stats.rating_sum == 6
+        assert stats.average_rating == 3
+        assert (stats.score_2_count, stats.score_4_count) == (1, 1)
+
+        client.put(f'/api/ratings/{rating_id}', headers=consumer_headers, json={"score": 5})
+        db_session.refresh(stats)
+        assert stats.rating_sum == 7
+        assert (stats.score_4_count, stats.score_5_count) == (0, 1)
+
+        client.delete(f'/api/ratings/{rating_id}', headers=consumer_headers)
+        db_session.refresh(stats)
+        assert stats.rating_count == 1
+        assert stats.average_rating == 2
+
+        response = client.get(f'/api/recipes/{recipe.id}/ratings', headers=consumer_headers)
+        data = response.get_json()
+        assert data["total_ratings"] == 1
+        assert data["average_rating"] == 2
+        assert data["histogram"] == {"1": 0, "2": 1, "3": 0, "4": 0, "5": 0}
+
+    def test_rebuild_command_backfills_stats(self, app, db_session, chef_user, consumer_user):
+        recipe = Recipe(title="Backfill Recipe", author_id=chef_user.id)
+        db_session.add(recipe)
+        db_session.commit()
+
+        db_session.add_all([
+            Rating(user_id=consumer_user.id, recipe_id=recipe.id, score=5),
+            Rating(user_id=chef_user.id, recipe_id=recipe.id, score=3)
+        ])
+        db_session.commit()
+        RecipeRatingStats.query.delete()
+        db_session.commit()
+
+        result = app.test_cli_runner().invoke(args=['rebuild-rating-stats'])
+        assert result.exit_code == 0
+
+        stats = db_session.get(RecipeRatingStats, recipe.id)
+        assert stats.rating_count == 2
+        assert stats.average_rating == 4
+        assert stats.score_5_count == 1
+
+    def test_bulk_rating_writes_rebuild_stats(self, db_session, chef_user, consumer_user):
+        recipe = Recipe(title="Bulk Stats Recipe", author_id=chef_user.id)
+        db_session.add(recipe)
+        db_session.commit()
+
+        db_session.add_all([
+            Rating(user_id=consumer_user.id, recipe_id=recipe.id, score=5),
+            Rating(user_id=chef_user.id, recipe_id=recipe.id, score=3)
+        ])
+        db_session.commit()
+
+        Rating.query.filter_by(user_id=chef_user.id).update({"score": 1})
+        db_session.commit()
+        stats = db_session.get(RecipeRatingStats, recipe.id)
+        db_session.refresh(stats)
+        assert (stats.rating_sum, stats.score_1_count, stats.score_3_count) == (6, 1, 0)
+
+        Rating.query.filter_by(user_id=consumer_user.id).delete()
+        db_session.commit()
+        db_session.refresh(stats)
+        assert stats.rating_count == 1
+        assert stats.average_rating == 1
+
+        Rating.query.delete()
+        db_session.commit()
+        assert db_session.get(RecipeRatingStats, recipe.id) is None
@@ -1,6 +1,6 @@
 from backend.app.models import (
     Recipe, Ingredient, RecipeIngredient,
-    RecipeCollection, CollectionItem, Favorite
+    RecipeCollection, CollectionItem, Favorite, Rating
 )
 from backend.app.auth.models import User
 
@@ -120,6 +120,43 @@ class TestGetRecipe:
         assert response.status_code == 401
 
 
+class TestRandomRecipe:
+    def test_random_recipe_none_available(self, client, db_session, chef_user):
+        db_session.add(Recipe(title="No Image", author_id=chef_user.id))
+        db_session.commit()
+
+        response = client.get('/api/recipes/random')
+        assert response.status_code == 404
+
+    def test_random_recipe_single(self, client, db_session, chef_user):
+        recipe = Recipe(title="Pictured", author_id=chef_user.id, image_name="pictured.jpg")
+        db_session.add_all([recipe, Recipe(title="No Image", author_id=chef_user.id)])
+        db_session.commit()
+
+        response = client.get('/api/recipes/random')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["id"] == recipe.id
+        assert data["image_url"].startswith("https://storage.test/")
+
+    def test_random_recipe_count(self, client, db_session, chef_user):
+        recipes = [Recipe(title=f"Pictured {i}", author_id=chef_user.id, image_name=f"{i}.jpg") for i in range(5)]
+        db_session.add_all(recipes)
+        db_session.commit()
+
+        response = client.get('/api/recipes/random?count=3')
+        assert response.status_code == 200
+        ids = [r["id"] for r in response.get_json()["recipes"]]
+        assert len(ids) == 3
+        assert len(set(ids)) == 3
+
+        response = client.get('/api/recipes/random?count=10')
+        assert sorted(r["id"] for r in response.get_json()["recipes"]) == sorted(r.id for r in recipes)
+
+        response = client.get('/api/recipes/random?count=0')
+        assert response.status_code == 422
+
+
 class TestGetFilters:
     def test_get_filters(self, client, consumer_headers):
         response = client.get('/api/recipes/filters', headers=consumer_headers)
@@ -129,6 +166,36 @@ class TestGetFilters:
         response = client.get('/api/recipes/filters')
         assert response.status_code == 401
 
+    def test_get_filters_revalidation(self, client, db_session, consumer_headers, chef_user):
+        db_session.add(Recipe(title="Ramen", author_id=chef_user.id, cuisine="Japanese", category="Soup"))
+        db_session.commit()
+
+        response = client.get('/api/recipes/filters', headers=consumer_headers)
+        assert response.status_code == 200
+        assert "private" in response.headers["Cache-Control"]
+        etag = response.headers["ETag"]
+        data = response.get_json()
+        assert data["cuisines"] == ["Japanese"]
+        assert data["categories"] == ["Soup"]
+
+        response = client.get('/api/recipes/filters', headers={**consumer_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_get_filters_refresh_after_change(self, client, db_session, consumer_headers, chef_user, chef_headers):
+        recipe = Recipe(title="Ramen", author_id=chef_user.id, cuisine="Japanese")
+        db_session.add(recipe)
+        db_session.commit()
+
+        response = client.get('/api/recipes/filters', headers=consumer_headers)
+        etag = response.headers["ETag"]
+
+        response = client.put(f'/api/chef/recipes/{recipe.id}', headers=chef_headers, json={"cuisine": "Korean"})
+        assert response.status_code == 200
+
+        response = client.get('/api/recipes/filters', headers={**consumer_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.get_json()["cuisines"] == ["Korean"]
+
 
 class TestSearchIngredients:
     def test_search_ingredients_empty(self, client, consumer_headers):
@@ -457,3 +524,409 @@ class TestCollections:
         assert len(items) == 2
         item_ids = [i.recipe_id for i in items]
         assert r1.id in item_ids and r2.id in item_ids
+
+
+class TestRecipePagination:
+    def test_list_recipes_keyset_pages(self, client, db_session, consumer_headers, chef_user):
+        for title in ["Page A", "Page B", "Page C", "Page D", "Page E"]:
+            db_session.add(Recipe(title=title, author_id=chef_user.id))
+        db_session.commit()
+
+        seen = []
+        cursor = None
+        while True:
+            url = '/api/recipes?sort_by=title&sort_order=asc&limit=2'
+            if cursor:
+                url += f'&cursor={cursor}'
+            res = client.get(url, headers=consumer_headers)
+            assert res.status_code == 200
+            d = res.get_json()
+            assert len(d["recipes"]) <= 2
+            seen.extend(r["title"] for r in d["recipes"])
+            cursor = d["next_cursor"]
+            if not cursor:
+                break
+
+        assert seen == ["Page A", "Page B", "Page C", "Page D", "Page E"]
+
+    def test_list_recipes_without_limit_has_no_cursor(self, client, db_session, consumer_headers, chef_user):
+        db_session.add_all([
+            Recipe(title="No Limit 1", author_id=chef_user.id),
+            Recipe(title="No Limit 2", author_id=chef_user.id)
+        ])
+        db_session.commit()
+
+        res = client.get('/api/recipes', headers=consumer_headers)
+        assert res.status_code == 200
+        d = res.get_json()
+        assert len(d["recipes"]) == 2
+        assert d["next_cursor"] is None
+
+    def test_list_recipes_invalid_cursor(self, client, consumer_headers):
+        res = client.get('/api/recipes?limit=2&cursor=not-a-cursor', headers=consumer_headers)
+        assert res.status_code == 400
+        assert res.get_json()["msg"] == "Invalid cursor"
+
+    def test_list_recipes_cursor_sort_mismatch(self, client, db_session, consumer_headers, chef_user):
+        db_session.add_all([
+            Recipe(title="Mismatch 1", author_id=chef_user.id),
+            Recipe(title="Mismatch 2", author_id=chef_user.id)
+        ])
+        db_session.commit()
+
+        res = client.get('/api/recipes?limit=1', headers=consumer_headers)
+        cursor = res.get_json()["next_cursor"]
+        assert cursor
+
+        res = client.get(f'/api/recipes?limit=1&sort_by=title&cursor={cursor}', headers=consumer_headers)
+        assert res.status_code == 400
+
+
+class TestRecipeSearch:
+    def test_search_matches_directions(self, client, db_session, consumer_headers, chef_user):
+        r1 = Recipe(title="Weeknight Stew", directions="Simmer the lentils until tender.", author_id=chef_user.id)
+        r2 = Recipe(title="Green Salad", directions="Toss the leaves.", author_id=chef_user.id)
+        db_session.add_all([r1, r2])
+        db_session.commit()
+
+        res = client.get('/api/recipes?q=lentils', headers=consumer_headers)
+        assert res.status_code == 200
+        d = res.get_json()
+        assert [r["title"] for r in d["recipes"]] == ["Weeknight Stew"]
+        assert "<mark>lentils</mark>" in d["recipes"][0]["snippet"]
+
+    def test_search_sort_by_relevance(self, client, db_session, consumer_headers, chef_user):
+        r1 = Recipe(title="Chicken Soup", description="Chicken broth with chicken pieces", author_id=chef_user.id)
+        r2 = Recipe(title="Vegetable Rice", description="Serve with a little chicken", author_id=chef_user.id)
+        db_session.add_all([r1, r2])
+        db_session.commit()
+
+        res = client.get('/api/recipes?q=chicken&sort_by=relevance', headers=consumer_headers)
+        assert res.status_code == 200
+        titles = [r["title"] for r in res.get_json()["recipes"]]
+        assert titles == ["Chicken Soup", "Vegetable Rice"]
+
+    def test_search_relevance_pagination(self, client, db_session, consumer_headers, chef_user):
+        for i in range(3):
+            db_session.add(Recipe(title=f"Curry {i}", description="Mild curry", author_id=chef_user.id))
+        db_session.commit()
+
+        res = client.get('/api/recipes?q=curry&sort_by=relevance&limit=2', headers=consumer_headers)
+        d = res.get_json()
+        assert len(d["recipes"]) == 2
+        assert d["next_cursor"]
+
+        res = client.get(
+            f'/api/recipes?q=curry&sort_by=relevance&limit=2&cursor={d["next_cursor"]}',
+            headers=consumer_headers
+        )
+        d2 = res.get_json()
+        assert len(d2["recipes"]) == 1
+        assert d2["next_cursor"] is None
+        ids = {r["id"] for r in d["recipes"]} | {r["id"] for r in d2["recipes"]}
+        assert len(ids) == 3
+
+
+class TestRecipeFacets:
+    def test_facets_exclude_own_filter(self, client, db_session, consumer_headers, chef_user):
+        db_session.add_all([
+            Recipe(title="Ramen", author_id=chef_user.id, cuisine="Japanese", category="Soup", meal_type="dinner"),
+            Recipe(title="Miso", author_id=chef_user.id, cuisine="Japanese", category="Soup", meal_type="lunch"),
+            Recipe(title="Sushi", author_id=chef_user.id, cuisine="Japanese", category="Main", meal_type="dinner"),
+            Recipe(title="Tacos", author_id=chef_user.id, cuisine="Mexican", category="Main", meal_type="dinner"),
+            Recipe(title="Pozole", author_id=chef_user.id, cuisine="Mexican", category="Soup", is_vegan=True)
+        ])
+        db_session.commit()
+
+        response = client.get('/api/recipes?facets=true&cuisine=japanese', headers=consumer_headers)
+        assert response.status_code == 200
+        data = response.get_json()
+        assert len(data["recipes"]) == 3
+
+        facets = data["facets"]
+        assert facets["cuisines"] == [
+            {"value": "Japanese", "count": 3},
+            {"value": "Mexican", "count": 2}
+        ]
+        assert facets["categories"] == [
+            {"value": "Soup", "count": 2},
+            {"value": "Main", "count": 1}
+        ]
+        assert facets["meal_types"] == [
+            {"value": "dinner", "count": 2},
+            {"value": "lunch", "count": 1}
+        ]
+
+        response = client.get('/api/recipes?facets=true&is_vegan=true', headers=consumer_headers)
+        facets = response.get_json()["facets"]
+        assert facets["cuisines"] == [{"value": "Mexican", "count": 1}]
+        assert facets["meal_types"] == []
+
+    def test_facets_not_returned_by_default(self, client, consumer_headers):
+        response = client.get('/api/recipes', headers=consumer_headers)
+        assert response.get_json().get("facets") is None
+
+    def test_facets_empty_ingredient_match(self, client, consumer_headers):
+        response = client.get('/api/recipes?facets=true&ingredients=saffron', headers=consumer_headers)
+        assert response.status_code == 200
+        assert response.get_json()["facets"] == {"categories": [], "cuisines": [], "meal_types": []}
+
+
+class TestIngredientFilters:
+    def setup_recipes(self, db_session, chef):
+        tomato = Ingredient(name="Cherry Tomato", default_unit="piece")
+        basil = Ingredient(name="Basil", default_unit="gram")
+        cheese = Ingredient(name="Mozzarella Cheese", default_unit="gram")
+        caprese = Recipe(title="Caprese", author_id=chef.id)
+        salsa = Recipe(title="Salsa", author_id=chef.id)
+        pesto = Recipe(title="Pesto", author_id=chef.id)
+        db_session.add_all([tomato, basil, cheese, caprese, salsa, pesto])
+        db_session.commit()
+
+        db_session.add_all([
+            RecipeIngredient(recipe_id=caprese.id, ingredient_id=tomato.id),
+            RecipeIngredient(recipe_id=caprese.id, ingredient_id=basil.id),
+            RecipeIngredient(recipe_id=caprese.id, ingredient_id=cheese.id),
+            RecipeIngredient(recipe_id=salsa.id, ingredient_id=tomato.id),
+            RecipeIngredient(recipe_id=pesto.id, ingredient_id=basil.id),
+            RecipeIngredient(recipe_id=pesto.id, ingredient_id=cheese.id)
+        ])
+        db_session.commit()
+        return caprese, salsa, pesto
+
+    def titles(self, client, headers, params):
+        res = client.get(f'/api/recipes?{params}', headers=headers)
+        assert res.status_code == 200
+        return sorted(r["title"] for r in res.get_json()["recipes"])
+
+    def test_include_intersection(self, client, db_session, consumer_headers, chef_user):
+        self.setup_recipes(db_session, chef_user)
+
+        assert self.titles(client, consumer_headers, 'ingredients=tomato') == ["Caprese", "Salsa"]
+        assert self.titles(client, consumer_headers, 'ingredients=tomato,basil') == ["Caprese"]
+        assert self.titles(client, consumer_headers, 'ingredients=tomato,saffron') == []
+
+    def test_exclude_difference(self, client, db_session, consumer_headers, chef_user):
+        self.setup_recipes(db_session, chef_user)
+
+        assert self.titles(client, consumer_headers, 'exclude_ingredients=cheese') == ["Salsa"]
+        assert self.titles(
+            client, consumer_headers, 'ingredients=basil&exclude_ingredients=tomato'
+        ) == ["Pesto"]
+
+    def test_index_refreshes_after_recipe_change(self, client, db_session, consumer_headers, chef_user, chef_headers):
+        _, salsa, _ = self.setup_recipes(db_session, chef_user)
+        assert self.titles(client, consumer_headers, 'ingredients=basil') == ["Caprese", "Pesto"]
+
+        response = client.put(f'/api/chef/recipes/{salsa.id}', headers=chef_headers, json={
+            "ingredients": [{"name": "Basil", "quantity": 5, "unit": "gram"}]
+        })
+        assert response.status_code == 200
+
+        assert self.titles(client, consumer_headers, 'ingredients=basil') == ["Caprese", "Pesto", "Salsa"]
+        assert self.titles(client, consumer_headers, 'ingredients=tomato') == ["Caprese"]
+
+
+class TestRecipeCardProjection:
+    def test_list_paths_skip_directions(self, app, client, db_session, consumer_headers, chef_user, count_queries):
+        user = User.query.filter_by(role='consumer').first()
+        recipe = Recipe(title="Stew", author_id=chef_user.id, directions="Simmer for hours. " * 200)
+        db_session.add(recipe)
+        db_session.commit()
+        db_session.add(Favorite(user_id=user.id, recipe_id=recipe.id))
+        db_session.commit()
+
+        with count_queries() as statements:
+            assert client.get('/api/recipes', headers=consumer_headers).status_code == 200
+            assert client.get('/api/recipes/favorites', headers=consumer_headers).status_code == 200
+            assert client.get(f'/api/public/chefs/{chef_user.id}/recipes').status_code == 200
+
+        recipe_selects = [s for s in statements if 'FROM recipe' in s]
+        assert recipe_selects
+        assert not any('recipe.directions' in s for s in recipe_selects)
+
+
+class TestSparseFieldsets:
+    def setup_recipe(self, db_session, chef):
+        user = User.query.filter_by(role='consumer').first()
+        recipe = Recipe(title="Sparse", author_id=chef.id, description="Light")
+        db_session.add(recipe)
+        db_session.commit()
+        db_session.add_all([
+            Favorite(user_id=user.id, recipe_id=recipe.id),
+            Rating(user_id=user.id, recipe_id=recipe.id, score=4)
+        ])
+        db_session.commit()
+        return recipe
+
+    def test_list_fields_skip_unrequested_work(self, client, db_session, consumer_headers, chef_user,
+                                               count_queries):
+        recipe = self.setup_recipe(db_session, chef_user)
+
+        with count_queries() as statements:
+            response = client.get('/api/recipes?fields=title,image_url', headers=consumer_headers)
+        assert response.status_code == 200
+        assert response.get_json()["recipes"] == [{"id": recipe.id, "title": "Sparse", "image_url": None}]
+        assert not any('recipe_rating_stats' in s or 'favorites' in s for s in statements)
+
+        response = client.get('/api/recipes?fields=average_rating', headers=consumer_headers)
+        assert response.get_json()["recipes"][0]["average_rating"] == 4.0
+
+    def test_favorites_and_detail_fields(self, client, db_session, consumer_headers, chef_user):
+        recipe = self.setup_recipe(db_session, chef_user)
+
+        response = client.get('/api/recipes/favorites?fields=title,is_favorite', headers=consumer_headers)
+        assert response.get_json()["favorites"] == [{"id": recipe.id, "title": "Sparse", "is_favorite": True}]
+
+        response = client.get(f'/api/recipes/{recipe.id}?fields=title,ratings', headers=consumer_headers)
+        assert response.status_code == 200
+        assert response.get_json() == {
+            "id": recipe.id, "title": "Sparse", "ratings": {"average": 4.0, "count": 1}
+        }
+
+    def test_collections_fields(self, client, db_session, consumer_headers):
+        user = User.query.filter_by(role='consumer').first()
+        db_session.add(RecipeCollection(name="Weeknight", user_id=user.id))
+        db_session.commit()
+
+        response = client.get('/api/recipes/collections?fields=name&include_recipes=true', headers=consumer_headers)
+        assert response.status_code == 200
+        collection = response.get_json()["collections"][0]
+        assert set(collection) == {"id", "name"}
+
+    def test_unknown_fields_rejected(self, client, consumer_headers):
+        response = client.get('/api/recipes?fields=title,secret', headers=consumer_headers)
+        assert response.status_code == 400
+        assert response.get_json()["msg"] == "Unknown fields: secret"
+
+        response = client.get('/api/recipes/favorites?fields=directions', headers=consumer_headers)
+        assert response.status_code == 400
+
+
+class TestBulkSummaries:
+    def setup_library(self, db_session, chef):
+        user = User.query.filter_by(role='consumer').first()
+        recipes = [Recipe(title=f"Bulk {i}", author_id=chef.id) for i in range(4)]
+        coll = RecipeCollection(name="Bulk", user_id=user.id)
+        other = RecipeCollection(name="Other", user_id=user.id)
+        db_session.add_all(recipes + [coll, other])
+        db_session.commit()
+
+        db_session.add_all([Favorite(user_id=user.id, recipe_id=r.id) for r in recipes])
+        db_session.add_all([CollectionItem(collection_id=coll.id, recipe_id=r.id) for r in recipes])
+        db_session.add(CollectionItem(collection_id=other.id, recipe_id=recipes[0].id))
+        db_session.add_all([
+            Rating(user_id=user.id, recipe_id=recipes[0].id, score=4),
+            Rating(user_id=chef.id, recipe_id=recipes[0].id, score=5)
+        ])
+        db_session.commit()
+        return recipes, coll
+
+    def test_favorites_batch(self, client, db_session, consumer_headers, chef_user, count_queries):
+        recipes, _ = self.setup_library(db_session, chef_user)
+        client.get('/api/recipes/favorites', headers=consumer_headers)
+
+        with count_queries() as statements:
+            response = client.get('/api/recipes/favorites', headers=consumer_headers)
+        assert response.status_code == 200
+        favorites = {r["id"]: r for r in response.get_json()["favorites"]}
+        assert len(favorites) == 4
+        assert favorites[recipes[0].id]["average_rating"] == 4.5
+        assert favorites[recipes[0].id]["in_collections_count"] == 2
+        assert favorites[recipes[1].id]["average_rating"] is None
+        assert all(r["is_favorite"] for r in favorites.values())
+
+        extra = Recipe(title="Bulk Extra", author_id=chef_user.id)
+        db_session.add(extra)
+        db_session.commit()
+        user = User.query.filter_by(role='consumer').first()
+        db_session.add(Favorite(user_id=user.id, recipe_id=extra.id))
+        db_session.commit()
+
+        with count_queries() as larger:
+            client.get('/api/recipes/favorites', headers=consumer_headers)
+        assert len(larger) == len(statements)
+
+    def test_collections_include_recipes(self, client, db_session, consumer_headers, chef_user):
+        recipes, coll = self.setup_library(db_session, chef_user)
+
+        response = client.get('/api/recipes/collections?include_recipes=true', headers=consumer_headers)
+        assert response.status_code == 200
+        collections = {c["name"]: c for c in response.get_json()["collections"]}
+        assert collections["Bulk"]["recipe_count"] == 4
+        assert len(collections["Bulk"]["recipes"]) == 4
+        assert collections["Other"]["recipe_count"] == 1
+        assert collections["Other"]["recipes"][0]["average_rating"] == 4.5
+
+        response = client.get(f'/api/recipes/collections/{coll.id}', headers=consumer_headers)
+        assert response.status_code == 200
+        ratings = {r["recipe_id"]: r["average_rating"] for r in response.get_json()["recipes"]}
+        assert ratings[recipes[0].id] == 4.5
+
+
+class TestCookNow:
+    def setup_kitchen(self, client, db_session, chef, headers):
+        flour = Ingredient(name="CookNow Flour", default_unit="gram")
+        egg = Ingredient(name="CookNow Egg", default_unit="piece")
+        milk = Ingredient(name="CookNow Milk", default_unit="cup")
+        pancakes = Recipe(title="CookNow Pancakes", author_id=chef.id)
+        omelette = Recipe(title="CookNow Omelette", author_id=chef.id)
+        bread = Recipe(title="CookNow Bread", author_id=chef.id)
+        db_session.add_all([flour, egg, milk, pancakes, omelette, bread])
+        db_session.commit()
+
+        db_session.add_all([
+            RecipeIngredient(recipe_id=pancakes.id, ingredient_id=flour.id, quantity=1, unit="pound"),
+            RecipeIngredient(recipe_id=pancakes.id, ingredient_id=egg.id, quantity=2, unit="piece"),
+            RecipeIngredient(recipe_id=pancakes.id, ingredient_id=milk.id, quantity=1, unit="cup"),
+            RecipeIngredient(recipe_id=omelette.id, ingredient_id=egg.id, quantity=3, unit="piece"),
+            RecipeIngredient(recipe_id=bread.id, ingredient_id=flour.id, quantity=200, unit="gram"),
+            RecipeIngredient(recipe_id=bread.id, ingredient_id=milk.id, quantity=1, unit="cup")
+        ])
+        db_session.commit()
+
+        for ingredient_id, quantity, unit in [(flour.id, 300, "gram"), (egg.id, 4, "piece")]:
+            client.post('/api/fridge/items', headers=headers, json={
+                "ingredient_id": ingredient_id,
+                "quantity": quantity,
+                "unit": unit
+            })
+
+    def test_ranks_by_coverage(self, client, db_session, consumer_headers, chef_user):
+        self.setup_kitchen(client, db_session, chef_user, consumer_headers)
+
+        response = client.get('/api/recipes/cook-now', headers=consumer_headers)
+        assert response.status_code == 200
+        recipes = response.get_json()["recipes"]
+        assert [r["title"] for r in recipes] == [
+            "CookNow Omelette", "CookNow Bread", "CookNow Pancakes"
+        ]
+
+        omelette, bread, pancakes = recipes
+        assert omelette["coverage"] == 1
+        assert omelette["missing_ingredients"] == []
+
+        assert pancakes["matched_count"] == 2
+        assert pancakes["sufficient_count"] == 1
+        assert sorted((m["name"], m["status"]) for m in pancakes["missing_ingredients"]) == [
+            ("CookNow Flour", "insufficient"), ("CookNow Milk", "missing")
+        ]
+
+        assert bread["sufficient_count"] == 1
+        assert [m["name"] for m in bread["missing_ingredients"]] == ["CookNow Milk"]
+
+    def test_limit_and_min_coverage(self, client, db_session, consumer_headers, chef_user):
+        self.setup_kitchen(client, db_session, chef_user, consumer_headers)
+
+        response = client.get('/api/recipes/cook-now?limit=1', headers=consumer_headers)
+        assert [r["title"] for r in response.get_json()["recipes"]] == ["CookNow Omelette"]
+
+        response = client.get('/api/recipes/cook-now?min_coverage=0.6', headers=consumer_headers)
+        assert [r["title"] for r in response.get_json()["recipes"]] == [
+            "CookNow Omelette", "CookNow Pancakes"
+        ]
+
+    def test_empty_fridge(self, client, consumer_headers):
+        response = client.get('/api/recipes/cook-now', headers=consumer_headers)
+        assert response.status_code == 200
+        assert response.get_json()["recipes"] == []
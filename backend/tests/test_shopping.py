@@ -1,4 +1,6 @@
 from datetime import date, timedelta
+
+
 from backend.app.models import Ingredient, Recipe, RecipeIngredient, ShoppingList, FridgeItem, MealPlan
 from backend.app.auth.models import User
 
@@ -274,6 +276,111 @@ class TestAddFromMealPlan:
         data = response.get_json()
         assert data["added_count"] == 0
 
+    def test_add_from_meal_plan_merges_quantities(self, client, db_session, consumer_headers, count_queries):
+        user = User.query.filter_by(role='consumer').first()
+        rice = Ingredient(name="MergeTest Rice", default_unit="gram")
+        oil = Ingredient(name="MergeTest Oil", default_unit="tablespoon")
+        salt = Ingredient(name="MergeTest Salt", default_unit="gram")
+        pilaf = Recipe(title="MergeTest Pilaf")
+        risotto = Recipe(title="MergeTest Risotto")
+        db_session.add_all([rice, oil, salt, pilaf, risotto])
+        db_session.commit()
+
+        db_session.add_all([
+            RecipeIngredient(recipe_id=pilaf.id, ingredient_id=rice.id, quantity=200, unit="gram"),
+            RecipeIngredient(recipe_id=pilaf.id, ingredient_id=oil.id, quantity=2, unit="tablespoon"),
+            RecipeIngredient(recipe_id=pilaf.id, ingredient_id=salt.id, quantity=5, unit="gram"),
+            RecipeIngredient(recipe_id=risotto.id, ingredient_id=rice.id, quantity=1, unit="pound")
+        ])
+        start = date(2025, 6, 2)
+        db_session.add_all([
+            MealPlan(user_id=user.id, recipe_id=pilaf.id, plan_date=start, meal_type="lunch"),
+            MealPlan(user_id=user.id, recipe_id=pilaf.id, plan_date=start + timedelta(days=1), meal_type="lunch"),
+            MealPlan(user_id=user.id, recipe_id=risotto.id, plan_date=start + timedelta(days=2), meal_type="dinner")
+        ])
+        db_session.add_all([
+            FridgeItem(user_id=user.id, ingredient_id=oil.id, quantity=1, unit="cup"),
+            FridgeItem(user_id=user.id, ingredient_id=rice.id, quantity=100, unit="gram")
+        ])
+        db_session.add(ShoppingList(user_id=user.id, ingredient_id=salt.id, amount="1", source_type="manual"))
+        db_session.commit()
+        rice_id, oil_id, salt_id = rice.id, oil.id, salt.id
+
+        with count_queries() as statements:
+            response = client.post('/api/shopping-list/from-meal-plan', headers=consumer_headers, json={
+                "start_date": start.isoformat(),
+                "subtract_fridge": True
+            })
+
+        assert response.status_code == 201
+        data = response.get_json()
+        assert data["meal_plans_processed"] == 3
+        assert data["added_count"] == 1
+        assert data["skipped_count"] == 1
+        assert len([s for s in statements if 'shopping_list' in s or 'meal_plans' in s]) == 3
+
+        rice_item = ShoppingList.query.filter_by(ingredient_id=rice_id).one()
+        assert float(rice_item.amount) == round(400 + 453.59 - 100, 2)
+        assert rice_item.unit == "gram"
+        assert ShoppingList.query.filter_by(ingredient_id=oil_id).first() is None
+        assert ShoppingList.query.filter_by(ingredient_id=salt_id).one().amount == "1"
+
+        response = client.post('/api/shopping-list/from-meal-plan', headers=consumer_headers, json={
+            "start_date": start.isoformat()
+        })
+        data = response.get_json()
+        assert data["added_count"] == 1
+        assert data["updated_count"] == 1
+        db_session.expire_all()
+        assert float(ShoppingList.query.filter_by(ingredient_id=rice_id).one().amount) == round(400 + 453.59, 2)
+
+    def test_add_from_meal_plan_reports_mixed_units(self, client, db_session, consumer_headers):
+        user = User.query.filter_by(role='consumer').first()
+        egg = Ingredient(name="MixedTest Egg", default_unit="piece")
+        omelette = Recipe(title="MixedTest Omelette")
+        cake = Recipe(title="MixedTest Cake")
+        db_session.add_all([egg, omelette, cake])
+        db_session.commit()
+
+        db_session.add_all([
+            RecipeIngredient(recipe_id=omelette.id, ingredient_id=egg.id, quantity=2, unit="piece"),
+            RecipeIngredient(recipe_id=cake.id, ingredient_id=egg.id, quantity=100, unit="gram")
+        ])
+        start = date(2025, 6, 2)
+        db_session.add_all([
+            MealPlan(user_id=user.id, recipe_id=omelette.id, plan_date=start, meal_type="breakfast"),
+            MealPlan(user_id=user.id, recipe_id=cake.id, plan_date=start, meal_type="dessert")
+        ])
+        db_session.add(ShoppingList(user_id=user.id, ingredient_id=egg.id, amount="3", unit="piece",
+                                    source_type="meal_plan"))
+        db_session.commit()
+        egg_id = egg.id
+
+        response = client.post('/api/shopping-list/from-meal-plan', headers=consumer_headers, json={
+            "start_date": start.isoformat(),
+            "subtract_fridge": True
+        })
+        assert response.status_code == 201
+        data = response.get_json()
+        assert data["added_count"] == 0
+        assert data["updated_count"] == 0
+        assert data["mixed_unit_ingredients"] == [{
+            "ingredient_id": egg_id,
+            "name": "MixedTest Egg",
+            "quantities": [{"quantity": 100.0, "unit": "gram"}, {"quantity": 2.0, "unit": "piece"}]
+        }]
+
+        db_session.expire_all()
+        item = ShoppingList.query.filter_by(ingredient_id=egg_id).one()
+        assert item.amount == "3"
+        assert item.unit == "piece"
+
+    def test_add_from_meal_plan_invalid_date(self, client, consumer_headers):
+        response = client.post('/api/shopping-list/from-meal-plan', headers=consumer_headers, json={
+            "start_date": "not-a-date"
+        })
+        assert response.status_code == 400
+
 
 class TestTogglePurchased:
     def test_toggle_purchased_success(self, client, db_session, consumer_headers):
@@ -358,6 +465,41 @@ class TestTransferToFridge:
         assert data["msg"] == "No purchased items to transfer"
         assert data["transferred_count"] == 0
 
+    def test_transfer_batch_converts_and_merges(self, client, db_session, consumer_headers, count_queries):
+        user = User.query.filter_by(role='consumer').first()
+        flour = Ingredient(name="TransferTest Flour", default_unit="gram")
+        milk = Ingredient(name="TransferTest Milk", default_unit="cup")
+        eggs = Ingredient(name="TransferTest Eggs", default_unit="piece")
+        db_session.add_all([flour, milk, eggs])
+        db_session.commit()
+
+        db_session.add(FridgeItem(user_id=user.id, ingredient_id=flour.id, quantity=100, unit="gram"))
+        db_session.add_all([
+            ShoppingList(user_id=user.id, ingredient_id=flour.id, amount="2", unit="pound", is_purchased=True),
+            ShoppingList(user_id=user.id, ingredient_id=milk.id, amount="2", is_purchased=True),
+            ShoppingList(user_id=user.id, ingredient_id=eggs.id, amount="12", is_purchased=False)
+        ])
+        db_session.commit()
+        flour_id, milk_id, eggs_id = flour.id, milk.id, eggs.id
+
+        with count_queries() as statements:
+            response = client.post('/api/shopping-list/transfer-to-fridge', headers=consumer_headers)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["transferred_count"] == 1
+        assert data["updated_count"] == 1
+        assert data["total_processed"] == 2
+        assert len([s for s in statements if 'shopping_list' in s or 'fridge_items' in s]) == 3
+
+        db_session.expire_all()
+        flour_item = FridgeItem.query.filter_by(ingredient_id=flour_id).one()
+        assert round(flour_item.quantity, 2) == 1007.18
+        assert flour_item.unit == "gram"
+        milk_item = FridgeItem.query.filter_by(ingredient_id=milk_id).one()
+        assert (milk_item.quantity, milk_item.unit) == (2, "cup")
+        assert [item.ingredient_id for item in ShoppingList.query.all()] == [eggs_id]
+
 
 class TestCompareWithFridge:
     def test_compare_with_fridge_success(self, client, db_session, consumer_headers):
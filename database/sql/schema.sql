@@ -146,3 +146,183 @@ CREATE TABLE IF NOT EXISTS chef_profiles (
     avatar_url TEXT
 );
 
+
+-- =========================
+-- 12) RECIPE SEARCH INDEXES
+-- =========================
+CREATE INDEX IF NOT EXISTS ix_recipe_search_vector ON recipe USING gin (
+    to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, '') || ' ' || coalesce(directions, ''))
+);
+CREATE INDEX IF NOT EXISTS ix_recipe_title_trgm ON recipe USING gin (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_recipe_description_trgm ON recipe USING gin (description gin_trgm_ops);
+
+-- =========================
+-- 13) RECIPE_RATING_STATS
+-- =========================
+CREATE INDEX IF NOT EXISTS ix_ratings_recipe_id ON ratings (recipe_id);
+
+CREATE TABLE IF NOT EXISTS recipe_rating_stats (
+    recipe_id BIGINT PRIMARY KEY REFERENCES recipe(id) ON DELETE CASCADE,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum INTEGER NOT NULL DEFAULT 0,
+    average_rating FLOAT,
+    score_1_count INTEGER NOT NULL DEFAULT 0,
+    score_2_count INTEGER NOT NULL DEFAULT 0,
+    score_3_count INTEGER NOT NULL DEFAULT 0,
+    score_4_count INTEGER NOT NULL DEFAULT 0,
+    score_5_count INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT INTO recipe_rating_stats (
+    recipe_id, rating_count, rating_sum, average_rating,
+    score_1_count, score_2_count, score_3_count, score_4_count, score_5_count
+)
+SELECT
+    recipe_id, COUNT(*), SUM(score), AVG(score)::FLOAT,
+    COUNT(*) FILTER (WHERE score = 1), COUNT(*) FILTER (WHERE score = 2),
+    COUNT(*) FILTER (WHERE score = 3), COUNT(*) FILTER (WHERE score = 4),
+    COUNT(*) FILTER (WHERE score = 5)
+FROM ratings
+GROUP BY recipe_id
+ON CONFLICT (recipe_id) DO UPDATE SET
+    rating_count = EXCLUDED.rating_count,
+    rating_sum = EXCLUDED.rating_sum,
+    average_rating = EXCLUDED.average_rating,
+    score_1_count = EXCLUDED.score_1_count,
+    score_2_count = EXCLUDED.score_2_count,
+    score_3_count = EXCLUDED.score_3_count,
+    score_4_count = EXCLUDED.score_4_count,
+    score_5_count = EXCLUDED.score_5_count;
+
+-- =========================
+-- 14) RECIPE LIST INDEXES
+-- =========================
+CREATE INDEX IF NOT EXISTS ix_recipe_created_at_id ON recipe (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_recipe_title_id ON recipe (title, id);
+CREATE INDEX IF NOT EXISTS ix_recipe_author_created_at ON recipe (author_id, created_at);
+
+-- =========================
+-- 15) USER TOKEN VERSION
+-- =========================
+ALTER TABLE users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
+
+-- =========================
+-- 16) EMAIL_OUTBOX
+-- =========================
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    to_email TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    html_body TEXT NOT NULL,
+    body TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    next_attempt_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMPTZ
+);
+CREATE INDEX IF NOT EXISTS ix_email_outbox_status_next_attempt ON email_outbox (status, next_attempt_at);
+
+-- =========================
+-- 17) VERIFICATION_CODES INDEXES
+-- =========================
+CREATE INDEX IF NOT EXISTS ix_verification_codes_lookup ON verification_codes (email, purpose, code) WHERE NOT used;
+CREATE INDEX IF NOT EXISTS ix_verification_codes_expires_at ON verification_codes (expires_at);
+
+-- =========================
+-- 18) FRIDGE_ITEMS SYNC
+-- =========================
+ALTER TABLE fridge_items ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;
+UPDATE fridge_items SET updated_at = COALESCE(added_at, CURRENT_TIMESTAMP) WHERE updated_at IS NULL;
+ALTER TABLE fridge_items ALTER COLUMN updated_at SET DEFAULT CURRENT_TIMESTAMP;
+CREATE INDEX IF NOT EXISTS ix_fridge_items_user_added_at ON fridge_items (user_id, added_at, id);
+CREATE INDEX IF NOT EXISTS ix_fridge_items_user_updated_at ON fridge_items (user_id, updated_at, id);
+
+-- =========================
+-- 19) MEAL_PLAN_TEMPLATES
+-- =========================
+CREATE TABLE IF NOT EXISTS meal_plan_templates (
+    id BIGSERIAL PRIMARY KEY,
+    user_id BIGINT REFERENCES users(id) ON DELETE CASCADE NOT NULL,
+    name TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(user_id, name)
+);
+
+CREATE TABLE IF NOT EXISTS meal_plan_template_items (
+    id BIGSERIAL PRIMARY KEY,
+    template_id BIGINT REFERENCES meal_plan_templates(id) ON DELETE CASCADE NOT NULL,
+    day_offset INTEGER NOT NULL,
+    meal_type TEXT NOT NULL,
+    recipe_id BIGINT REFERENCES recipe(id) ON DELETE SET NULL,
+    UNIQUE(template_id, day_offset, meal_type)
+);
+
+-- =========================
+-- 20) SHOPPING_LIST UPSERT KEY
+-- =========================
+ALTER TABLE shopping_list ADD COLUMN IF NOT EXISTS unit TEXT;
+DO $$
+DECLARE
+    conflicts TEXT;
+BEGIN
+    SELECT string_agg(format('user %s ingredient %s (rows %s)', user_id, ingredient_id, ids), '; ')
+    INTO conflicts
+    FROM (
+        SELECT user_id, ingredient_id, string_agg(id::TEXT, ',' ORDER BY id) AS ids
+        FROM shopping_list
+        WHERE ingredient_id IS NOT NULL
+        GROUP BY user_id, ingredient_id
+        HAVING COUNT(*) > 1 AND (
+            COUNT(DISTINCT COALESCE(unit, '')) > 1
+            OR bool_or(amount IS NOT NULL AND amount !~ '^\s*[0-9]+(\.[0-9]+)?\s*$')
+        )
+    ) unmergeable;
+
+    IF conflicts IS NOT NULL THEN
+        RAISE EXCEPTION 'shopping_list has duplicate items that cannot be merged: %', conflicts
+            USING HINT = 'Merge or delete these rows by hand, then rerun this section.';
+    END IF;
+END $$;
+
+WITH ranked AS (
+    SELECT id, user_id, ingredient_id,
+           ROW_NUMBER() OVER (
+               PARTITION BY user_id, ingredient_id ORDER BY is_purchased IS TRUE DESC, id
+           ) AS position
+    FROM shopping_list
+    WHERE ingredient_id IS NOT NULL
+), totals AS (
+    SELECT user_id, ingredient_id, SUM(amount::NUMERIC) AS amount
+    FROM shopping_list
+    WHERE ingredient_id IS NOT NULL
+    GROUP BY user_id, ingredient_id
+    HAVING COUNT(*) > 1
+)
+UPDATE shopping_list s
+SET amount = COALESCE(totals.amount::TEXT, s.amount)
+FROM ranked JOIN totals USING (user_id, ingredient_id)
+WHERE s.id = ranked.id AND ranked.position = 1;
+
+DELETE FROM shopping_list s
+USING (
+    SELECT id, ROW_NUMBER() OVER (
+        PARTITION BY user_id, ingredient_id ORDER BY is_purchased IS TRUE DESC, id
+    ) AS position
+    FROM shopping_list
+    WHERE ingredient_id IS NOT NULL
+) ranked
+WHERE s.id = ranked.id AND ranked.position > 1;
+CREATE UNIQUE INDEX IF NOT EXISTS ix_shopping_list_user_ingredient ON shopping_list (user_id, ingredient_id);
+
+-- =========================
+-- 21) FRIDGE_ITEM_DELETIONS
+-- =========================
+CREATE TABLE IF NOT EXISTS fridge_item_deletions (
+    id BIGSERIAL PRIMARY KEY,
+    user_id BIGINT REFERENCES users(id) ON DELETE CASCADE NOT NULL,
+    item_id BIGINT NOT NULL,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS ix_fridge_item_deletions_user_deleted_at ON fridge_item_deletions (user_id, deleted_at);